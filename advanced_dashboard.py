@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import ta
 import plotly.graph_objects as go
 import plotly.express as px
@@ -11,6 +10,14 @@ from strategy_builder import (
     StrategyBuilder, PresetStrategies, Condition, ConditionType, 
     Operator, get_strategy_description
 )
+from backtest import backtest
+from fundamentals_store import get_fundamentals
+from indicator_demand import DemandStats, needs
+from panel_indicators import Panel, ta_indicators
+from tail_indicators import TAIL_BARS, tail_frame, tail_frames
+from ohlcv_store import load_history
+from single_flight import single_flight
+from strategy_compiler import STRATEGY_INDICATOR_COLUMNS, STRATEGY_INDICATOR_PARAMS
 
 # 페이지 설정
 st.set_page_config(
@@ -24,6 +31,18 @@ st.set_page_config(
 st.title("🚀 고급 주식 전략 스크리너")
 st.markdown("---")
 
+# 전체 종목 벡터 연산에서 계산할 지표와 컬럼 이름 (calculate_technical_indicators와 같은 정의)
+ADVANCED_INDICATOR_PARAMS = STRATEGY_INDICATOR_PARAMS
+ADVANCED_INDICATOR_COLUMNS = STRATEGY_INDICATOR_COLUMNS
+
+# 결과 표에 표시하는 지표 (전략이 읽지 않으면 조건을 만족한 종목만 추가 계산)
+STRATEGY_RESULT_COLUMNS = ['RSI', 'BB_Lower', 'BB_Upper', 'Volume_SMA']
+CUSTOM_RESULT_COLUMNS = ['RSI', 'MACD', 'SMA_20']
+
+def advanced_indicator_columns(columns=None):
+    """{컬럼명: 벡터 연산 키} 중 columns(None이면 전체)에 있는 것만"""
+    return {name: key for name, key in ADVANCED_INDICATOR_COLUMNS.items() if columns is None or name in columns}
+
 class AdvancedStockScreener:
     def __init__(self):
         self.markets = {
@@ -95,12 +114,12 @@ class AdvancedStockScreener:
             "WMT", "BAC", "ABBV", "PFE", "KO"
         ]
     
+    @single_flight()  # 세션 간 동시 요청 합치기
     def get_stock_data(self, symbol: str, period: str = "6mo") -> pd.DataFrame:
-        """주식 데이터 가져오기"""
+        """주식 데이터 가져오기 (저장소에 더 긴 이력이 있으면 잘라서 반환, 모자란 앞부분만 요청)"""
         try:
-            stock = yf.Ticker(symbol)
-            data = stock.history(period=period)
-            if data.empty:
+            data = load_history(symbol, period=period)
+            if data is None or data.empty:
                 return None
             return data
         except Exception as e:
@@ -108,67 +127,83 @@ class AdvancedStockScreener:
             return None
     
     def get_stock_info(self, symbol: str) -> dict:
-        """주식 기본 정보 가져오기"""
-        try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
-            return {
-                'symbol': symbol,
-                'name': info.get('longName', info.get('shortName', 'N/A')),
-                'market_cap': info.get('marketCap', 0),
-                'pe_ratio': info.get('trailingPE', 'N/A'),
-                'price': info.get('currentPrice', info.get('regularMarketPrice', 0)),
-                'currency': info.get('currency', 'USD'),
-                'sector': info.get('sector', 'N/A'),
-                'industry': info.get('industry', 'N/A')
-            }
-        except Exception as e:
-            return {
-                'symbol': symbol,
-                'name': 'N/A',
-                'market_cap': 0,
-                'pe_ratio': 'N/A',
-                'price': 0,
-                'currency': 'USD',
-                'sector': 'N/A',
-                'industry': 'N/A'
-            }
+        """주식 기본 정보 (기본 정보 캐시에서만 읽고, 없으면 백그라운드로 받도록 예약)"""
+        info = get_fundamentals().lookup(symbol) or {}
+        return {
+            'symbol': symbol,
+            'name': info.get('name') or 'N/A',
+            'market_cap': info.get('marketCap') or 0,
+            'pe_ratio': info.get('trailingPE') if info.get('trailingPE') is not None else 'N/A',
+            'currency': info.get('currency') or 'USD',
+            'sector': info.get('sector') or 'N/A',
+            'industry': info.get('industry') or 'N/A'
+        }
     
-    def calculate_technical_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
-        """기술적 지표 계산"""
+    def calculate_technical_indicators(self, data: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+        """기술적 지표 계산 (columns를 주면 그 컬럼이 속한 지표만 계산)"""
         if data is None or data.empty:
             return None
+        keys = None if columns is None else list(advanced_indicator_columns(columns).values())
             
         # 볼린저 밴드
-        bb_period = 20
-        bb_std = 2
-        data['BB_Middle'] = ta.trend.sma_indicator(data['Close'], window=bb_period)
-        data['BB_Upper'] = data['BB_Middle'] + (data['Close'].rolling(bb_period).std() * bb_std)
-        data['BB_Lower'] = data['BB_Middle'] - (data['Close'].rolling(bb_period).std() * bb_std)
+        if needs(keys, 'BB'):
+            bb_period = 20
+            bb_std = 2
+            data['BB_Middle'] = ta.trend.sma_indicator(data['Close'], window=bb_period)
+            data['BB_Upper'] = data['BB_Middle'] + (data['Close'].rolling(bb_period).std() * bb_std)
+            data['BB_Lower'] = data['BB_Middle'] - (data['Close'].rolling(bb_period).std() * bb_std)
         
         # RSI
-        data['RSI'] = ta.momentum.rsi(data['Close'], window=14)
+        if needs(keys, 'RSI'):
+            data['RSI'] = ta.momentum.rsi(data['Close'], window=14)
         
         # MACD
-        data['MACD'] = ta.trend.macd_diff(data['Close'])
-        data['MACD_Signal'] = ta.trend.macd_signal(data['Close'])
+        if needs(keys, 'MACD'):
+            data['MACD'] = ta.trend.macd_diff(data['Close'])
+            data['MACD_Signal'] = ta.trend.macd_signal(data['Close'])
         
         # 이동평균
-        data['SMA_20'] = ta.trend.sma_indicator(data['Close'], window=20)
-        data['SMA_50'] = ta.trend.sma_indicator(data['Close'], window=50)
-        data['SMA_200'] = ta.trend.sma_indicator(data['Close'], window=200)
+        for window in ADVANCED_INDICATOR_PARAMS['ma_windows']:
+            if needs(keys, f'MA_{window}'):
+                data[f'SMA_{window}'] = ta.trend.sma_indicator(data['Close'], window=window)
         
         # 거래량 관련
-        data['Volume_SMA'] = ta.volume.volume_sma(data['Close'], data['Volume'], window=20)
+        if needs(keys, 'Volume_MA'):
+            data['Volume_SMA'] = data['Volume'].rolling(window=20).mean()
         
         # Stochastic
-        data['Stoch_K'] = ta.momentum.stoch(data['High'], data['Low'], data['Close'])
-        data['Stoch_D'] = ta.momentum.stoch_signal(data['High'], data['Low'], data['Close'])
+        if needs(keys, 'Stoch'):
+            data['Stoch_K'] = ta.momentum.stoch(data['High'], data['Low'], data['Close'])
+            data['Stoch_D'] = ta.momentum.stoch_signal(data['High'], data['Low'], data['Close'])
         
         # Williams %R
-        data['Williams_R'] = ta.momentum.williams_r(data['High'], data['Low'], data['Close'])
+        if needs(keys, 'Williams_R'):
+            data['Williams_R'] = ta.momentum.williams_r(data['High'], data['Low'], data['Close'])
         
         return data
+    
+    def calculate_technical_indicators_many(self, frames: dict, bars: int = None, columns: list = None) -> dict:
+        """여러 종목 지표를 (봉 × 종목) 배열로 한 번에 계산 (calculate_technical_indicators와 같은 값)
+
+        bars를 주면 마지막 bars개 봉의 지표만 계산한 짧은 프레임을 반환합니다 (전략 평가용).
+        columns를 주면 그 컬럼이 속한 지표만 계산합니다 (StrategyBuilder.required_indicators).
+        """
+        mapping = advanced_indicator_columns(columns)
+        if bars is not None:
+            return tail_frames(frames, mapping, ADVANCED_INDICATOR_PARAMS, bars, oscillators=True)
+        panel = Panel(frames)
+        if not len(panel):
+            return {}
+        values = ta_indicators(panel, ADVANCED_INDICATOR_PARAMS, oscillators=True, keys=mapping.values())
+        return panel.attach(values, mapping)
+    
+    def complete_indicators(self, data: pd.DataFrame, source: pd.DataFrame, columns: list) -> pd.DataFrame:
+        """끝부분 프레임 data에 없는 columns 지표를 전체 이력 source로 계산해 붙임 (결과 표용)"""
+        missing = advanced_indicator_columns([name for name in columns if name not in data.columns])
+        if not missing:
+            return data
+        tail = tail_frame(source, missing, ADVANCED_INDICATOR_PARAMS, len(data))
+        return data.assign(**{name: tail[name].to_numpy() for name in missing})
 
 def create_custom_strategy():
     """사용자 정의 전략 생성"""
@@ -331,40 +366,76 @@ def main():
                 st.session_state.run_screening = True
                 st.session_state.selected_market = selected_market
                 st.session_state.strategy = strategy
+            
+            # 과거 성과 백테스트 (모든 거래일에 전략을 적용했을 때 신호 뒤 수익률)
+            backtest_period = st.selectbox("백테스트 기간", ["1y", "2y", "5y", "10y"], index=2)
+            if st.button("📈 과거 성과 백테스트"):
+                st.session_state.run_backtest = (selected_market, strategy_type, strategy, backtest_period)
+                st.session_state.pop('backtest_result', None)
         
         with col2:
+            if st.session_state.get('run_backtest'):
+                market, name, backtest_strategy, period = st.session_state.run_backtest
+                st.subheader(f"📈 {market} {name} 백테스트 ({period})")
+                # 다른 위젯을 조작해 다시 실행될 때는 같은 요청의 결과를 그대로 표시 (버튼을 누르면 다시 계산)
+                request = (market, name, period)
+                cached = st.session_state.get('backtest_result')
+                if cached is not None and cached[0] == request:
+                    result = cached[1]
+                else:
+                    stocks = screener.markets[market]
+                    with st.spinner("과거 데이터로 전략을 평가 중입니다..."):
+                        frames = {symbol: screener.get_stock_data(symbol, period) for symbol in stocks}
+                        result = backtest(backtest_strategy, frames)
+                    st.session_state.backtest_result = (request, result)
+                st.caption(f"{result.symbols}개 종목, {result.bars:,}봉, 신호 {result.signals:,}개 ({result.elapsed:.1f}초)")
+                st.dataframe(result.summary().round(2), use_container_width=True)
+                per_date = result.signals_per_date()
+                if not per_date.empty:
+                    st.line_chart(per_date.rename("신호 종목 수"))
+            
             if hasattr(st.session_state, 'run_screening') and st.session_state.run_screening:
                 st.subheader(f"📊 {st.session_state.selected_market} 스크리닝 결과")
                 
                 stocks = screener.markets[st.session_state.selected_market]
+                get_fundamentals().warm_async(stocks)  # 시세 분석과 병렬로 기본 정보 미리 받기
                 
                 with st.spinner("주식 데이터를 분석 중입니다..."):
                     results = []
                     progress_bar = st.progress(0)
                     
+                    frames = {}
                     for i, symbol in enumerate(stocks):
-                        data = screener.get_stock_data(symbol)
-                        if data is not None:
-                            data_with_indicators = screener.calculate_technical_indicators(data)
-                            if st.session_state.strategy.evaluate_strategy(data_with_indicators):
-                                stock_info = screener.get_stock_info(symbol)
-                                latest_data = data_with_indicators.iloc[-1]
-                                
-                                results.append({
-                                    '티커': symbol,
-                                    '종목명': stock_info['name'][:20] + "..." if len(stock_info['name']) > 20 else stock_info['name'],
-                                    '섹터': stock_info['sector'],
-                                    '현재가': f"{latest_data['Close']:.2f}",
-                                    '시가총액': f"{stock_info['market_cap']:,}" if stock_info['market_cap'] else "N/A",
-                                    'PER': f"{stock_info['pe_ratio']:.2f}" if isinstance(stock_info['pe_ratio'], (int, float)) else "N/A",
-                                    'RSI': f"{latest_data['RSI']:.1f}",
-                                    '볼린저밴드%': f"{((latest_data['Close'] - latest_data['BB_Lower']) / (latest_data['BB_Upper'] - latest_data['BB_Lower']) * 100):.1f}%",
-                                    '거래량비율': f"{(latest_data['Volume'] / latest_data['Volume_SMA']):.1f}x" if latest_data['Volume_SMA'] > 0 else "N/A"
-                                })
-                        
+                        frames[symbol] = screener.get_stock_data(symbol)
                         progress_bar.progress((i + 1) / len(stocks))
-                        time.sleep(0.05)  # API 제한 방지
+                    
+                    # 전략이 읽는 지표의 끝부분만 전체 종목 한 번에 계산한 뒤 종목별로 평가
+                    columns = st.session_state.strategy.required_indicators()
+                    demand = DemandStats(ADVANCED_INDICATOR_COLUMNS.values())
+                    tails = screener.calculate_technical_indicators_many(frames, TAIL_BARS, columns)
+                    demand.record(len(tails), advanced_indicator_columns(columns).values())
+                    extra = advanced_indicator_columns([c for c in STRATEGY_RESULT_COLUMNS if c not in columns]).values()
+                    matched = st.session_state.strategy.compile().evaluate_frames(tails)  # 전략 DAG를 전체 종목에 한 번 실행
+                    for symbol, data_with_indicators in tails.items():
+                        if matched[symbol]:
+                            data_with_indicators = screener.complete_indicators(data_with_indicators, frames[symbol], STRATEGY_RESULT_COLUMNS)
+                            demand.record_completed(1, extra)
+                            stock_info = screener.get_stock_info(symbol)
+                            latest_data = data_with_indicators.iloc[-1]
+                            
+                            results.append({
+                                '티커': symbol,
+                                '종목명': stock_info['name'][:20] + "..." if len(stock_info['name']) > 20 else stock_info['name'],
+                                '섹터': stock_info['sector'],
+                                '현재가': f"{latest_data['Close']:.2f}",
+                                '시가총액': f"{stock_info['market_cap']:,}" if stock_info['market_cap'] else "N/A",
+                                'PER': f"{stock_info['pe_ratio']:.2f}" if isinstance(stock_info['pe_ratio'], (int, float)) else "N/A",
+                                'RSI': f"{latest_data['RSI']:.1f}",
+                                '볼린저밴드%': f"{((latest_data['Close'] - latest_data['BB_Lower']) / (latest_data['BB_Upper'] - latest_data['BB_Lower']) * 100):.1f}%",
+                                '거래량비율': f"{(latest_data['Volume'] / latest_data['Volume_SMA']):.1f}x" if latest_data['Volume_SMA'] > 0 else "N/A"
+                            })
                 
+                st.caption(demand.summary())
                 if results:
                     df_results = pd.DataFrame(results)
                     st.dataframe(df_results, use_container_width=True, height=400)
@@ -404,32 +475,42 @@ def main():
                 
                 # 전략 실행 로직 (기본 스크리너와 동일)
                 stocks = screener.markets[st.session_state.custom_market]
+                get_fundamentals().warm_async(stocks)  # 시세 분석과 병렬로 기본 정보 미리 받기
                 
                 with st.spinner("사용자 전략을 실행 중입니다..."):
                     results = []
                     progress_bar = st.progress(0)
                     
+                    frames = {}
                     for i, symbol in enumerate(stocks):
-                        data = screener.get_stock_data(symbol)
-                        if data is not None:
-                            data_with_indicators = screener.calculate_technical_indicators(data)
-                            if st.session_state.custom_strategy.evaluate_strategy(data_with_indicators):
-                                stock_info = screener.get_stock_info(symbol)
-                                latest_data = data_with_indicators.iloc[-1]
-                                
-                                results.append({
-                                    '티커': symbol,
-                                    '종목명': stock_info['name'][:15] + "..." if len(stock_info['name']) > 15 else stock_info['name'],
-                                    '현재가': f"{latest_data['Close']:.2f}",
-                                    'RSI': f"{latest_data['RSI']:.1f}",
-                                    'MACD': f"{latest_data['MACD']:.3f}",
-                                    '20일선': f"{latest_data['SMA_20']:.2f}",
-                                    '거래량': f"{latest_data['Volume']:,}"
-                                })
-                        
+                        frames[symbol] = screener.get_stock_data(symbol)
                         progress_bar.progress((i + 1) / len(stocks))
-                        time.sleep(0.05)
+                    
+                    # 전략이 읽는 지표의 끝부분만 전체 종목 한 번에 계산한 뒤 종목별로 평가
+                    columns = st.session_state.custom_strategy.required_indicators()
+                    demand = DemandStats(ADVANCED_INDICATOR_COLUMNS.values())
+                    tails = screener.calculate_technical_indicators_many(frames, TAIL_BARS, columns)
+                    demand.record(len(tails), advanced_indicator_columns(columns).values())
+                    extra = advanced_indicator_columns([c for c in CUSTOM_RESULT_COLUMNS if c not in columns]).values()
+                    matched = st.session_state.custom_strategy.compile().evaluate_frames(tails)  # 전략 DAG를 전체 종목에 한 번 실행
+                    for symbol, data_with_indicators in tails.items():
+                        if matched[symbol]:
+                            data_with_indicators = screener.complete_indicators(data_with_indicators, frames[symbol], CUSTOM_RESULT_COLUMNS)
+                            demand.record_completed(1, extra)
+                            stock_info = screener.get_stock_info(symbol)
+                            latest_data = data_with_indicators.iloc[-1]
+                            
+                            results.append({
+                                '티커': symbol,
+                                '종목명': stock_info['name'][:15] + "..." if len(stock_info['name']) > 15 else stock_info['name'],
+                                '현재가': f"{latest_data['Close']:.2f}",
+                                'RSI': f"{latest_data['RSI']:.1f}",
+                                'MACD': f"{latest_data['MACD']:.3f}",
+                                '20일선': f"{latest_data['SMA_20']:.2f}",
+                                '거래량': f"{latest_data['Volume']:,}"
+                            })
                 
+                st.caption(demand.summary())
                 if results:
                     df_results = pd.DataFrame(results)
                     st.dataframe(df_results, use_container_width=True)
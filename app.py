@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import ta
 import plotly.graph_objects as go
 import plotly.express as px
@@ -9,6 +8,9 @@ from datetime import datetime, timedelta
 import requests
 from typing import List, Dict, Any
 import time
+from market_data import get_provider
+from single_flight import single_flight
+from fundamentals_store import get_fundamentals
 
 # 페이지 설정
 st.set_page_config(
@@ -81,11 +83,11 @@ class StockScreener:
             "V", "PG", "MA", "HD", "CVX"
         ]
     
+    @single_flight()  # 세션 간 동시 요청 합치기
     def get_stock_data(self, symbol: str, period: str = "3mo") -> pd.DataFrame:
         """주식 데이터 가져오기"""
         try:
-            stock = yf.Ticker(symbol)
-            data = stock.history(period=period)
+            data = get_provider().history(symbol, period=period)  # 시장별 요청 한도 포함
             if data.empty:
                 return None
             return data
@@ -94,27 +96,15 @@ class StockScreener:
             return None
     
     def get_stock_info(self, symbol: str) -> Dict[str, Any]:
-        """주식 기본 정보 가져오기"""
-        try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
-            return {
-                'symbol': symbol,
-                'name': info.get('longName', 'N/A'),
-                'market_cap': info.get('marketCap', 0),
-                'pe_ratio': info.get('trailingPE', 'N/A'),
-                'price': info.get('currentPrice', 0),
-                'currency': info.get('currency', 'USD')
-            }
-        except Exception as e:
-            return {
-                'symbol': symbol,
-                'name': 'N/A',
-                'market_cap': 0,
-                'pe_ratio': 'N/A',
-                'price': 0,
-                'currency': 'USD'
-            }
+        """주식 기본 정보 (기본 정보 캐시에서만 읽고, 없으면 백그라운드로 받도록 예약)"""
+        info = get_fundamentals().lookup(symbol) or {}
+        return {
+            'symbol': symbol,
+            'name': info.get('name') or 'N/A',
+            'market_cap': info.get('marketCap') or 0,
+            'pe_ratio': info.get('trailingPE') if info.get('trailingPE') is not None else 'N/A',
+            'currency': info.get('currency') or 'USD'
+        }
     
     def calculate_technical_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """기술적 지표 계산"""
@@ -254,6 +244,7 @@ def main():
     # 스크리닝 실행
     if st.sidebar.button("🔍 스크리닝 실행", type="primary"):
         stocks = screener.markets[selected_market]
+        get_fundamentals().warm_async(stocks)  # 시세 분석과 병렬로 기본 정보 미리 받기
         
         with st.spinner("주식 데이터를 분석 중입니다..."):
             results = []
@@ -279,7 +270,6 @@ def main():
                         })
                 
                 progress_bar.progress((i + 1) / len(stocks))
-                time.sleep(0.1)  # API 제한 방지
         
         # 결과 표시
         st.subheader(f"📊 {selected_market} 스크리닝 결과")
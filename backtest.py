@@ -0,0 +1,225 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from indicator_pool import POOL_WORKERS
+from panel_indicators import PANEL_FIELDS, Panel, local_dates, rolling_min, ta_indicators
+from strategy_compiler import STRATEGY_INDICATOR_COLUMNS, STRATEGY_INDICATOR_PARAMS
+
+# 기본 보유 기간 (신호가 난 봉의 종가에 사서 N봉 뒤 종가에 판다고 가정)
+HORIZONS = (1, 5, 20, 60)
+
+# 한 번에 패널로 묶을 종목 수 (지표 중간 배열의 메모리 상한, 프로세스 모드에서는 작업 단위)
+CHUNK_SYMBOLS = 200
+
+
+def strategy_columns(strategy) -> Dict[str, str]:
+    """{전략 컬럼명: ta_indicators 키}: 기본 정의에 전략이 읽는 다른 기간 이동평균(SMA_n → MA_n)을 더함"""
+    columns = dict(STRATEGY_INDICATOR_COLUMNS)
+    for name in strategy.required_indicators():
+        if name.startswith('SMA_') and name[4:].isdigit():
+            columns.setdefault(name, f"MA_{name[4:]}")
+    return columns
+
+
+def strategy_values(panel: Panel, strategy) -> Dict[str, np.ndarray]:
+    """전략이 읽는 지표만 전체 종목 × 전체 봉으로 계산 (ta_indicators 키)"""
+    columns = strategy_columns(strategy)
+    keys = [columns[name] for name in strategy.required_indicators() if name in columns]
+    windows = tuple(int(key[3:]) for key in keys if key.startswith('MA_'))
+    params = dict(STRATEGY_INDICATOR_PARAMS, ma_windows=windows)
+    return ta_indicators(panel, params, oscillators='High' in panel.fields, keys=keys)
+
+
+def forward_arrays(close: np.ndarray, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+    """봉마다 horizon봉 뒤 수익률과 그 사이 최대 낙폭 (둘 다 비율, 뒤 봉이 모자라면 NaN)
+
+    낙폭은 다음 봉부터 horizon봉 뒤까지 종가 최저점의 진입가 대비 하락률입니다 (오르기만 했으면 0).
+    """
+    exit_price = np.full_like(close, np.nan)
+    exit_price[:-horizon] = close[horizon:]
+    lowest = np.full_like(close, np.nan)
+    lowest[:-horizon] = rolling_min(close, horizon)[horizon:]
+    with np.errstate(invalid='ignore'):
+        return exit_price / close - 1, np.minimum(lowest / close - 1, 0.0)
+
+
+def forward_outcomes(close: np.ndarray, signals: np.ndarray, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+    """신호 봉의 forward_arrays 값 (뒤 봉이 모자란 신호는 제외)"""
+    returns, drawdowns = forward_arrays(close, horizon)
+    valid = signals & ~np.isnan(returns)
+    return returns[valid], drawdowns[valid]
+
+
+def panel_from_arrays(inputs: np.ndarray, fields: Sequence[str], spans: List[Tuple[int, int]]) -> Panel:
+    """이어 붙인 OHLCV 배열(필드 × 전체 봉)의 (위치, 길이) 구간들을 종목 0..n-1의 Panel로"""
+    return Panel({
+        j: pd.DataFrame({field: inputs[row, offset:offset + length] for row, field in enumerate(fields)})
+        for j, (offset, length) in enumerate(spans)
+    })
+
+
+def _backtest_arrays(inputs: np.ndarray, fields: Sequence[str], spans: List[Tuple[int, int]],
+                     strategy, horizons: Sequence[int]) -> dict:
+    """구간 종목들을 패널 하나로 백테스트"""
+    panel = panel_from_arrays(inputs, fields, spans)
+    signals = strategy.compile().evaluate_panel(panel, strategy_values(panel, strategy),
+                                                strategy_columns(strategy), dates=True)
+    close = panel['Close']
+    rows, columns = np.nonzero(signals)
+    return {
+        'outcomes': {h: forward_outcomes(close, signals, h) for h in horizons},
+        # 종목별 신호 위치 (각 종목 자기 봉 기준)
+        'positions': (columns, rows - panel.first_row[columns]),
+    }
+
+
+def _run_shared(function, name: str, shape: Tuple[int, int], fields: Sequence[str],
+                spans: List[Tuple[int, int]], args: tuple):
+    """작업 프로세스: 공유 메모리의 OHLCV 구간들로 function(inputs, fields, spans, *args) 실행"""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        inputs = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        result = function(inputs, fields, spans, *args)
+        del inputs
+        return result
+    finally:
+        block.close()
+
+
+def map_chunks(function, frames: Dict[str, pd.DataFrame], args: tuple = (), workers: int = 1,
+               chunk_symbols: int = CHUNK_SYMBOLS) -> Iterator[Tuple[List[str], object]]:
+    """종목을 묶음으로 나눠 function(inputs, fields, spans, *args)을 실행하고 (묶음 종목, 결과)를 순서대로
+
+    inputs는 묶음 종목의 OHLCV를 이어 붙인 (필드 × 봉) 배열, spans는 종목별 (위치, 길이)입니다.
+    workers > 1이면 전체 OHLCV를 공유 메모리에 한 번 올리고 묶음들을 spawn 작업 프로세스에
+    나눠 줍니다 (function은 모듈 최상위 함수, args는 피클 가능해야 함). 프로세스가 모두 일하도록
+    묶음은 작업 프로세스 수 이상으로 나눕니다.
+    """
+    symbols = [s for s, df in frames.items() if df is not None and len(df) >= 2]
+    if not symbols:
+        return
+    fields = [f for f in PANEL_FIELDS if all(f in frames[s].columns for s in symbols)]
+    lengths = np.array([len(frames[s]) for s in symbols], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    spans = list(zip(offsets.tolist(), lengths.tolist()))
+    size = max(1, min(chunk_symbols, -(-len(symbols) // max(1, workers))))
+    chunks = [(start, spans[start:start + size]) for start in range(0, len(spans), size)]
+
+    if workers > 1 and len(chunks) > 1:
+        shape = (len(fields), int(lengths.sum()))
+        block = shared_memory.SharedMemory(create=True, size=shape[0] * shape[1] * 8)
+        try:
+            inputs = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+            for row, field in enumerate(fields):
+                inputs[row] = np.concatenate([frames[s][field].to_numpy(dtype=np.float64) for s in symbols])
+            # Streamlit처럼 스레드가 많은 프로세스에서 fork는 안전하지 않으므로 spawn 사용
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = [(start, len(chunk), pool.submit(_run_shared, function, block.name, shape, fields,
+                                                           chunk, args))
+                           for start, chunk in chunks]
+                for start, count, future in futures:
+                    yield symbols[start:start + count], future.result()
+            del inputs
+        finally:
+            block.close()
+            block.unlink()
+        return
+
+    for start, chunk in chunks:
+        names = symbols[start:start + len(chunk)]
+        inputs = np.stack([np.concatenate([frames[s][field].to_numpy(dtype=np.float64) for s in names])
+                           for field in fields])
+        base = chunk[0][0]
+        yield names, function(inputs, fields, [(offset - base, length) for offset, length in chunk], *args)
+
+
+class BacktestResult:
+    """백테스트 결과: 보유 기간별 신호 수익률/낙폭과 날짜별 신호 수"""
+
+    def __init__(self, horizons: Sequence[int], symbols: int, bars: int):
+        self.horizons = list(horizons)
+        self.symbols = symbols
+        self.bars = bars
+        self.returns = {h: [] for h in self.horizons}
+        self.drawdowns = {h: [] for h in self.horizons}
+        self.signal_dates: List[pd.Index] = []
+        self.signals = 0
+        self.elapsed = 0.0
+
+    def _add(self, partial: dict, symbols: List[str], frames: Dict[str, pd.DataFrame]):
+        for h, (returns, drawdowns) in partial['outcomes'].items():
+            self.returns[h].append(returns)
+            self.drawdowns[h].append(drawdowns)
+        columns, positions = partial['positions']
+        self.signals += len(positions)
+        for j in np.unique(columns):
+            index = frames[symbols[j]].index
+            if isinstance(index, pd.DatetimeIndex):
+                self.signal_dates.append(local_dates(index[positions[columns == j]]))
+
+    def summary(self) -> pd.DataFrame:
+        """보유 기간별 신호 수, 평균/중앙 수익률, 적중률(수익률 > 0), 평균/최대 낙폭 (%)"""
+        rows = []
+        for h in self.horizons:
+            returns = np.concatenate(self.returns[h]) if self.returns[h] else np.empty(0)
+            drawdowns = np.concatenate(self.drawdowns[h]) if self.drawdowns[h] else np.empty(0)
+            count = len(returns)
+            rows.append({
+                '보유기간(봉)': h,
+                '신호 수': count,
+                '평균 수익률(%)': returns.mean() * 100 if count else np.nan,
+                '중앙 수익률(%)': np.median(returns) * 100 if count else np.nan,
+                '적중률(%)': (returns > 0).mean() * 100 if count else np.nan,
+                '평균 낙폭(%)': drawdowns.mean() * 100 if count else np.nan,
+                '최대 낙폭(%)': drawdowns.min() * 100 if count else np.nan,
+            })
+        return pd.DataFrame(rows).set_index('보유기간(봉)')
+
+    def signals_per_date(self) -> pd.Series:
+        """날짜별 신호 종목 수 (시장 현지 날짜)"""
+        if not self.signal_dates:
+            return pd.Series(dtype=np.int64)
+        return pd.Series(np.concatenate([d.to_numpy() for d in self.signal_dates])).value_counts().sort_index()
+
+
+def backtest(strategy, frames: Dict[str, pd.DataFrame], horizons: Sequence[int] = HORIZONS,
+             workers: int = 1, chunk_symbols: int = CHUNK_SYMBOLS) -> BacktestResult:
+    """StrategyBuilder 전략을 모든 종목의 모든 봉에서 평가하고 신호 뒤 수익률을 집계
+
+    t번째 봉의 신호는 그 봉까지 자른 프레임에 evaluate_strategy를 적용한 결과와 같습니다
+    (CompiledStrategy.evaluate_panel). 종목을 chunk_symbols개씩 패널로 묶어 계산하고,
+    workers > 1이면 OHLCV를 공유 메모리에 올려 묶음들을 작업 프로세스에 나눠 줍니다.
+    """
+    started = time.time()
+    frames = {s: df for s, df in frames.items() if df is not None and len(df) >= 2}
+    result = BacktestResult(horizons, len(frames), sum(len(df) for df in frames.values()))
+    for symbols, partial in map_chunks(_backtest_arrays, frames, (strategy, horizons), workers, chunk_symbols):
+        result._add(partial, symbols, frames)
+    result.elapsed = time.time() - started
+    return result
+
+
+if __name__ == "__main__":
+    # 저장소의 모든 종목 이력으로 사전 정의 전략 백테스트 (python backtest.py [프로세스 수])
+    import sys
+
+    from ohlcv_store import get_store
+    from strategy_builder import PresetStrategies
+
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else POOL_WORKERS
+    store = get_store()
+    frames = {symbol: store.load(symbol) for symbol in store.symbols()}
+    presets = {"모멘텀 돌파": PresetStrategies.momentum_breakout(), "과매도 반전": PresetStrategies.oversold_reversal(),
+               "골든 크로스": PresetStrategies.golden_cross()}
+    for name, strategy in presets.items():
+        result = backtest(strategy, frames, workers=workers)
+        print(f"=== {name}: {result.symbols}개 종목, {result.bars}봉, 신호 {result.signals}개 "
+              f"({result.elapsed:.1f}초, 프로세스 {workers}개) ===")
+        print(result.summary().round(2).to_string())
@@ -0,0 +1,94 @@
+"""종목별 요청 vs 일괄 다운로드 벤치마크 (로컬 대체 데이터 소스 사용)
+
+    python bench_bulk_download.py [--latency 0.1] [--per-symbol 0.001] [--with-indicators]
+
+네트워크 없이 재생용 데이터 소스(market_data.ReplayProvider)를 사용합니다.
+요청 한 번에 latency초, 요청에 포함된 종목당 per-symbol초가 걸린다고 가정합니다.
+기본값은 수집 시간만 비교하도록 지표 계산을 생략합니다.
+"""
+import argparse
+import tempfile
+import time
+
+from streamlit import logger as st_logger
+
+st_logger.set_log_level("error")
+
+import fetch_engine
+import market_data
+import ohlcv_store
+import symbol_health
+import ultra_complete_app
+
+CONDITIONS = {"price_momentum": True}
+
+
+def run_screen_fetch(symbols, bulk, batch_size=100):
+    """ultra_screen_stocks와 같은 스크리닝 파이프라인으로 실행하고 저장소에 이력이 있는 종목 수 반환"""
+    stocks = {symbol: symbol for symbol in symbols}
+    for _ in ultra_complete_app.build_screen_pipeline(stocks, CONDITIONS, bulk=bulk, batch_size=batch_size).run():
+        pass
+    store = ohlcv_store.get_store()
+    return sum(store.entry(symbol) is not None for symbol in symbols)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.1, help="요청당 지연 (초)")
+    parser.add_argument("--per-symbol", type=float, default=0.001, help="요청 내 종목당 추가 지연 (초)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 851, 5000])
+    parser.add_argument("--with-indicators", action="store_true", help="지표 계산 시간까지 포함")
+    args = parser.parse_args()
+
+    # 재생용 데이터 소스에는 요청 한도가 없으므로 토큰 버킷을 사실상 해제
+    for market in fetch_engine.MARKET_RATE_LIMITS:
+        fetch_engine.configure_rate_limit(market, 1e9, 1e9)
+
+    if not args.with_indicators:
+        ultra_complete_app.calculate_technical_indicators_fast = lambda df, columns=None: df
+
+    print("=== 일괄 다운로드 벤치마크 ===")
+    print(f"요청당 지연 {args.latency * 1000:.0f}ms, 종목당 {args.per_symbol * 1000:.1f}ms\n")
+    print(f"{'종목 수':>8} | {'방식':<8} | {'요청 수':>7} | {'시간(초)':>8} | {'수집':>6}")
+    print("-" * 50)
+
+    for size in args.sizes:
+        symbols = [f"SYM{i:05d}" for i in range(size)]
+        timings = {}
+
+        # 데이터 생성 비용이 측정에 섞이지 않도록 미리 만들어 둠
+        provider = market_data.ReplayProvider(latency=args.latency, per_symbol=args.per_symbol, days=63)
+        for symbol in symbols:
+            provider.frame(symbol)
+        market_data.set_provider(provider)
+
+        for bulk in (False, True):
+            provider.requests = 0
+
+            with tempfile.TemporaryDirectory() as store_dir:
+                # 빈 저장소에서 시작 (콜드 스크리닝)
+                ohlcv_store._default_store = ohlcv_store.OHLCVStore(store_dir)
+                symbol_health._default_registry = symbol_health.SymbolHealthRegistry(store_dir)
+
+                start = time.perf_counter()
+                fetched = run_screen_fetch(symbols, bulk)
+                elapsed = time.perf_counter() - start
+
+                label = "bulk" if bulk else "종목별"
+                timings[bulk] = (provider.requests, elapsed)
+                print(f"{size:>8} | {label:<8} | {provider.requests:>7} | {elapsed:>8.2f} | {fetched:>6}")
+
+                if bulk:
+                    # 같은 저장소로 다시 스크리닝 (웜 스크리닝)
+                    provider.requests = 0
+                    start = time.perf_counter()
+                    fetched = run_screen_fetch(symbols, bulk)
+                    elapsed = time.perf_counter() - start
+                    print(f"{size:>8} | {'웜 저장소':<8} | {provider.requests:>7} | {elapsed:>8.2f} | {fetched:>6}")
+
+        (req_single, t_single), (req_bulk, t_bulk) = timings[False], timings[True]
+        print(f"{'':>8}   요청 수 {req_single / req_bulk:.0f}배 감소, 시간 {t_single / t_bulk:.1f}배 단축\n")
+
+
+if __name__ == "__main__":
+    main()
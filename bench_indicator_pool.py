@@ -0,0 +1,65 @@
+"""지표 계산: 스레드 풀 vs 프로세스 풀(공유 메모리) 벤치마크
+
+    python bench_indicator_pool.py [--sizes 851 10000] [--days 63] [--workers 8]
+
+재생용 데이터 소스(market_data.ReplayProvider)의 생성 시세로 종목별 지표 계산 시간만 측정합니다.
+- 스레드: 기존 방식처럼 수집 스레드 풀에서 calculate_technical_indicators_fast 실행 (GIL로 직렬화)
+- 프로세스: indicator_pool.IndicatorProcessPool (종가/거래량을 공유 메모리 배열로 전달)
+프로세스 풀 시작 비용은 측정 전에 한 번 실행해 제외합니다. 속도 향상은 CPU 코어 수에 비례합니다.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit import logger as st_logger
+
+st_logger.set_log_level("error")
+
+import market_data
+from indicator_pool import IndicatorProcessPool
+from ultra_complete_app import FAST_INDICATOR_COLUMNS, calculate_technical_indicators_fast, optimize_stock_frame
+
+
+def run_threads(frames, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda df: calculate_technical_indicators_fast(df.copy()), frames.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[851, 10000])
+    parser.add_argument("--days", type=int, default=63, help="종목당 봉 수 (3mo ≈ 63)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="프로세스 수")
+    parser.add_argument("--threads", type=int, default=20, help="스레드 풀 크기 (기존 수집 스레드 수)")
+    args = parser.parse_args()
+
+    pool = IndicatorProcessPool(workers=args.workers)
+    provider = market_data.ReplayProvider(days=args.days)
+
+    print("=== 지표 계산 프로세스 풀 벤치마크 ===")
+    print(f"CPU {os.cpu_count()}개, 프로세스 {args.workers}개, 스레드 {args.threads}개, 종목당 {args.days}봉\n")
+    print(f"{'종목 수':>8} | {'방식':<6} | {'시간(초)':>8} | {'종목/초':>8}")
+    print("-" * 42)
+
+    try:
+        pool.attach({"WARMUP": optimize_stock_frame(provider.frame("WARMUP"))}, FAST_INDICATOR_COLUMNS)
+        for size in args.sizes:
+            frames = {f"SYM{i:05d}": optimize_stock_frame(provider.frame(f"SYM{i:05d}")) for i in range(size)}
+
+            start = time.perf_counter()
+            run_threads(frames, args.threads)
+            t_threads = time.perf_counter() - start
+            print(f"{size:>8} | {'스레드':<6} | {t_threads:>8.2f} | {size / t_threads:>8.0f}")
+
+            start = time.perf_counter()
+            pool.attach(frames, FAST_INDICATOR_COLUMNS)
+            t_pool = time.perf_counter() - start
+            print(f"{size:>8} | {'프로세스':<6} | {t_pool:>8.2f} | {size / t_pool:>8.0f}")
+            print(f"{'':>8}   {t_threads / t_pool:.1f}배\n")
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""스크리닝 처리량 벤치마크 (합성 종목 유니버스, 기준값 대비 회귀 검사)
+
+    python bench_screening.py [--sizes 100 851 5000 20000] [--targets ultra cloud complete strategy]
+    python bench_screening.py --save-baseline      # 이번 결과를 기준값으로 저장
+    python bench_screening.py --compare            # 기준값보다 나빠졌거나 실행이 실패한 항목이 있으면 종료 코드 1
+
+재생용 데이터 소스(market_data.ReplayProvider)의 생성 시세로 KOSPI/KOSDAQ/미국 종목을 섞은 유니버스를 만들고,
+임시 저장소에 미리 받아 둔 뒤(측정 제외) 각 스크리닝 진입점을 화면 없이 실행합니다.
+- ultra: ultra_complete_app.ultra_screen_stocks (앱 기본값인 전체 종목 벡터 연산)
+- cloud: cloud_complete_app.screen_stocks_batch
+- complete: complete_app.CompleteStockScreener.screen_stocks
+- strategy: StrategyBuilder.evaluate_strategy (지표를 붙인 프레임에 종목별 호출, 모멘텀 돌파 전략)
+
+진입점 × 종목 수마다 새 프로세스에서 실행하므로 캐시가 섞이지 않고 최대 메모리(peak RSS)도 따로 잽니다.
+종목별 지연은 그 종목의 데이터 요청을 시작한 때부터 스크리닝 결과가 나온 때까지입니다
+(묶음으로 계산하는 방식은 묶음이 끝날 때까지 기다린 시간 포함).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# 결과를 저장/비교하는 기준값 파일 (장비마다 다르므로 저장소에 올리지 않음)
+BASELINE_PATH = "bench_baseline.json"
+
+# 기준값 대비 허용 범위: 처리량은 이 비율 넘게 줄면, 지연/메모리는 이 비율 넘게 늘면 회귀
+TOLERANCE = 0.25
+
+# 측정 잡음 하한 (이보다 작은 차이는 비율이 커도 회귀로 보지 않음)
+LATENCY_FLOOR_MS = 1.0
+RSS_FLOOR_MB = 20.0
+
+# 종목당 봉 수 (스크리닝 기본 조회 기간 3mo보다 넉넉하게)
+DAYS = 126
+
+TARGETS = {
+    "ultra": "ultra_screen_stocks",
+    "cloud": "screen_stocks_batch",
+    "complete": "CompleteStockScreener.screen_stocks",
+    "strategy": "StrategyBuilder.evaluate_strategy",
+}
+
+# 시장별 종목 코드 (실제 종목 리스트 비율과 비슷하게 미국 절반)
+MARKETS = (("KOSPI", "{:06d}.KS"), ("KOSDAQ", "{:06d}.KQ"), ("NASDAQ", "U{:05d}"), ("S&P 500", "V{:05d}"))
+
+
+def universe(size: int) -> Dict[str, List[str]]:
+    """{시장: 종목 코드 목록} 합성 유니버스"""
+    markets = {name: [] for name, _ in MARKETS}
+    for i in range(size):
+        name, pattern = MARKETS[i % len(MARKETS)]
+        markets[name].append(pattern.format(i))
+    return markets
+
+
+class LatencyRecorder:
+    """종목별 처리 시작/결과 시각 (처음 기록한 값만)"""
+
+    def __init__(self):
+        self.started: Dict[str, float] = {}
+        self.finished: Dict[str, float] = {}
+
+    def start(self, symbols):
+        now = time.perf_counter()
+        for symbol in symbols:
+            self.started.setdefault(symbol, now)
+
+    def finish(self, symbols):
+        now = time.perf_counter()
+        for symbol in symbols:
+            self.finished.setdefault(symbol, now)
+
+    def latencies_ms(self) -> np.ndarray:
+        return np.array([(self.finished[s] - self.started[s]) * 1000 for s in self.finished if s in self.started])
+
+
+def _reset_peak_rss() -> bool:
+    """이 프로세스의 최대 RSS 기록을 지금 값으로 (리눅스 /proc/self/clear_refs, 안 되면 False)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _use_local_data(store_root: str):
+    """재생용 데이터 소스 + store_root 저장소 (요청 한도 해제)"""
+    from streamlit import logger as st_logger
+    st_logger.set_log_level("error")
+
+    import fetch_engine
+    import market_data
+    import ohlcv_store
+    import symbol_health
+
+    market_data.set_provider(market_data.ReplayProvider(days=DAYS))
+    for market in fetch_engine.MARKET_RATE_LIMITS:
+        fetch_engine.configure_rate_limit(market, 1e9, 1e9)
+    ohlcv_store._default_store = ohlcv_store.OHLCVStore(store_root)
+    symbol_health._default_registry = symbol_health.SymbolHealthRegistry(store_root)
+
+
+def prepare_store(markets: Dict[str, List[str]], store_root: str):
+    """유니버스 전체 종목 이력을 저장소에 미리 받아 둠 (스크리닝은 저장소에서 읽음)"""
+    _use_local_data(store_root)
+    from ohlcv_store import get_store
+
+    symbols = [symbol for symbols in markets.values() for symbol in symbols]
+    get_store().refresh_many(symbols, period="3mo")
+    get_store().flush()
+
+
+def _run_ultra(markets, recorder):
+    import ultra_complete_app as app
+
+    stocks = {symbol: symbol for symbols in markets.values() for symbol in symbols}
+    load_bulk, load_single, build = app.load_raw_stock_data_bulk, app.load_raw_stock_data, app.build_screen_pipeline
+
+    def load_raw_stock_data_bulk(symbols, *args, **kwargs):
+        recorder.start(symbols)
+        return load_bulk(symbols, *args, **kwargs)
+
+    def load_raw_stock_data(symbol, *args, **kwargs):
+        recorder.start([symbol])
+        return load_single(symbol, *args, **kwargs)
+
+    def build_screen_pipeline(*args, **kwargs):
+        pipeline = build(*args, **kwargs)
+        run = pipeline.run
+
+        def timed_run():
+            for symbol, row in run():
+                recorder.finish([symbol])
+                yield symbol, row
+        pipeline.run = timed_run
+        return pipeline
+
+    app.load_raw_stock_data_bulk, app.load_raw_stock_data = load_raw_stock_data_bulk, load_raw_stock_data
+    app.build_screen_pipeline = build_screen_pipeline
+    conditions = {"bb_breakout": True, "rsi_condition": {"type": "미만", "value": 70}}
+    return len(app.ultra_screen_stocks(stocks, conditions, engine="panel"))
+
+
+def _run_cloud(markets, recorder):
+    import cloud_complete_app as app
+
+    stocks = {symbol: symbol for symbols in markets.values() for symbol in symbols}
+    load = app.get_stock_data_optimized
+    previous = []
+
+    def get_stock_data_optimized(symbol, *args, **kwargs):
+        # 종목을 하나씩 처리하므로 다음 종목을 요청할 때 이전 종목의 조건 확인까지 끝난 것
+        recorder.finish(previous)
+        previous[:] = [symbol]
+        recorder.start([symbol])
+        return load(symbol, *args, **kwargs)
+
+    app.get_stock_data_optimized = get_stock_data_optimized
+    conditions = {"bb_breakout": True, "rsi_condition": {"type": "미만", "value": 70}}
+    results = app.screen_stocks_batch(stocks, conditions)
+    recorder.finish(previous)
+    return len(results)
+
+
+def _run_complete(markets, recorder):
+    from complete_app import CompleteStockScreener
+
+    screener = CompleteStockScreener.__new__(CompleteStockScreener)
+    screener.markets = {market: [{'symbol': s, 'name': s} for s in symbols] for market, symbols in markets.items()}
+    load, analyze = screener.get_stock_data, screener.analyze_stocks
+
+    def get_stock_data(symbol, *args, **kwargs):
+        recorder.start([symbol])
+        return load(symbol, *args, **kwargs)
+
+    def analyze_stocks(frames, infos):
+        analyses = analyze(frames, infos)
+        recorder.finish(frames)
+        return analyses
+
+    screener.get_stock_data, screener.analyze_stocks = get_stock_data, analyze_stocks
+    conditions = {'bb_breakout': True, 'rsi_filter': False, 'rsi_min': 0, 'rsi_max': 100,
+                  'volume_surge': False, 'uptrend': False}
+    return len(screener.screen_stocks(list(markets), conditions))
+
+
+def _prepare_strategy(markets):
+    """지표를 붙인 프레임 (측정 제외, 고급 대시보드와 같은 계산)"""
+    from advanced_dashboard import AdvancedStockScreener
+    from ohlcv_store import load_history
+
+    screener = AdvancedStockScreener.__new__(AdvancedStockScreener)
+    frames = {symbol: load_history(symbol, "6mo") for symbols in markets.values() for symbol in symbols}
+    return screener.calculate_technical_indicators_many({s: df for s, df in frames.items() if df is not None})
+
+
+def _run_strategy(frames, recorder):
+    from strategy_builder import PresetStrategies
+
+    strategy = PresetStrategies.momentum_breakout()
+    matched = 0
+    for symbol, df in frames.items():
+        recorder.start([symbol])
+        matched += strategy.evaluate_strategy(df)
+        recorder.finish([symbol])
+    return matched
+
+
+def run_target(target: str, size: int, store_root: str) -> dict:
+    """진입점 하나를 size개 종목 유니버스로 실행한 측정값 (store_root는 prepare_store로 채운 저장소)"""
+    _use_local_data(store_root)
+    markets = universe(size)
+    recorder = LatencyRecorder()
+    if target == "strategy":
+        frames = _prepare_strategy(markets)
+        run = lambda: _run_strategy(frames, recorder)
+    else:
+        run = lambda: {"ultra": _run_ultra, "cloud": _run_cloud, "complete": _run_complete}[target](markets, recorder)
+
+    peak_reset = _reset_peak_rss()
+    started = time.perf_counter()
+    matched = run()
+    elapsed = time.perf_counter() - started
+    latencies = recorder.latencies_ms()
+    return {
+        "target": target,
+        "size": size,
+        "elapsed": elapsed,
+        "symbols_per_sec": size / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else float("nan"),
+        "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else float("nan"),
+        "peak_rss_mb": _peak_rss_mb(),
+        "peak_rss_scope": "run" if peak_reset else "process",
+        "screened": len(latencies),
+        "matched": int(matched),
+    }
+
+
+def compare(results: List[dict], baseline: dict, tolerance: float = TOLERANCE,
+            expected: Optional[List[str]] = None) -> List[str]:
+    """기준값보다 나빠진 항목 설명 목록 (기준값에 없는 진입점/종목 수는 건너뜀)
+
+    expected("진입점/종목 수" 목록, 이번에 실행한 항목)를 주면 그중 기준값에 있는데 결과가 없는 항목도 회귀입니다.
+    """
+    regressions = []
+    measured = {f"{result['target']}/{result['size']}" for result in results}
+    for key in expected or []:
+        if key in baseline.get("results", {}) and key not in measured:
+            target, size = key.split("/")
+            regressions.append(f"{target} {size}개: 결과 없음")
+    for result in results:
+        base = baseline.get("results", {}).get(f"{result['target']}/{result['size']}")
+        if base is None:
+            continue
+        name = f"{result['target']} {result['size']}개"
+        if result["symbols_per_sec"] < base["symbols_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: 처리량 {base['symbols_per_sec']:.0f} → {result['symbols_per_sec']:.0f} 종목/초")
+        for key, floor, unit in (("p50_ms", LATENCY_FLOOR_MS, "ms"), ("p99_ms", LATENCY_FLOOR_MS, "ms"),
+                                 ("peak_rss_mb", RSS_FLOOR_MB, "MB")):
+            if result[key] > base[key] * (1 + tolerance) + floor:
+                regressions.append(f"{name}: {key} {base[key]:.1f} → {result[key]:.1f}{unit}")
+    return regressions
+
+
+def save_baseline(results: List[dict], path: str = BASELINE_PATH):
+    """결과를 기준값 파일에 병합 저장 (같은 진입점/종목 수는 덮어씀)"""
+    baseline = load_baseline(path) or {"results": {}}
+    baseline["meta"] = {"cpu": os.cpu_count(), "python": platform.python_version(),
+                        "machine": platform.machine(), "saved": datetime.now().isoformat(timespec="seconds")}
+    for result in results:
+        baseline["results"][f"{result['target']}/{result['size']}"] = result
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+
+
+def load_baseline(path: str = BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 851, 5000, 20000])
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="기준값 파일")
+    parser.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    parser.add_argument("--compare", action="store_true", help="기준값보다 나빠지면 종료 코드 1")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="허용 비율 (기본 0.25)")
+    parser.add_argument("--child", nargs=3, metavar=("TARGET", "SIZE", "STORE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # 진입점 하나만 실행하는 측정용 프로세스: 결과를 JSON 한 줄로
+        target, size, store_root = args.child
+        if target == "prepare":
+            prepare_store(universe(int(size)), store_root)
+        else:
+            print(json.dumps(run_target(target, int(size), store_root)))
+        return
+
+    print("=== 스크리닝 처리량 벤치마크 ===")
+    print(f"CPU {os.cpu_count()}개, 종목당 {DAYS}봉 (재생용 데이터, 미리 받아 둔 저장소)\n")
+    print(f"{'진입점':<10} | {'종목 수':>7} | {'시간(초)':>8} | {'종목/초':>8} | {'p50(ms)':>9} | {'p99(ms)':>9} | "
+          f"{'peak RSS(MB)':>12} | {'매칭':>6}")
+    print("-" * 92)
+
+    results, failed = [], []
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as store_root:
+            prepare = subprocess.run([sys.executable, __file__, "--child", "prepare", str(size), store_root],
+                                     capture_output=True, text=True)
+            if prepare.returncode != 0:
+                print(prepare.stderr)
+                sys.exit(prepare.returncode)
+            for target in args.targets:
+                child = subprocess.run([sys.executable, __file__, "--child", target, str(size), store_root],
+                                       capture_output=True, text=True)
+                if child.returncode != 0:
+                    print(f"{target:<10} | {size:>7} | 실패\n{child.stderr[-2000:]}")
+                    failed.append(f"{target} {size}개: 실행 실패 (종료 코드 {child.returncode})")
+                    continue
+                result = json.loads(child.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(f"{target:<10} | {size:>7} | {result['elapsed']:>8.2f} | {result['symbols_per_sec']:>8.0f} | "
+                      f"{result['p50_ms']:>9.1f} | {result['p99_ms']:>9.1f} | {result['peak_rss_mb']:>12.0f} | "
+                      f"{result['matched']:>6}")
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\n기준값 저장: {args.baseline}")
+    if args.compare:
+        baseline = load_baseline(args.baseline)
+        if baseline is None:
+            print(f"\n❌ 기준값 파일이 없습니다: {args.baseline} (--save-baseline으로 먼저 저장)")
+            sys.exit(2)
+        # 실행이 실패한 항목은 기준값 유무와 관계없이 회귀
+        expected = [f"{target}/{size}" for size in args.sizes for target in args.targets]
+        regressions = failed + compare(results, baseline, args.tolerance, expected)
+        if regressions:
+            print(f"\n❌ 기준값 대비 회귀 {len(regressions)}건 (허용 {args.tolerance:.0%})")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\n✅ 기준값 대비 회귀 없음 (허용 {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
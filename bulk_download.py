@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Optional
+
+from market_data import get_provider
+
+# 일괄 다운로드 결과에서 사용하는 OHLCV 컬럼
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def chunk_symbols(symbols: List[str], chunk_size: int = 100) -> List[List[str]]:
+    """시장(KRX/미국)별로 묶은 뒤 chunk_size 단위로 분할
+
+    같은 요청 안에 거래일이 다른 시장이 섞이면 넓은 프레임에 빈 행이 많이 생기므로
+    한국(.KS/.KQ)과 미국 종목을 따로 묶습니다.
+    """
+    korean = [s for s in symbols if s.endswith(('.KS', '.KQ'))]
+    others = [s for s in symbols if not s.endswith(('.KS', '.KQ'))]
+
+    chunks = []
+    for group in (korean, others):
+        for i in range(0, len(group), chunk_size):
+            chunks.append(group[i:i + chunk_size])
+    return chunks
+
+
+def split_bulk_frame(data: Optional[pd.DataFrame], symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """group_by="ticker"로 받은 넓은 프레임을 종목별 OHLCV 프레임으로 분리
+
+    종목마다 pandas 인덱싱을 반복하지 않도록 한 번에 (날짜, 종목, 필드) 배열로 바꾼 뒤 자릅니다.
+    가격은 float32, 거래량은 int64로 반환합니다.
+    """
+    frames = {}
+    if data is None or data.empty:
+        return frames
+
+    if not isinstance(data.columns, pd.MultiIndex):
+        # 단일 종목 요청은 (구버전 yfinance에서) 단일 레벨 컬럼으로 반환됨
+        if len(symbols) == 1:
+            data = pd.concat({symbols[0]: data}, axis=1)
+        else:
+            return frames
+
+    available = set(data.columns.get_level_values(0))
+    present = [s for s in symbols if s in available]
+    if not present:
+        return frames
+
+    columns = pd.MultiIndex.from_product([present, OHLCV_COLUMNS])
+    values = data.reindex(columns=columns).to_numpy(dtype=np.float64)
+    values = values.reshape(len(data.index), len(present), len(OHLCV_COLUMNS))
+
+    # 다른 종목의 거래일 때문에 생긴 빈 행 제거
+    valid = ~np.isnan(values[:, :, OHLCV_COLUMNS.index('Close')])
+
+    for i, symbol in enumerate(present):
+        rows = valid[:, i]
+        if not rows.any():
+            continue
+
+        block = values[rows, i, :]
+        frames[symbol] = pd.DataFrame({
+            'Open': block[:, 0].astype(np.float32),
+            'High': block[:, 1].astype(np.float32),
+            'Low': block[:, 2].astype(np.float32),
+            'Close': block[:, 3].astype(np.float32),
+            'Volume': np.nan_to_num(block[:, 4]).astype(np.int64)
+        }, index=data.index[rows])
+
+    return frames
+
+
+def download_bulk(symbols: List[str], period: str = "3mo", interval: str = "1d",
+                  chunk_size: int = 100, downloader: Callable = None,
+                  start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """여러 종목을 요청당 chunk_size개씩 묶어서 다운로드
+
+    start가 주어지면 period 대신 [start, end) 구간을 요청합니다 (end 생략 시 최근까지).
+    downloader가 없으면 현재 데이터 소스(market_data.get_provider())의 download를 사용하며,
+    시장별 요청 한도는 데이터 소스가 처리합니다.
+    반환값은 {symbol: OHLCV DataFrame}이며 데이터가 없는 종목은 포함되지 않습니다.
+    """
+    if downloader is None:
+        downloader = get_provider().download
+
+    if start is not None:
+        window = {'start': start, 'end': end}
+    else:
+        window = {'period': period}
+
+    frames = {}
+    for chunk in chunk_symbols(list(symbols), chunk_size):
+        data = downloader(
+            chunk,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=True,
+            actions=False,
+            threads=True,
+            progress=False,
+            **window
+        )
+        frames.update(split_bulk_frame(data, chunk))
+
+    return frames
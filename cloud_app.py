@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import ta
@@ -9,6 +8,11 @@ from datetime import datetime, timedelta
 import json
 import os
 import time
+from ohlcv_store import load_history
+from single_flight import single_flight
+from market_calendar import cache_token
+from indicator_cache import cached_indicators, get_indicator_cache
+from indicator_core import INDICATOR_PARAMS
 
 # 페이지 설정
 st.set_page_config(
@@ -101,16 +105,16 @@ def load_stock_lists():
     
     return default_stocks
 
-# 기술적 지표 계산
-@st.cache_data(ttl=300)  # 5분 캐시
+# 기술적 지표 계산 (입력 프레임 해시 대신 (종목, 주기, 구간, 파라미터) 키로 캐시)
+@cached_indicators(INDICATOR_PARAMS)
 def calculate_technical_indicators(df):
     """기술적 지표를 계산합니다."""
     if len(df) < 50:  # 충분한 데이터가 없으면 계산하지 않음
         return df
     
     # 볼린저 밴드
-    bb_period = 20
-    bb_std = 2
+    bb_period = INDICATOR_PARAMS['bb_period']
+    bb_std = INDICATOR_PARAMS['bb_std']
     df['BB_Middle'] = df['Close'].rolling(window=bb_period).mean()
     rolling_std = df['Close'].rolling(window=bb_period).std()
     df['BB_Upper'] = df['BB_Middle'] + (rolling_std * bb_std)
@@ -118,48 +122,55 @@ def calculate_technical_indicators(df):
     
     # RSI
     try:
-        df['RSI'] = ta.momentum.RSIIndicator(df['Close'], window=14).rsi()
+        df['RSI'] = ta.momentum.RSIIndicator(df['Close'], window=INDICATOR_PARAMS['rsi_window']).rsi()
     except:
         delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        gain = (delta.where(delta > 0, 0)).rolling(window=INDICATOR_PARAMS['rsi_window']).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=INDICATOR_PARAMS['rsi_window']).mean()
         rs = gain / loss
         df['RSI'] = 100 - (100 / (1 + rs))
     
     # MACD
+    macd_fast, macd_slow, macd_signal = INDICATOR_PARAMS['macd']
     try:
-        macd_ind = ta.trend.MACD(df['Close'])
+        macd_ind = ta.trend.MACD(df['Close'], window_slow=macd_slow, window_fast=macd_fast, window_sign=macd_signal)
         df['MACD'] = macd_ind.macd()
         df['MACD_Signal'] = macd_ind.macd_signal()
         df['MACD_Histogram'] = macd_ind.macd_diff()
     except:
-        exp1 = df['Close'].ewm(span=12).mean()
-        exp2 = df['Close'].ewm(span=26).mean()
+        exp1 = df['Close'].ewm(span=macd_fast).mean()
+        exp2 = df['Close'].ewm(span=macd_slow).mean()
         df['MACD'] = exp1 - exp2
-        df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
+        df['MACD_Signal'] = df['MACD'].ewm(span=macd_signal).mean()
         df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
     
     # 이동평균
-    df['MA_20'] = df['Close'].rolling(window=20).mean()
-    df['MA_50'] = df['Close'].rolling(window=50).mean()
+    for window in INDICATOR_PARAMS['ma_windows']:
+        df[f'MA_{window}'] = df['Close'].rolling(window=window).mean()
     
     # 거래량 평균
-    df['Volume_MA'] = df['Volume'].rolling(window=20).mean()
+    df['Volume_MA'] = df['Volume'].rolling(window=INDICATOR_PARAMS['volume_ma']).mean()
     
     return df
 
 # 주식 데이터 가져오기
-@st.cache_data(ttl=300)  # 5분 캐시
 def get_stock_data(symbol, period="3mo"):
     """주식 데이터를 가져옵니다."""
+    return _get_stock_data_cached(symbol, period, cache_token(symbol))
+
+# 고정 TTL 대신 거래소 달력 기준 캐시: session 값은 장 마감 후에는 다음 장까지 고정되고
+# 장중에는 5분마다 바뀜 (바뀌어도 저장소가 진행 중인 마지막 봉만 다시 받음)
+@st.cache_data(max_entries=5000)
+@single_flight()  # 동시에 같은 종목을 요청하는 세션끼리 한 번만 수집
+def _get_stock_data_cached(symbol, period, session):
     try:
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=period)
+        # 저장소 우선 조회 (장중에는 진행 중인 마지막 봉만 요청)
+        df = load_history(symbol, period=period)
         
-        if df.empty:
+        if df is None or df.empty:
             return None
             
-        df = calculate_technical_indicators(df)
+        df = calculate_technical_indicators(df, symbol)
         return df
     except Exception as e:
         st.error(f"데이터 가져오기 실패 ({symbol}): {str(e)}")
@@ -332,6 +343,9 @@ def main():
     
     selected_stocks = stock_lists[market]
     st.sidebar.write(f"선택된 시장: **{market}** ({len(selected_stocks)}개 종목)")
+    cache_stats = get_indicator_cache().stats()
+    st.sidebar.caption(f"지표 캐시 적중률 {cache_stats['hit_rate']:.0%} "
+                       f"(적중 {cache_stats['hits']} / 미스 {cache_stats['misses']})")
     
     # 조건 설정
     st.sidebar.subheader("🎯 스크리닝 조건")
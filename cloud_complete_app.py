@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import ta
@@ -9,6 +8,12 @@ from datetime import datetime, timedelta
 import json
 import os
 import time
+from ohlcv_store import get_store, load_history
+from single_flight import single_flight
+from market_calendar import cache_token
+from indicator_cache import cached_indicators, get_indicator_cache
+from indicator_core import INDICATOR_PARAMS
+from streaming_indicators import get_streaming_indicators
 
 # 페이지 설정
 st.set_page_config(
@@ -104,8 +109,8 @@ def get_fallback_stock_lists():
     st.error("🚨 샘플 데이터 호출됨! 이는 오류입니다!")
     st.stop()
 
-# 캐시된 기술적 지표 계산
-@st.cache_data(ttl=600)  # 10분 캐시
+# 캐시된 기술적 지표 계산 (입력 프레임 해시 대신 (종목, 주기, 구간, 파라미터) 키로 캐시)
+@cached_indicators(INDICATOR_PARAMS)
 def calculate_technical_indicators(df):
     """메모리 효율적인 기술적 지표 계산"""
     try:
@@ -113,8 +118,8 @@ def calculate_technical_indicators(df):
             return df
         
         # 볼린저 밴드 (20, 2)
-        bb_period = 20
-        bb_std = 2
+        bb_period = INDICATOR_PARAMS['bb_period']
+        bb_std = INDICATOR_PARAMS['bb_std']
         df['BB_Middle'] = df['Close'].rolling(window=bb_period).mean()
         rolling_std = df['Close'].rolling(window=bb_period).std()
         df['BB_Upper'] = df['BB_Middle'] + (rolling_std * bb_std)
@@ -122,31 +127,32 @@ def calculate_technical_indicators(df):
         
         # RSI (14일)
         try:
-            df['RSI'] = ta.momentum.RSIIndicator(df['Close'], window=14).rsi()
+            df['RSI'] = ta.momentum.RSIIndicator(df['Close'], window=INDICATOR_PARAMS['rsi_window']).rsi()
         except:
             delta = df['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+            gain = (delta.where(delta > 0, 0)).rolling(window=INDICATOR_PARAMS['rsi_window']).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=INDICATOR_PARAMS['rsi_window']).mean()
             rs = gain / loss
             df['RSI'] = 100 - (100 / (1 + rs))
         
         # MACD
+        macd_fast, macd_slow, macd_signal = INDICATOR_PARAMS['macd']
         try:
-            macd_ind = ta.trend.MACD(df['Close'])
+            macd_ind = ta.trend.MACD(df['Close'], window_slow=macd_slow, window_fast=macd_fast, window_sign=macd_signal)
             df['MACD'] = macd_ind.macd()
             df['MACD_Signal'] = macd_ind.macd_signal()
         except:
-            exp1 = df['Close'].ewm(span=12).mean()
-            exp2 = df['Close'].ewm(span=26).mean()
+            exp1 = df['Close'].ewm(span=macd_fast).mean()
+            exp2 = df['Close'].ewm(span=macd_slow).mean()
             df['MACD'] = exp1 - exp2
-            df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
+            df['MACD_Signal'] = df['MACD'].ewm(span=macd_signal).mean()
         
         # 이동평균
-        df['MA_20'] = df['Close'].rolling(window=20).mean()
-        df['MA_50'] = df['Close'].rolling(window=50).mean()
+        for window in INDICATOR_PARAMS['ma_windows']:
+            df[f'MA_{window}'] = df['Close'].rolling(window=window).mean()
         
         # 거래량 평균
-        df['Volume_MA'] = df['Volume'].rolling(window=20).mean()
+        df['Volume_MA'] = df['Volume'].rolling(window=INDICATOR_PARAMS['volume_ma']).mean()
         
         return df
         
@@ -155,14 +161,20 @@ def calculate_technical_indicators(df):
         return df
 
 # 메모리 효율적인 주식 데이터 가져오기
-@st.cache_data(ttl=300)  # 5분 캐시
 def get_stock_data_optimized(symbol, period="3mo"):
     """메모리 최적화된 주식 데이터 수집"""
+    return _get_stock_data_optimized_cached(symbol, period, cache_token(symbol))
+
+# 고정 TTL 대신 거래소 달력 기준 캐시: session 값은 장 마감 후에는 다음 장까지 고정되고
+# 장중에는 5분마다 바뀜 (바뀌어도 저장소가 진행 중인 마지막 봉만 다시 받음)
+@st.cache_data(max_entries=5000)
+@single_flight()  # 동시에 같은 종목을 요청하는 세션끼리 한 번만 수집
+def _get_stock_data_optimized_cached(symbol, period, session):
     try:
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=period)
+        # 저장소 우선 조회 (더 긴 이력은 잘라서 반환, 모자란 앞부분/워터마크 이후 봉만 요청)
+        df = load_history(symbol, period=period)
         
-        if df.empty:
+        if df is None or df.empty:
             return None
             
         # 메모리 사용량 최소화
@@ -174,12 +186,40 @@ def get_stock_data_optimized(symbol, period="3mo"):
             'Volume': 'int64'
         })
         
-        df = calculate_technical_indicators(df)
+        df = calculate_technical_indicators(df, symbol)
         return df
         
     except Exception as e:
         return None
 
+# 장중 빠른 갱신에서 이어서 계산하는 지표 (calculate_technical_indicators와 같은 컬럼)
+REFRESH_COLUMNS = ['BB_Middle', 'BB_Upper', 'BB_Lower', 'RSI', 'MACD', 'MACD_Signal',
+                   'MA_20', 'MA_50', 'Volume_MA']
+
+def get_batch_data_refreshed(symbols, period="3mo"):
+    """장중 빠른 갱신: 배치 전체를 한 번에 최근 봉만 받아 붙이고 지표는 종목별 스트리밍 상태에 새 봉만 반영
+
+    조건 확인 함수들은 마지막 두 봉만 읽으므로 마지막 두 봉 + 지표 프레임을 반환합니다 (봉이 50개 미만인 종목은 제외).
+    """
+    stock_data = {}
+    frames = get_store().refresh_many(symbols, period=period, chunk_size=max(len(symbols), 1))
+    engine = get_streaming_indicators()
+    for symbol, df in frames.items():
+        if len(df) < 50:
+            continue
+        try:
+            df = df.astype({
+                'Open': 'float32',
+                'High': 'float32',
+                'Low': 'float32',
+                'Close': 'float32',
+                'Volume': 'int64'
+            })
+            stock_data[symbol] = engine.tail_frame(symbol, df, REFRESH_COLUMNS)
+        except Exception:
+            continue
+    return stock_data
+
 # 조건 확인 함수들
 def check_bb_breakout(df):
     """볼린저 밴드 상단 돌파 확인"""
@@ -221,8 +261,11 @@ def check_volume_surge(df, multiplier=1.5):
     return latest['Volume'] > latest['Volume_MA'] * multiplier
 
 # 배치 스크리닝 (메모리 효율적)
-def screen_stocks_batch(stocks, conditions, batch_size=20):
-    """배치 단위로 메모리 효율적 스크리닝"""
+def screen_stocks_batch(stocks, conditions, batch_size=20, refresh=False):
+    """배치 단위로 메모리 효율적 스크리닝
+
+    refresh=True면 배치마다 저장된 이력에 최근 봉만 일괄로 받아 붙여 씁니다.
+    """
     
     # 상세한 디버깅 정보
     st.info(f"🔍 **DEBUG**: stocks 타입: {type(stocks)}, 길이: {len(stocks) if hasattr(stocks, '__len__') else 'N/A'}")
@@ -265,9 +308,13 @@ def screen_stocks_batch(stocks, conditions, batch_size=20):
             st.error(f"stocks 내용 샘플: {list(stocks.keys())[:5] if hasattr(stocks, 'keys') else 'N/A'}")
             return []
         
+        # 장중 빠른 갱신은 마지막 두 봉 프레임
+        min_rows = 2 if refresh else 20
+        
         # 배치 단위로 처리
         for i in range(0, total_stocks, batch_size):
             batch = stock_items[i:i+batch_size]
+            refreshed = get_batch_data_refreshed([symbol for symbol, _ in batch]) if refresh else None
             
             for symbol, name in batch:
                 processed += 1
@@ -276,8 +323,8 @@ def screen_stocks_batch(stocks, conditions, batch_size=20):
                 status_text.text(f"분석 중: {name} ({symbol}) - {processed}/{total_stocks}")
                 
                 try:
-                    df = get_stock_data_optimized(symbol)
-                    if df is None or len(df) < 20:
+                    df = refreshed.get(symbol) if refresh else get_stock_data_optimized(symbol)
+                    if df is None or len(df) < min_rows:
                         continue
                     
                     # 조건 확인
@@ -316,9 +363,6 @@ def screen_stocks_batch(stocks, conditions, batch_size=20):
                 except Exception as stock_error:
                     # 개별 종목 에러는 무시하고 계속 진행
                     continue
-            
-            # 배치 완료 후 잠시 대기 (메모리 정리)
-            time.sleep(0.1)
     
     except Exception as e:
         st.error(f"❌ 스크리닝 중 전체 오류 발생: {str(e)}")
@@ -454,6 +498,9 @@ def main():
         if isinstance(selected_stocks, dict) and selected_stocks:
             first_item = list(selected_stocks.items())[0]
             st.write(f"**첫 번째 종목**: {first_item}")
+        cache_stats = get_indicator_cache().stats()
+        st.write(f"**지표 캐시**: 적중 {cache_stats['hits']} / 미스 {cache_stats['misses']} "
+                 f"({cache_stats['hit_rate']:.0%}), {cache_stats['bytes'] / 1024:.0f}KB")
     
     # 조건 설정
     st.sidebar.subheader("🎯 스크리닝 조건")
@@ -475,6 +522,8 @@ def main():
         volume_multiplier = st.sidebar.number_input("거래량 배수", min_value=1.0, max_value=5.0, value=1.5, step=0.1)
         conditions["volume_surge"] = volume_multiplier
     
+    refresh_mode = st.sidebar.checkbox("장중 빠른 갱신 (최근 봉만 받아서 이어 계산)", value=False)
+    
     # 스크리닝 실행
     if st.sidebar.button("🚀 스크리닝 실행", type="primary"):
         if not conditions:
@@ -484,7 +533,9 @@ def main():
         st.subheader(f"📊 {market} 스크리닝 결과")
         
         with st.spinner("배치 스크리닝 실행 중..."):
-            results = screen_stocks_batch(selected_stocks, conditions, batch_size=15)
+            results = screen_stocks_batch(selected_stocks, conditions, batch_size=15, refresh=refresh_mode)
+        if refresh_mode:
+            get_streaming_indicators().flush()
         
         if not results:
             st.info("조건에 맞는 종목이 없습니다.")
@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import time
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
@@ -10,6 +9,9 @@ from typing import List, Dict, Any
 import warnings
 import json
 import os
+from ohlcv_store import load_history
+from single_flight import single_flight
+from panel_indicators import Panel, simple_indicators
 warnings.filterwarnings('ignore')
 
 # 페이지 설정
@@ -42,12 +44,13 @@ class CompleteStockScreener:
             st.error(f"❌ 종목 리스트 로드 오류: {e}")
             self.markets = {}
     
+    @single_flight()  # 세션 간 동시 요청 합치기
     def get_stock_data(self, symbol: str, period: str = "3mo") -> pd.DataFrame:
         """주식 데이터 가져오기"""
         try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period=period)
-            if data.empty:
+            # 저장소 우선 조회 (워터마크 이후 봉만 요청)
+            data = load_history(symbol, period=period)
+            if data is None or data.empty:
                 return None
             return data
         except Exception as e:
@@ -113,14 +116,49 @@ class CompleteStockScreener:
         macd = self.calculate_macd(data)
         ma = self.calculate_moving_averages(data)
         
-        # 조건 분석
-        current_price = data['Close'].iloc[-1]
-        current_rsi = rsi.iloc[-1]
-        volume_avg = data['Volume'].rolling(window=20).mean().iloc[-1]
-        current_volume = data['Volume'].iloc[-1]
+        return self.analysis_row(
+            symbol, stock_info,
+            current_price=data['Close'].iloc[-1],
+            current_rsi=rsi.iloc[-1],
+            current_volume=data['Volume'].iloc[-1],
+            volume_avg=data['Volume'].rolling(window=20).mean().iloc[-1],
+            bb_upper=bb['upper_current'],
+            bb_lower=bb['lower_current'],
+            ma5=ma['ma5'].iloc[-1],
+            ma20=ma['ma20'].iloc[-1],
+            macd_gap=macd['macd'].iloc[-1] - macd['signal'].iloc[-1]
+        )
+    
+    def analyze_stocks(self, frames: Dict[str, pd.DataFrame], stock_infos: Dict[str, Dict]) -> Dict[str, Dict]:
+        """여러 종목 분석 (지표를 (봉 × 종목) 배열로 한 번에 계산, analyze_stock과 같은 결과)"""
+        panel = Panel({s: df for s, df in frames.items() if df is not None and len(df) >= 60},
+                      fields=('Close', 'Volume'))
+        if not len(panel):
+            return {}
+        last = {name: panel.last(values) for name, values in simple_indicators(panel).items()}
+        close, volume = panel.last(panel['Close']), panel.last(panel['Volume'])
         
+        return {
+            symbol: self.analysis_row(
+                symbol, stock_infos.get(symbol, {}),
+                current_price=close[j],
+                current_rsi=last['RSI'][j],
+                current_volume=volume[j],
+                volume_avg=last['Volume_MA'][j],
+                bb_upper=last['BB_Upper'][j],
+                bb_lower=last['BB_Lower'][j],
+                ma5=last['MA_5'][j],
+                ma20=last['MA_20'][j],
+                macd_gap=last['MACD_Histogram'][j]
+            )
+            for j, symbol in enumerate(panel.symbols)
+        }
+    
+    def analysis_row(self, symbol: str, stock_info: Dict, current_price, current_rsi, current_volume,
+                     volume_avg, bb_upper, bb_lower, ma5, ma20, macd_gap) -> Dict:
+        """마지막 봉 지표 값으로 조건 판정과 결과 행 만들기"""
         # BB 상단 돌파 조건
-        bb_breakout = current_price > bb['upper_current']
+        bb_breakout = current_price > bb_upper
         
         # RSI 과매수 조건
         rsi_overbought = current_rsi > 70
@@ -129,8 +167,8 @@ class CompleteStockScreener:
         volume_surge = current_volume > volume_avg * 1.5
         
         # 상승 추세 조건
-        uptrend = (current_price > ma['ma5'].iloc[-1] and 
-                  ma['ma5'].iloc[-1] > ma['ma20'].iloc[-1])
+        uptrend = (current_price > ma5 and 
+                  ma5 > ma20)
         
         return {
             'symbol': symbol,
@@ -138,10 +176,10 @@ class CompleteStockScreener:
             'sector': stock_info.get('sector', 'Unknown'),
             'current_price': current_price,
             'rsi': current_rsi,
-            'bb_upper': bb['upper_current'],
-            'bb_lower': bb['lower_current'],
+            'bb_upper': bb_upper,
+            'bb_lower': bb_lower,
             'volume_ratio': current_volume / volume_avg if volume_avg > 0 else 0,
-            'macd_signal': macd['macd'].iloc[-1] - macd['signal'].iloc[-1],
+            'macd_signal': macd_gap,
             
             # 조건 만족 여부
             'bb_breakout': bb_breakout,
@@ -162,26 +200,37 @@ class CompleteStockScreener:
         total_stocks = sum(len(self.markets.get(market, [])) for market in selected_markets)
         current_count = 0
         
+        # 여러 시장에 중복된 종목(S&P 500 + NASDAQ 등)은 한 번만 분석
+        analyzed = {}
+        
         for market in selected_markets:
             if market not in self.markets:
                 continue
                 
             st.write(f"### 🔍 {market} 분석 중...")
             
+            frames = {}
             for stock in self.markets[market]:
                 current_count += 1
                 progress = current_count / total_stocks
                 progress_bar.progress(progress)
                 status_text.text(f"분석 중: {stock['symbol']} ({current_count}/{total_stocks})")
                 
-                analysis = self.analyze_stock(stock['symbol'], stock)
+                if stock['symbol'] not in analyzed and stock['symbol'] not in frames:
+                    frames[stock['symbol']] = self.get_stock_data(stock['symbol'])
+            
+            # 시장 전체 종목 지표를 한 번에 계산
+            infos = {stock['symbol']: stock for stock in self.markets[market]}
+            analyses = self.analyze_stocks(frames, infos)
+            for symbol in frames:
+                analyzed[symbol] = analyses.get(symbol)
+            
+            for stock in self.markets[market]:
+                analysis = analyzed[stock['symbol']]
                 if analysis:
                     # 조건 필터링
                     if self.meets_conditions(analysis, conditions):
                         results.append(analysis)
-                
-                # API 제한 방지
-                time.sleep(0.1)
         
         progress_bar.empty()
         status_text.empty()
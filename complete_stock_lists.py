@@ -1,4 +1,4 @@
-import yfinance as yf
+from market_data import get_provider
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
@@ -426,8 +426,7 @@ def test_complete_stock_availability():
         for symbol in symbols:
             total_count += 1
             try:
-                ticker = yf.Ticker(symbol)
-                data = ticker.history(period="5d")
+                data = get_provider().history(symbol, period="5d")
                 if not data.empty:
                     latest_price = data['Close'].iloc[-1]
                     currency = "원" if (".KS" in symbol or ".KQ" in symbol) else "$"
@@ -0,0 +1,109 @@
+import statistics
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+
+class AdaptiveConcurrency:
+    """관측값 기반 동시 요청 수 자동 조정기
+
+    네트워크 요청마다 (지연, 결과: ok/empty/error)를 기록하고, window개가 모이면
+    한 번씩 동시 요청 수를 조정합니다.
+
+    - 실패(오류 + 빈 응답) 비율이 max_failure_rate를 넘으면 decrease_factor배로 감소
+    - 지연 중앙값이 기준 지연의 latency_tolerance배를 넘으면 1 감소
+    - 그 외(지연이 평탄하면) increase_step만큼 증가. 단, 최근 실패가 났던 수준(ceiling)의
+      80%를 넘으면 1씩만 늘려 조심스럽게 탐색
+
+    기준 지연은 지금까지 관측된 가장 낮은 window 중앙값이며, 서버 상태가 바뀌는 경우를
+    대비해 window마다 조금씩(2%) 올라갈 수 있습니다.
+    """
+
+    def __init__(self, initial: int = 8, min_limit: int = 2, max_limit: int = 50,
+                 window: int = 20, max_failure_rate: float = 0.1,
+                 latency_tolerance: float = 1.5, decrease_factor: float = 0.7,
+                 increase_step: int = 2, history: int = 10):
+        self.limit = max(min_limit, min(initial, max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.max_failure_rate = max_failure_rate
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+
+        self.ceiling = None
+        self.baseline_latency = None
+        self.last_latency = None
+        self.last_failure_rate = 0.0
+        self.throughput = 0.0
+        self.reasons = deque(maxlen=history)
+
+        self._samples = []
+        self._window_started = None
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, status: str = "ok"):
+        """네트워크 요청 한 건의 결과 기록 (status: ok / empty / error)"""
+        with self._lock:
+            if self._window_started is None:
+                self._window_started = time.monotonic() - latency
+            self._samples.append((latency, status))
+            if len(self._samples) >= self.window:
+                self._adjust()
+
+    def _adjust(self):
+        samples, self._samples = self._samples, []
+        elapsed = max(time.monotonic() - self._window_started, 1e-9)
+        self._window_started = time.monotonic()
+
+        failures = sum(1 for _, status in samples if status != "ok")
+        ok_latencies = [latency for latency, status in samples if status == "ok"]
+        failure_rate = failures / len(samples)
+
+        self.last_failure_rate = failure_rate
+        self.throughput = (len(samples) - failures) / elapsed
+        previous = self.limit
+
+        if failure_rate > self.max_failure_rate:
+            self.ceiling = previous
+            self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+            self._explain(previous, f"실패율 {failure_rate:.0%} > {self.max_failure_rate:.0%}")
+            return
+
+        if not ok_latencies:
+            return
+
+        latency = statistics.median(ok_latencies)
+        self.last_latency = latency
+        if self.baseline_latency is None:
+            self.baseline_latency = latency
+        else:
+            self.baseline_latency = min(latency, self.baseline_latency * 1.02)
+
+        ratio = latency / self.baseline_latency if self.baseline_latency > 0 else 1.0
+        if ratio > self.latency_tolerance:
+            self.limit = max(self.min_limit, self.limit - 1)
+            self._explain(previous, f"지연 {latency * 1000:.0f}ms (기준의 {ratio:.1f}배)")
+        else:
+            step = self.increase_step
+            if self.ceiling is not None and self.limit >= self.ceiling * 0.8:
+                step = 1
+                if self.limit >= self.ceiling:
+                    # 실패 없이 이전 한계에 도달 → 한계 기록 해제
+                    self.ceiling = None
+            self.limit = min(self.max_limit, self.limit + step)
+            self._explain(previous, f"지연 안정 {latency * 1000:.0f}ms, 처리량 {self.throughput:.1f}건/초")
+
+    def _explain(self, previous: int, reason: str):
+        if previous == self.limit:
+            reason += f" → {self.limit} 유지 (한계)"
+        else:
+            reason += f" → {previous}→{self.limit}"
+        self.reasons.append(reason)
+
+    def recent_reasons(self, n: Optional[int] = None) -> List[str]:
+        """최근 조정 사유 (최신순)"""
+        reasons = list(self.reasons)[::-1]
+        return reasons[:n] if n else reasons
@@ -0,0 +1,39 @@
+import pytest
+from streamlit import logger
+
+logger.set_log_level("error")
+
+import ohlcv_store
+import symbol_health
+from market_data import ReplayProvider, set_provider
+
+
+@pytest.fixture
+def root(tmp_path):
+    """테스트마다 새 임시 디렉토리 (저장소/캐시 위치)"""
+    return str(tmp_path)
+
+
+@pytest.fixture
+def provider():
+    """재생용 데이터 소스를 현재 데이터 소스로 (끝나면 원래 데이터 소스로)"""
+    replay = ReplayProvider()
+    previous = set_provider(replay)
+    yield replay
+    set_provider(previous)
+
+
+@pytest.fixture
+def store(root, provider):
+    """재생용 데이터 소스를 쓰는 임시 OHLCV 저장소"""
+    return ohlcv_store.OHLCVStore(root)
+
+
+@pytest.fixture
+def app_store(root, provider):
+    """앱이 쓰는 공용 저장소/종목 상태 기록을 임시 디렉토리로 바꿔 실행"""
+    store, health = ohlcv_store._default_store, symbol_health._default_registry
+    ohlcv_store._default_store = ohlcv_store.OHLCVStore(root)
+    symbol_health._default_registry = symbol_health.SymbolHealthRegistry(root)
+    yield ohlcv_store._default_store
+    ohlcv_store._default_store, symbol_health._default_registry = store, health
@@ -0,0 +1,208 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+# 시장별 요청 한도 (초당 요청 수, 최대 버스트)
+MARKET_RATE_LIMITS = {
+    "KRX": (float(os.environ.get("STOCK_SCREENER_RATE_KRX", 25)), 50),
+    "US": (float(os.environ.get("STOCK_SCREENER_RATE_US", 50)), 100),
+}
+
+
+def limiter_market(symbol: str) -> str:
+    """요청 한도를 공유하는 시장 구분 (한국 .KS/.KQ vs 미국)"""
+    return "KRX" if symbol.endswith(('.KS', '.KQ')) else "US"
+
+
+class TokenBucket:
+    """토큰 버킷 요청 한도
+
+    토큰이 모자라면 빚을 지고 빚이 갚아질 때까지만 기다리므로, 호출 순서대로
+    정확히 rate에 맞춰 요청이 나가고 burst보다 큰 요청(일괄 다운로드)도 처리할 수 있습니다.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """토큰을 예약하고 기다려야 할 시간(초)을 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def acquire(self, tokens: float = 1) -> float:
+        """동기 획득 (필요한 만큼만 대기)"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """비동기 획득"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+# 작업 스레드별 네트워크 사용 여부/한도 대기 시간 (동시 요청 수 자동 조정용)
+_request_state = threading.local()
+
+
+def get_rate_limiter(symbol_or_market: str) -> TokenBucket:
+    """프로세스 공용 시장별 토큰 버킷"""
+    market = symbol_or_market if symbol_or_market in MARKET_RATE_LIMITS else limiter_market(symbol_or_market)
+    with _limiters_lock:
+        if market not in _limiters:
+            rate, burst = MARKET_RATE_LIMITS[market]
+            _limiters[market] = TokenBucket(rate, burst)
+        return _limiters[market]
+
+
+def configure_rate_limit(market: str, rate: float, burst: float):
+    """시장별 요청 한도 변경 (벤치마크/테스트용)"""
+    MARKET_RATE_LIMITS[market] = (rate, burst)
+    with _limiters_lock:
+        _limiters.pop(market, None)
+
+
+def acquire_for(symbols, tokens_per_symbol: float = 1):
+    """네트워크 요청 직전에 호출: 종목(들)이 속한 시장 한도에서 토큰 획득"""
+    if isinstance(symbols, str):
+        symbols = [symbols]
+
+    counts = {}
+    for symbol in symbols:
+        market = limiter_market(symbol)
+        counts[market] = counts.get(market, 0) + tokens_per_symbol
+
+    waited = 0.0
+    for market, tokens in counts.items():
+        waited += get_rate_limiter(market).acquire(tokens)
+
+    _request_state.network = True
+    _request_state.waited = getattr(_request_state, 'waited', 0.0) + waited
+
+
+def _call_tracked(fetch_fn: Callable, symbol: str):
+    """fetch_fn 실행 후 (결과, 오류 여부, 네트워크 사용 여부, 한도 대기를 뺀 지연) 반환"""
+    _request_state.network = False
+    _request_state.waited = 0.0
+    started = time.perf_counter()
+    try:
+        result, error = fetch_fn(symbol), False
+    except Exception:
+        result, error = None, True
+    latency = time.perf_counter() - started - _request_state.waited
+    return result, error, _request_state.network, max(latency, 0.0)
+
+
+class _ConcurrencyGate:
+    """limit_fn()이 돌려주는 값까지만 동시 실행을 허용하는 asyncio 게이트 (실행 중 한도 변경 가능)"""
+
+    def __init__(self, limit_fn: Callable[[], int]):
+        self.limit_fn = limit_fn
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < max(1, self.limit_fn()))
+            self.in_flight += 1
+
+    async def __aexit__(self, *exc):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+
+class AsyncFetchEngine:
+    """asyncio 기반 동시 수집 엔진
+
+    - 동시 실행 수는 고정값 또는 AdaptiveConcurrency(tuner)가 실행 중 조정
+    - 블로킹 호출(yfinance/저장소)은 프로세스 공용 스레드 풀에서 실행되어
+      배치마다 스레드 풀을 새로 만들지 않고 yfinance 세션(keep-alive)을 재사용
+    - 요청 속도는 고정 sleep 대신 네트워크 경계(acquire_for)의 시장별 토큰 버킷이 결정
+    """
+
+    def __init__(self, max_concurrency: int = 20, max_threads: int = 64):
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="fetch")
+
+    async def fetch_all(self, symbols: Iterable[str], fetch_fn: Callable,
+                        on_result: Optional[Callable] = None,
+                        max_concurrency: Optional[int] = None,
+                        tuner=None) -> Dict[str, object]:
+        """모든 종목을 fetch_fn(symbol)으로 수집해 {symbol: 결과} 반환 (실패는 None)
+
+        tuner가 주어지면 네트워크를 실제로 사용한 호출만 tuner에 기록합니다
+        (저장소에서 바로 읽은 호출은 지연 측정에서 제외).
+        """
+        loop = asyncio.get_running_loop()
+        if tuner is not None:
+            gate = _ConcurrencyGate(lambda: tuner.limit)
+        else:
+            fixed = max_concurrency or self.max_concurrency
+            gate = _ConcurrencyGate(lambda: fixed)
+
+        async def fetch_one(symbol):
+            async with gate:
+                result, error, network, latency = await loop.run_in_executor(
+                    self._executor, _call_tracked, fetch_fn, symbol
+                )
+            if tuner is not None and network:
+                tuner.record(latency, "error" if error else ("empty" if result is None else "ok"))
+            if on_result is not None:
+                on_result(symbol, result)
+            return symbol, result
+
+        pairs = await asyncio.gather(*(fetch_one(symbol) for symbol in symbols))
+        return dict(pairs)
+
+    def run(self, symbols: Iterable[str], fetch_fn: Callable,
+            on_result: Optional[Callable] = None,
+            max_concurrency: Optional[int] = None,
+            tuner=None) -> Dict[str, object]:
+        """동기 코드(Streamlit 스크립트)에서 호출하는 진입점"""
+        coro = self.fetch_all(list(symbols), fetch_fn, on_result, max_concurrency, tuner)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+
+        # 이미 이벤트 루프가 돌고 있으면 별도 스레드에서 실행
+        result = {}
+
+        def runner():
+            result.update(asyncio.run(coro))
+
+        thread = threading.Thread(target=runner)
+        thread.start()
+        thread.join()
+        return result
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_fetch_engine() -> AsyncFetchEngine:
+    """프로세스 공용 수집 엔진 (세션 간 스레드 풀 공유, 동시 실행 수는 run()마다 지정)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncFetchEngine()
+        return _engine
@@ -0,0 +1,253 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from market_data import get_provider
+from ohlcv_store import STORE_DIR, symbol_market
+from single_flight import get_single_flight
+
+# 화면에서 쓰는 기본 정보 필드 (yf.Ticker.info 응답 중 이것만 보관)
+FIELDS = ('name', 'sector', 'industry', 'marketCap', 'trailingPE', 'currency')
+
+# 기본 정보 유효 기간 (초): 회사명/섹터는 거의 바뀌지 않고 시가총액/PER은 표시용 근사치
+FUNDAMENTALS_TTL = 3 * 24 * 3600
+
+# 조회 실패 종목을 다시 요청하기 전까지 기다리는 시간 (초)
+RETRY_TTL = 3600
+
+# 백그라운드 미리 받기 동시 요청 수 (요청 한도는 데이터 소스의 시장별 토큰 버킷이 지킴)
+WARM_WORKERS = 8
+
+# 종목별 저장이 이어질 때 파일을 다시 쓰는 최소 간격 (초)
+SAVE_INTERVAL = 1.0
+
+
+def _number(value) -> Optional[float]:
+    """유한한 숫자만 (yfinance는 PER에 'Infinity' 문자열이나 None을 주기도 함)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def project(symbol: str, info: dict) -> dict:
+    """.info 응답에서 FIELDS만 추림"""
+    info = info or {}
+    return {
+        'name': info.get('longName') or info.get('shortName') or symbol,
+        'sector': info.get('sector') or 'N/A',
+        'industry': info.get('industry') or 'N/A',
+        'marketCap': _number(info.get('marketCap')),
+        'trailingPE': _number(info.get('trailingPE')),
+        'currency': info.get('currency') or ('KRW' if symbol.endswith(('.KS', '.KQ')) else 'USD')
+    }
+
+
+class FundamentalsStore:
+    """종목 기본 정보(회사명, 섹터, 업종, 시가총액, PER, 통화) 영구 캐시
+
+    .info는 종목당 수십 KB의 응답 중 몇 개 필드만 쓰고 가장 느린 요청이므로,
+    FIELDS만 시장별 _fundamentals.json에 보관하고 결과 표를 만들 때는 저장된 값만 읽습니다.
+    - lookup(): 요청 없이 저장된 값 반환 (오래됐거나 없으면 백그라운드에서 받도록 예약)
+    - warm()/warm_async(): 여러 종목을 병렬로 미리 받기
+    """
+
+    def __init__(self, root: str = STORE_DIR, ttl: float = FUNDAMENTALS_TTL,
+                 retry_ttl: float = RETRY_TTL, workers: int = WARM_WORKERS):
+        self.root = root
+        self.ttl = ttl
+        self.retry_ttl = retry_ttl
+        self.workers = workers
+        self.fetched = 0
+        self.failed = 0
+        self._tables = {}
+        self._dirty = set()
+        self._saved_at = {}
+        self._pending = set()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    # ---- 파일 ----
+
+    def _path(self, market: str) -> str:
+        return os.path.join(self.root, market, "_fundamentals.json")
+
+    def _table(self, market: str) -> Dict[str, dict]:
+        if market not in self._tables:
+            table = {}
+            path = self._path(market)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        table = json.load(f)
+                except Exception:
+                    table = {}
+            self._tables[market] = table
+        return self._tables[market]
+
+    def _save(self, market: str):
+        self._dirty.discard(market)
+        self._saved_at[market] = time.monotonic()
+        path = self._path(market)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._tables[market], f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def flush(self):
+        """미뤄 둔 파일 저장"""
+        with self._lock:
+            for market in list(self._dirty):
+                self._save(market)
+
+    # ---- 조회 ----
+
+    def entry(self, symbol: str) -> Optional[dict]:
+        """저장된 항목 (FIELDS + updated, 실패 기록이면 error)"""
+        with self._lock:
+            return self._table(symbol_market(symbol)).get(symbol)
+
+    def get(self, symbol: str) -> Optional[dict]:
+        """저장된 기본 정보 (오래된 값 포함, 요청하지 않음)"""
+        entry = self.entry(symbol)
+        if entry is None or 'name' not in entry:
+            return None
+        return {field: entry.get(field) for field in FIELDS}
+
+    def is_fresh(self, symbol: str, now: Optional[float] = None) -> bool:
+        """다시 받을 필요가 없는지 (실패 기록은 retry_ttl 동안 유효)"""
+        entry = self.entry(symbol)
+        if entry is None:
+            return False
+        now = now if now is not None else time.time()
+        ttl = self.retry_ttl if 'error' in entry else self.ttl
+        return now - datetime.fromisoformat(entry['updated']).timestamp() < ttl
+
+    def lookup(self, symbol: str) -> Optional[dict]:
+        """결과 표용 조회: 저장된 값을 바로 반환하고, 없거나 오래됐으면 백그라운드에서 받도록 예약"""
+        if not self.is_fresh(symbol):
+            self.warm_async([symbol])
+        return self.get(symbol)
+
+    # ---- 수집 ----
+
+    def _store(self, symbol: str, record: dict):
+        market = symbol_market(symbol)
+        record['updated'] = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            table = self._table(market)
+            previous = table.get(symbol)
+            if 'error' in record and previous is not None and 'name' in previous:
+                # 실패해도 예전 값은 남겨 두고 재시도 시각만 기록
+                record = dict(previous, error=record['error'], updated=record['updated'])
+            table[symbol] = record
+            self._dirty.add(market)
+            if time.monotonic() - self._saved_at.get(market, 0) >= SAVE_INTERVAL:
+                self._save(market)
+
+    def fetch(self, symbol: str) -> Optional[dict]:
+        """데이터 소스에서 받아 저장 (같은 종목 동시 요청은 한 번만)"""
+        record, _ = get_single_flight().do(('fundamentals', self.root, symbol), self._fetch, symbol)
+        return record
+
+    def _fetch(self, symbol: str) -> Optional[dict]:
+        try:
+            record = project(symbol, get_provider().info(symbol))
+        except Exception as e:
+            self._store(symbol, {'error': type(e).__name__})
+            with self._lock:
+                self.failed += 1
+            return None
+        self._store(symbol, dict(record))
+        with self._lock:
+            self.fetched += 1
+        return record
+
+    def warm(self, symbols: Iterable[str], workers: Optional[int] = None) -> Dict[str, int]:
+        """오래됐거나 없는 종목만 병렬로 받아 저장 (끝날 때까지 대기)"""
+        todo = [s for s in dict.fromkeys(symbols) if not self.is_fresh(s)]
+        fetched, failed = self.fetched, self.failed
+        if todo:
+            with ThreadPoolExecutor(max_workers=workers or self.workers,
+                                    thread_name_prefix="fundamentals") as executor:
+                list(executor.map(self.fetch, todo))
+            self.flush()
+        return {'requested': len(todo), 'fetched': self.fetched - fetched, 'failed': self.failed - failed}
+
+    def warm_async(self, symbols: Iterable[str]) -> List[Future]:
+        """오래됐거나 없는 종목을 백그라운드에서 받도록 예약 (이미 예약된 종목은 제외)"""
+        futures = []
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix="fundamentals")
+        for symbol in dict.fromkeys(symbols):
+            if self.is_fresh(symbol):
+                continue
+            with self._lock:
+                if symbol in self._pending:
+                    continue
+                self._pending.add(symbol)
+            future = self._executor.submit(self.fetch, symbol)
+            future.add_done_callback(lambda _, symbol=symbol: self._done(symbol))
+            futures.append(future)
+        return futures
+
+    def _done(self, symbol: str):
+        with self._lock:
+            self._pending.discard(symbol)
+            idle = not self._pending
+        if idle:
+            self.flush()
+
+    def pending(self) -> int:
+        """백그라운드에서 받는 중인 종목 수"""
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self) -> Dict[str, int]:
+        """저장된 종목 수, 받은/실패한 요청 수, 대기 중인 종목 수"""
+        with self._lock:
+            return {
+                'entries': sum(len(table) for table in self._tables.values()),
+                'fetched': self.fetched,
+                'failed': self.failed,
+                'pending': len(self._pending)
+            }
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_fundamentals() -> FundamentalsStore:
+    """프로세스 공용 기본 정보 캐시"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = FundamentalsStore()
+            atexit.register(_default_store.flush)
+    return _default_store
+
+
+if __name__ == "__main__":
+    # 전체 종목 기본 정보 미리 받기: python fundamentals_store.py [종목 리스트 JSON]
+    import sys
+
+    list_file = sys.argv[1] if len(sys.argv) > 1 else 'complete_stock_lists.json'
+    with open(list_file, 'r', encoding='utf-8') as f:
+        stock_lists = json.load(f)
+
+    store = get_fundamentals()
+    for market, stocks in stock_lists.items():
+        symbols = [s['symbol'] if isinstance(s, dict) else s for s in stocks]
+        started = time.time()
+        result = store.warm(symbols)
+        print(f"✅ {market}: {len(symbols)}개 중 {result['fetched']}개 갱신, "
+              f"{result['failed']}개 실패 ({time.time() - started:.1f}초)")
@@ -0,0 +1,135 @@
+import functools
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+
+# 캐시에 보관하는 최대 항목 수 (종목 × 구간 × 파라미터 조합)
+MAX_ENTRIES = 20_000
+
+
+def _params_key(params: Optional[dict]) -> tuple:
+    return tuple(sorted((params or {}).items()))
+
+
+class IndicatorCache:
+    """(종목, 주기, 구간, 파라미터) 키 기반 기술적 지표 캐시
+
+    st.cache_data처럼 입력 DataFrame 전체를 해시하지 않고 종목 코드와 첫/마지막 봉
+    시각만으로 키를 만듭니다. 마지막 봉의 종가/거래량도 키에 넣어 장중에 갱신되는
+    진행 중인 봉은 다시 계산합니다. 계산된 지표 컬럼만 float32 배열 하나로 보관합니다.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(df: pd.DataFrame, symbol: str, interval: str = "1d",
+                 params: Optional[dict] = None, name: str = "") -> tuple:
+        """캐시 키: 3mo/6mo처럼 마지막 봉이 같아도 시작이 다르면 EMA 값이 달라지므로 구간 전체를 식별"""
+        last = df.iloc[-1]
+        return (
+            name, symbol, interval,
+            df.index[0], df.index[-1], len(df),
+            float(last['Close']), float(last['Volume']) if 'Volume' in df.columns else None,
+            _params_key(params)
+        )
+
+    def get(self, key: Hashable) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, columns: tuple, values: np.ndarray):
+        with self._lock:
+            self._entries[key] = (columns, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def bypass(self):
+        """키를 만들 수 없어 캐시 없이 계산한 호출 기록"""
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.bypassed = 0
+
+    def stats(self) -> Dict[str, float]:
+        """적중/미스 횟수, 적중률, 항목 수, 보관 중인 지표 배열 크기(바이트)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': sum(values.nbytes for _, values in self._entries.values())
+            }
+
+
+# 프로세스 공용 (세션 간 공유)
+_cache = IndicatorCache()
+
+
+def get_indicator_cache() -> IndicatorCache:
+    return _cache
+
+
+def _attach(df: pd.DataFrame, columns: tuple, values: np.ndarray) -> pd.DataFrame:
+    """보관된 지표 컬럼을 원본 OHLCV 프레임에 붙임"""
+    base = df.drop(columns=[c for c in columns if c in df.columns])
+    indicators = pd.DataFrame(values, index=df.index, columns=list(columns))
+    return pd.concat([base, indicators], axis=1)
+
+
+def cached_indicators(params: Optional[dict] = None, interval: str = "1d"):
+    """지표 계산 함수 fn(df)을 키 기반 캐시로 감싸는 데코레이터
+
+    감싼 함수는 fn(df, symbol=None)으로 호출합니다. symbol이 없으면 키를 만들 수 없으므로
+    캐시 없이 계산합니다. 계산 함수가 새로 추가한 컬럼만 캐시에 보관하며, 적중/미스 모두
+    같은 보관 배열로 결과를 만들어 어느 쪽이든 같은 값이 나옵니다.
+    """
+    def decorator(fn: Callable):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(df, symbol: Optional[str] = None):
+            if symbol is None or df is None or df.empty:
+                _cache.bypass()
+                return fn(df)
+
+            key = IndicatorCache.make_key(df, symbol, interval, params, name)
+            entry = _cache.get(key)
+            if entry is not None:
+                return _attach(df, *entry)
+
+            original = list(df.columns)
+            result = fn(df.copy(deep=False))
+            columns = tuple(c for c in result.columns if c not in original)
+            if not columns:
+                return result
+
+            values = result[list(columns)].to_numpy(dtype=np.float32)
+            _cache.put(key, columns, values)
+            return _attach(df, columns, values)
+
+        wrapper.cache = _cache
+        return wrapper
+
+    return decorator
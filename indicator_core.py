@@ -0,0 +1,61 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# 스크리닝 앱들이 함께 쓰는 지표 파라미터 (ta 라이브러리 기본값과 동일한 정의, 지표 캐시 키에도 포함)
+INDICATOR_PARAMS = {
+    'bb_period': 20, 'bb_std': 2, 'rsi_window': 14,
+    'macd': (12, 26, 9), 'ma_windows': (20, 50), 'volume_ma': 20
+}
+
+ALL_COLUMNS = ['BB_Middle', 'BB_Upper', 'BB_Lower', 'RSI', 'MACD', 'MACD_Signal',
+               'MACD_Histogram', 'MA_20', 'MA_50', 'Volume_MA']
+
+
+def compute_arrays(close: np.ndarray, volume: np.ndarray, params: Optional[dict] = None):
+    """종가/거래량 배열로 전체 지표 계산 → ({지표: 배열}, {EMA 상태: 배열})
+
+    ta 라이브러리(BollingerBands 대신 rolling, RSIIndicator, MACD)와 같은 값을 pandas ewm으로 계산합니다.
+    """
+    p = params or INDICATOR_PARAMS
+    fast, slow, signal = p['macd']
+    series = pd.Series(close)
+    values = {}
+
+    middle = series.rolling(window=p['bb_period']).mean()
+    std = series.rolling(window=p['bb_period']).std()
+    values['BB_Middle'] = middle.to_numpy()
+    values['BB_Upper'] = (middle + std * p['bb_std']).to_numpy()
+    values['BB_Lower'] = (middle - std * p['bb_std']).to_numpy()
+    for window in p['ma_windows']:
+        values[f'MA_{window}'] = series.rolling(window=window).mean().to_numpy()
+    values['Volume_MA'] = pd.Series(volume).rolling(window=p['volume_ma']).mean().to_numpy()
+
+    # ta.momentum.RSIIndicator와 같은 정의 (min_periods 없이 상태를 구한 뒤 앞부분을 가림)
+    diff = series.diff()
+    alpha = 1 / p['rsi_window']
+    ema_up = diff.where(diff > 0, 0.0).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    ema_down = (-diff.where(diff < 0, 0.0)).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    values['RSI'] = _rsi(ema_up, ema_down)
+    values['RSI'][:p['rsi_window'] - 1] = np.nan
+
+    # ta.trend.MACD와 같은 정의
+    ema_fast = series.ewm(span=fast, adjust=False).mean().to_numpy()
+    ema_slow = series.ewm(span=slow, adjust=False).mean().to_numpy()
+    macd = ema_fast - ema_slow
+    macd[:slow - 1] = np.nan
+    ema_signal = pd.Series(macd).ewm(span=signal, adjust=False).mean().to_numpy()
+    values['MACD'] = macd
+    values['MACD_Signal'] = ema_signal.copy()
+    values['MACD_Signal'][:slow + signal - 2] = np.nan
+    values['MACD_Histogram'] = macd - values['MACD_Signal']
+
+    states = {'ema_up': ema_up, 'ema_down': ema_down, 'ema_fast': ema_fast,
+              'ema_slow': ema_slow, 'ema_signal': ema_signal}
+    return values, states
+
+
+def _rsi(ema_up: np.ndarray, ema_down: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(ema_down == 0, 100.0, 100 - (100 / (1 + ema_up / ema_down)))
@@ -0,0 +1,67 @@
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+# 함께 계산되는 지표 키 묶음 (같은 묶음은 중간값을 공유하므로 하나만 필요해도 묶음 전체를 계산)
+_PREFIX_GROUPS = (('BB_', 'BB'), ('MACD', 'MACD'), ('Stoch_', 'Stoch'))
+
+
+def indicator_group(key: str) -> str:
+    """지표 키(BB_Upper, MACD_Signal, MA_20, Volume_MA, ...)가 속한 계산 묶음"""
+    for prefix, group in _PREFIX_GROUPS:
+        if key.startswith(prefix):
+            return group
+    return key
+
+
+def indicator_groups(keys: Iterable[str]) -> Set[str]:
+    return {indicator_group(key) for key in keys}
+
+
+def needs(keys: Optional[Iterable[str]], group: str) -> bool:
+    """keys(None이면 전체) 중 group 묶음 지표가 있으면 True"""
+    return keys is None or group in indicator_groups(keys)
+
+
+class DemandStats:
+    """조건이 읽는 지표만 계산했을 때 건너뛴 계산량 집계 (종목 × 지표 묶음 단위, 스레드 안전)"""
+
+    def __init__(self, available: Iterable[str]):
+        self.available = indicator_groups(available)
+        self._lock = threading.Lock()
+        self._symbols = 0
+        self._computed = 0
+        self._completed = 0
+        self._completed_units = 0
+
+    def record(self, symbols: int, keys: Iterable[str]):
+        """symbols개 종목에 대해 keys 지표만 계산"""
+        units = len(indicator_groups(keys) & self.available)
+        with self._lock:
+            self._symbols += symbols
+            self._computed += symbols * units
+
+    def record_completed(self, symbols: int, keys: Iterable[str]):
+        """조건을 만족한 종목의 결과 표용으로 keys 지표를 추가 계산"""
+        units = len(indicator_groups(keys) & self.available)
+        with self._lock:
+            self._completed += symbols
+            self._completed_units += symbols * units
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self._symbols * len(self.available)
+            computed = self._computed + self._completed_units
+            return {
+                'symbols': self._symbols,
+                'groups': len(self.available),
+                'computed': computed,
+                'total': total,
+                'completed': self._completed,
+                'saved_ratio': 1 - computed / total if total else 0.0
+            }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        per_symbol = stats['computed'] / stats['symbols'] if stats['symbols'] else 0
+        return (f"지표 계산량: 종목당 {per_symbol:.1f}/{stats['groups']}개 묶음 "
+                f"({stats['saved_ratio']:.0%} 절약, 결과 표용 추가 계산 {stats['completed']}개 종목)")
@@ -0,0 +1,139 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from indicator_core import ALL_COLUMNS, INDICATOR_PARAMS, compute_arrays
+
+# 작업 프로세스 수 (기본: CPU 코어 수)
+POOL_WORKERS = int(os.environ.get("STOCK_SCREENER_INDICATOR_PROCESSES", 0)) or os.cpu_count() or 1
+
+# 프로세스당 나눠 줄 작업 묶음 수 (종목 길이가 달라도 고르게 분배되도록 잘게 나눔)
+TASKS_PER_WORKER = 4
+
+
+def _compute_spans(in_name: str, out_name: str, total: int, spans: List[Tuple[int, int]],
+                   columns: Sequence[str], params: dict) -> int:
+    """작업 프로세스: 공유 메모리의 종가/거래량 구간별로 지표를 계산해 출력 공유 메모리에 씀"""
+    source = shared_memory.SharedMemory(name=in_name)
+    target = shared_memory.SharedMemory(name=out_name)
+    try:
+        inputs = np.ndarray((2, total), dtype=np.float64, buffer=source.buf)
+        outputs = np.ndarray((len(columns), total), dtype=np.float64, buffer=target.buf)
+        for offset, length in spans:
+            end = offset + length
+            values, _ = compute_arrays(inputs[0, offset:end], inputs[1, offset:end], params)
+            for row, name in enumerate(columns):
+                outputs[row, offset:end] = values[name]
+        del inputs, outputs
+        return len(spans)
+    finally:
+        source.close()
+        target.close()
+
+
+class IndicatorProcessPool:
+    """기술적 지표 계산을 별도 프로세스에서 실행 (GIL 밖에서 여러 코어 사용)
+
+    종목별 DataFrame을 피클로 보내지 않고 전체 종목의 종가/거래량을 이어 붙인 배열 하나를
+    공유 메모리에 올려 두고, 작업 프로세스에는 (위치, 길이) 구간 목록만 보냅니다. 결과도
+    공유 메모리 배열(지표 × 전체 봉)에 바로 쓰므로 프로세스 사이에 오가는 데이터가 거의 없습니다.
+    계산 정의는 indicator_core.compute_arrays (ta 라이브러리와 같은 값)입니다.
+    """
+
+    def __init__(self, workers: int = POOL_WORKERS, params: Optional[dict] = None,
+                 min_rows: int = 50):
+        self.workers = max(1, workers)
+        self.params = dict(params or INDICATOR_PARAMS)
+        self.min_rows = min_rows
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Streamlit처럼 스레드가 많은 프로세스에서 fork는 안전하지 않으므로 spawn 사용
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def compute(self, frames: Dict[str, pd.DataFrame],
+                columns: Sequence[str] = ALL_COLUMNS) -> Dict[str, Dict[str, np.ndarray]]:
+        """{symbol: {지표: 배열}} (봉이 min_rows보다 적은 종목은 제외)"""
+        symbols = [s for s, df in frames.items() if df is not None and len(df) >= self.min_rows]
+        if not symbols:
+            return {}
+        columns = list(columns)
+        lengths = np.array([len(frames[s]) for s in symbols])
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        total = int(lengths.sum())
+
+        source = shared_memory.SharedMemory(create=True, size=2 * total * 8)
+        target = shared_memory.SharedMemory(create=True, size=len(columns) * total * 8)
+        try:
+            inputs = np.ndarray((2, total), dtype=np.float64, buffer=source.buf)
+            inputs[0] = np.concatenate([frames[s]['Close'].to_numpy(dtype=np.float64) for s in symbols])
+            inputs[1] = np.concatenate([frames[s]['Volume'].to_numpy(dtype=np.float64) for s in symbols])
+
+            # 봉 수 기준으로 비슷한 크기의 작업 묶음으로 나눔
+            spans = list(zip(offsets.tolist(), lengths.tolist()))
+            n_tasks = min(len(spans), self.workers * TASKS_PER_WORKER)
+            tasks = [spans[i::n_tasks] for i in range(n_tasks)]
+            futures = [
+                self._pool().submit(_compute_spans, source.name, target.name, total, task, columns, self.params)
+                for task in tasks
+            ]
+            for future in futures:
+                future.result()
+
+            outputs = np.ndarray((len(columns), total), dtype=np.float64, buffer=target.buf).copy()
+            del inputs
+        finally:
+            for block in (source, target):
+                block.close()
+                block.unlink()
+
+        return {
+            symbol: {name: outputs[row, offset:offset + length] for row, name in enumerate(columns)}
+            for symbol, offset, length in zip(symbols, offsets.tolist(), lengths.tolist())
+        }
+
+    def attach(self, frames: Dict[str, pd.DataFrame],
+               columns: Sequence[str] = ALL_COLUMNS) -> Dict[str, pd.DataFrame]:
+        """지표 컬럼을 붙인 프레임들 (봉이 적은 종목은 원본 그대로)"""
+        values = self.compute(frames, columns)
+        result = {}
+        for symbol, df in frames.items():
+            if symbol not in values:
+                result[symbol] = df
+                continue
+            data = {name: df[name].to_numpy() for name in df.columns if name not in columns}
+            data.update(values[symbol])
+            result[symbol] = pd.DataFrame(data, index=df.index)
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_indicator_pool() -> IndicatorProcessPool:
+    """프로세스 공용 지표 계산 풀 (처음 사용할 때 작업 프로세스 시작)"""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = IndicatorProcessPool()
+            atexit.register(_default_pool.shutdown)
+    return _default_pool
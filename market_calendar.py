@@ -0,0 +1,211 @@
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Set, Tuple
+
+import pandas as pd
+
+# 진행 중인 봉(장중)을 다시 받기 전까지 기다리는 시간 (초)
+INTRADAY_TTL = 300
+
+# 장 마감 직후에는 데이터 제공처의 일봉이 확정되지 않았을 수 있으므로 기다리는 시간
+CLOSE_SETTLE = timedelta(minutes=20)
+
+# KRX 휴장일 (음력 명절/대체공휴일/선거일 등 규칙으로 계산할 수 없는 날, 매년 갱신 필요)
+KRX_HOLIDAYS = {
+    2024: ["01-01", "02-09", "02-12", "03-01", "04-10", "05-01", "05-06", "05-15", "06-06",
+           "08-15", "09-16", "09-17", "09-18", "10-01", "10-03", "10-09", "12-25", "12-31"],
+    2025: ["01-01", "01-27", "01-28", "01-29", "01-30", "03-03", "05-01", "05-05", "05-06",
+           "06-03", "06-06", "08-15", "10-03", "10-06", "10-07", "10-08", "10-09", "12-25", "12-31"],
+    2026: ["01-01", "02-16", "02-17", "02-18", "03-02", "05-01", "05-05", "05-25", "06-03",
+           "08-17", "09-24", "09-25", "09-28", "10-05", "10-09", "12-25", "12-31"],
+    2027: ["01-01", "02-08", "02-09", "03-01", "05-05", "05-13", "08-16", "09-14", "09-15",
+           "09-16", "10-04", "10-11", "12-27", "12-31"],
+}
+
+# 표에 없는 해에 사용하는 양력 고정 휴장일
+KRX_FIXED_HOLIDAYS = ["01-01", "03-01", "05-01", "05-05", "06-06", "08-15", "10-03", "10-09",
+                      "12-25", "12-31"]
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """month월의 n번째 weekday (n < 0이면 뒤에서부터)"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7 + 7 * (-n - 1))
+
+
+def _easter(year: int) -> date:
+    """부활절 (그레고리력, Meeus 알고리즘)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def _observed(day: date) -> date:
+    """NYSE 대체 휴장: 토요일 → 금요일, 일요일 → 월요일"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def nyse_holidays(year: int) -> Set[date]:
+    """NYSE 정규 휴장일 (조기 폐장일은 정상 마감으로 취급)"""
+    days = {
+        _nth_weekday(year, 1, 0, 3),             # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),             # Washington's Birthday
+        _easter(year) - timedelta(days=2),       # Good Friday
+        _nth_weekday(year, 5, 0, -1),            # Memorial Day
+        _observed(date(year, 7, 4)),             # Independence Day
+        _nth_weekday(year, 9, 0, 1),             # Labor Day
+        _nth_weekday(year, 11, 3, 4),            # Thanksgiving Day
+        _observed(date(year, 12, 25)),           # Christmas Day
+    }
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))   # Juneteenth
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:                  # 토요일이면 전년도 12/31에 대체하지 않음
+        days.add(_observed(new_year))
+    return days
+
+
+@lru_cache(maxsize=None)
+def krx_holidays(year: int) -> Set[date]:
+    """KRX 휴장일"""
+    table = KRX_HOLIDAYS.get(year, KRX_FIXED_HOLIDAYS)
+    return {date(year, int(day[:2]), int(day[3:])) for day in table}
+
+
+class ExchangeCalendar:
+    """거래소 하나의 정규장 시간과 휴장일"""
+
+    def __init__(self, name: str, tz: str, open_time: time, close_time: time, holidays):
+        self.name = name
+        self.tz = tz
+        self.open_time = open_time
+        self.close_time = close_time
+        self._holidays = holidays
+
+    def is_session(self, day: date) -> bool:
+        """정규장이 열리는 날인지"""
+        return day.weekday() < 5 and day not in self._holidays(day.year)
+
+    def _at(self, day: date, at: time) -> pd.Timestamp:
+        return pd.Timestamp(datetime.combine(day, at)).tz_localize(self.tz)
+
+    def session_open(self, day: date) -> pd.Timestamp:
+        return self._at(day, self.open_time)
+
+    def session_close(self, day: date) -> pd.Timestamp:
+        return self._at(day, self.close_time)
+
+    def local_now(self, now: Optional[datetime] = None) -> pd.Timestamp:
+        """거래소 현지 시각 (now가 타임존 없는 값이면 시스템 현지 시각으로 간주)"""
+        now = pd.Timestamp(now if now is not None else datetime.now(timezone.utc))
+        if now.tz is None:
+            now = pd.Timestamp(now.to_pydatetime().astimezone())
+        return now.tz_convert(self.tz)
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        """정규장 진행 중인지"""
+        local = self.local_now(now)
+        return (self.is_session(local.date())
+                and self.session_open(local.date()) <= local < self.session_close(local.date()))
+
+    def last_close(self, now: Optional[datetime] = None) -> pd.Timestamp:
+        """now 이전에 마지막으로 끝난 정규장의 마감 시각"""
+        local = self.local_now(now)
+        day = local.date()
+        while not (self.is_session(day) and self.session_close(day) <= local):
+            day -= timedelta(days=1)
+        return self.session_close(day)
+
+    def next_close(self, now: Optional[datetime] = None) -> pd.Timestamp:
+        """now 이후(진행 중인 장 포함) 다음 정규장의 마감 시각"""
+        local = self.local_now(now)
+        day = local.date()
+        while not (self.is_session(day) and self.session_close(day) > local):
+            day += timedelta(days=1)
+        return self.session_close(day)
+
+
+KRX = ExchangeCalendar("KRX", "Asia/Seoul", time(9, 0), time(15, 30), krx_holidays)
+NYSE = ExchangeCalendar("NYSE", "America/New_York", time(9, 30), time(16, 0), nyse_holidays)
+
+
+def calendar_for(symbol: str) -> ExchangeCalendar:
+    """종목이 거래되는 거래소 달력 (.KS/.KQ → KRX, 그 외 → NYSE)"""
+    return KRX if symbol.endswith(('.KS', '.KQ')) else NYSE
+
+
+def _live_session(calendar: ExchangeCalendar, local: pd.Timestamp) -> Optional[date]:
+    """일봉이 아직 바뀔 수 있는 세션 (장중이거나 마감 후 확정 대기 중), 없으면 None"""
+    if calendar.is_open(local):
+        return local.date()
+    last_close = calendar.last_close(local)
+    if local < last_close + CLOSE_SETTLE:
+        return last_close.date()
+    return None
+
+
+def is_fresh(symbol: str, checked_at: datetime, now: Optional[datetime] = None,
+             intraday_ttl: float = INTRADAY_TTL) -> bool:
+    """checked_at에 받은 일봉을 now에도 그대로 써도 되는지
+
+    - 장 마감 후(야간/주말/휴장일): 마지막 장이 끝나고(확정 대기 포함) 받았다면 다음 장 마감 전까지 유효
+    - 장중/확정 대기 중: 진행 중인 봉만 바뀌므로 이번 장이 열린 뒤 intraday_ttl초 안에 받았을 때만 유효
+    """
+    calendar = calendar_for(symbol)
+    local = calendar.local_now(now)
+    checked = calendar.local_now(checked_at)
+
+    session = _live_session(calendar, local)
+    if session is not None:
+        return checked >= calendar.session_open(session) and (local - checked).total_seconds() < intraday_ttl
+
+    return checked >= calendar.last_close(local) + CLOSE_SETTLE
+
+
+def cache_token(symbol: str, now: Optional[datetime] = None,
+                intraday_ttl: float = INTRADAY_TTL) -> Tuple:
+    """시장 상태가 바뀔 때만 달라지는 값 (st.cache_data 인자로 넘겨 고정 TTL 대신 사용)
+
+    장 마감 후에는 마지막 마감 시각으로 고정되고, 장중(확정 대기 포함)에는 intraday_ttl마다 바뀝니다.
+    """
+    calendar = calendar_for(symbol)
+    local = calendar.local_now(now)
+    if _live_session(calendar, local) is not None:
+        return calendar.name, "live", int(local.timestamp() // intraday_ttl)
+    return calendar.name, "closed", calendar.last_close(local).isoformat()
+
+
+def missing_sessions(symbol: str, last_bar, now: Optional[datetime] = None, limit: int = 30) -> int:
+    """저장된 마지막 봉 이후 새로 생긴(또는 진행 중인) 거래일 수 (limit에서 멈춤)
+
+    0이면 마지막 봉이 현재 세션이고 그 봉만 다시 받으면 됩니다.
+    """
+    calendar = calendar_for(symbol)
+    local = calendar.local_now(now)
+    last_day = pd.Timestamp(last_bar).date()
+
+    day = local.date()
+    if not (calendar.is_session(day) and local >= calendar.session_open(day)):
+        day = calendar.last_close(local).date()
+
+    count = 0
+    while day > last_day and count < limit:
+        if calendar.is_session(day):
+            count += 1
+        day -= timedelta(days=1)
+    return count
@@ -0,0 +1,347 @@
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from fetch_engine import acquire_for
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# 데이터 소스 선택: yfinance(기본) / replay(오프라인 재생)
+PROVIDER = os.environ.get("STOCK_SCREENER_PROVIDER", "yfinance")
+REPLAY_DIR = os.environ.get("STOCK_SCREENER_REPLAY_DIR")
+REPLAY_LATENCY = float(os.environ.get("STOCK_SCREENER_REPLAY_LATENCY", 0))
+REPLAY_ERROR_RATE = float(os.environ.get("STOCK_SCREENER_REPLAY_ERROR_RATE", 0))
+
+
+def period_start(period: str, end: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """yfinance period 문자열("3mo", "1y", "90d" 등)을 시작 시점으로 변환"""
+    if period in (None, "max"):
+        return None
+    if period == "ytd":
+        return end.normalize().replace(month=1, day=1)
+
+    units = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return end.normalize() - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+
+    raise ValueError(f"지원하지 않는 period: {period}")
+
+
+def market_timezone(symbol: str) -> str:
+    """종목이 거래되는 거래소의 타임존"""
+    return "Asia/Seoul" if symbol.endswith(('.KS', '.KQ')) else "America/New_York"
+
+
+class MarketDataProvider:
+    """시세/기본 정보 데이터 소스 인터페이스
+
+    모든 수집 경로(저장소, 일괄 다운로드, 각 앱의 get_stock_data/get_stock_info)는
+    이 인터페이스를 거칩니다. 공개 메서드가 시장별 요청 한도(acquire_for)를 처리하므로
+    구현체는 _history/_download/_info만 구현하면 됩니다.
+    """
+
+    name = "base"
+
+    def history(self, symbol: str, period: str = None, start=None, end=None,
+                interval: str = "1d") -> pd.DataFrame:
+        """종목 하나의 OHLCV (yf.Ticker.history와 같은 형식, 데이터가 없으면 빈 DataFrame)
+
+        start가 주어지면 period 대신 [start, end) 구간을 요청합니다 (end 생략 시 최근까지).
+        """
+        acquire_for(symbol)
+        return self._history(symbol, period=period, start=start, end=end, interval=interval)
+
+    def download(self, symbols: List[str], period: str = None, start=None, end=None,
+                 interval: str = "1d", **kwargs) -> pd.DataFrame:
+        """여러 종목 일괄 요청 (yf.download(group_by="ticker")와 같은 (종목, 필드) 컬럼)
+
+        원격 서버는 종목마다 요청을 처리하므로 종목 수만큼 토큰을 사용합니다.
+        """
+        acquire_for(symbols)
+        return self._download(list(symbols), period=period, start=start, end=end, interval=interval)
+
+    def info(self, symbol: str) -> dict:
+        """종목 기본 정보 (yf.Ticker.info와 같은 키)"""
+        acquire_for(symbol)
+        return self._info(symbol)
+
+    def _history(self, symbol, period, start, end, interval) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def _download(self, symbols, period, start, end, interval) -> pd.DataFrame:
+        frames = {}
+        for symbol in symbols:
+            df = self._history(symbol, period=period, start=start, end=end, interval=interval)
+            if df is not None and not df.empty:
+                frames[symbol] = df
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame()
+
+    def _info(self, symbol) -> dict:
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance (yfinance)"""
+
+    name = "yfinance"
+
+    def _history(self, symbol, period, start, end, interval):
+        if start is not None:
+            return yf.Ticker(symbol).history(start=start, end=end, interval=interval)
+        return yf.Ticker(symbol).history(period=period or "1mo", interval=interval)
+
+    def _download(self, symbols, period, start, end, interval):
+        window = {'start': start, 'end': end} if start is not None else {'period': period or "1mo"}
+        return yf.download(
+            symbols,
+            interval=interval,
+            group_by="ticker",
+            auto_adjust=True,
+            actions=False,
+            threads=True,
+            progress=False,
+            **window
+        )
+
+    def _info(self, symbol):
+        return yf.Ticker(symbol).info
+
+
+class ReplayError(ConnectionError):
+    """ReplayProvider가 주입한 요청 실패"""
+
+
+class ReplayProvider(MarketDataProvider):
+    """네트워크 없이 로컬 파일 또는 생성 데이터로 응답하는 재생용 데이터 소스
+
+    - root 아래 {symbol}.parquet / {symbol}.csv (record()로 저장한 파일)가 있으면 그대로 사용하고,
+      없으면 종목 코드로 시드를 정한 재현 가능한 가상 시세를 생성합니다 (generate=False면 빈 응답).
+    - 요청마다 latency + 종목당 per_symbol (+ 0~jitter) 초 지연
+    - error_rate 비율로 예외(ReplayError), empty_rate 비율로 빈 응답(요청 한도에 걸린 Yahoo 흉내)
+    - 무작위 요소는 seed로 고정되어 같은 설정이면 같은 결과가 나옵니다.
+    - requests/bars에 요청 수와 응답한 봉 수를 누적합니다 (전송량 측정용).
+    """
+
+    name = "replay"
+
+    def __init__(self, root: Optional[str] = None, latency: float = 0.0, per_symbol: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, empty_rate: float = 0.0,
+                 days: int = 504, generate: bool = True, seed: int = 0):
+        self.root = root
+        self.latency = latency
+        self.per_symbol = per_symbol
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.empty_rate = empty_rate
+        self.days = days
+        self.generate = generate
+        self.seed = seed
+
+        self.requests = 0
+        self.errors = 0
+        self.empties = 0
+        self.bars = 0
+        self._frames = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # ---- 데이터 ----
+
+    def frame(self, symbol: str) -> Optional[pd.DataFrame]:
+        """종목의 전체 이력 (지연/오류 주입 없음, 타임존 포함 인덱스)"""
+        with self._lock:
+            if symbol in self._frames:
+                return self._frames[symbol]
+
+        df = self._load_recorded(symbol)
+        if df is None and self.generate:
+            df = self._generate(symbol)
+
+        with self._lock:
+            return self._frames.setdefault(symbol, df)
+
+    def _load_recorded(self, symbol):
+        if not self.root:
+            return None
+        path = os.path.join(self.root, symbol)
+        if os.path.exists(f"{path}.parquet"):
+            df = pd.read_parquet(f"{path}.parquet")
+        elif os.path.exists(f"{path}.csv"):
+            df = pd.read_csv(f"{path}.csv", index_col=0)
+            df.index = pd.to_datetime(df.index, utc=True).tz_convert(market_timezone(symbol))
+        else:
+            return None
+        if df.index.tz is None:
+            df.index = df.index.tz_localize(market_timezone(symbol))
+        return df[[c for c in OHLCV_COLUMNS if c in df.columns]]
+
+    def _generate(self, symbol):
+        rng = np.random.default_rng([zlib.crc32(symbol.encode()), self.seed])
+        index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=self.days)
+        base = 50_000 if symbol.endswith(('.KS', '.KQ')) else 100
+        close = base * np.exp(np.cumsum(rng.normal(0.0003, 0.02, self.days)))
+        spread = np.abs(rng.normal(0, 0.01, self.days))
+        open_ = close * (1 + rng.normal(0, 0.005, self.days))
+        return pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * (1 + spread),
+            'Low': np.minimum(open_, close) * (1 - spread),
+            'Close': close,
+            'Volume': rng.integers(100_000, 5_000_000, self.days)
+        }, index=index.tz_localize(market_timezone(symbol)))
+
+    @staticmethod
+    def _slice(df, period, start, end=None):
+        if start is None and period and period.endswith("d") and period[:-1].isdigit():
+            # yfinance의 "1d"/"5d"는 최근 N 거래일
+            return df.iloc[-int(period[:-1]):]
+        if start is not None:
+            begin = pd.Timestamp(start)
+        else:
+            begin = period_start(period or "1mo", pd.Timestamp.now())
+        if begin is not None:
+            if begin.tz is None:
+                begin = begin.tz_localize(df.index.tz)
+            df = df[df.index >= begin]
+        if start is not None and end is not None:
+            stop = pd.Timestamp(end)
+            if stop.tz is None:
+                stop = stop.tz_localize(df.index.tz)
+            df = df[df.index < stop]
+        return df
+
+    # ---- 요청 흉내 ----
+
+    def _serve(self, n_symbols: int) -> str:
+        """지연을 적용하고 이번 요청의 결과 종류(ok/empty/error)를 결정"""
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+            delay = self.latency + self.per_symbol * n_symbols + self._random.random() * self.jitter
+            if roll < self.error_rate:
+                outcome = "error"
+                self.errors += 1
+            elif roll < self.error_rate + self.empty_rate:
+                outcome = "empty"
+                self.empties += 1
+            else:
+                outcome = "ok"
+
+        if delay > 0:
+            time.sleep(delay)
+        if outcome == "error":
+            raise ReplayError("주입된 요청 실패")
+        return outcome
+
+    def _count_bars(self, n: int):
+        """응답한 봉 수 (전송량 비교용)"""
+        with self._lock:
+            self.bars += n
+
+    def _history(self, symbol, period, start, end, interval):
+        if self._serve(1) == "empty":
+            return pd.DataFrame()
+        df = self.frame(symbol)
+        if df is None:
+            return pd.DataFrame()
+        df = self._slice(df, period, start, end).copy()
+        self._count_bars(len(df))
+        return df
+
+    def _download(self, symbols, period, start, end, interval):
+        if self._serve(len(symbols)) == "empty":
+            return pd.DataFrame()
+
+        frames = {}
+        for symbol in symbols:
+            df = self.frame(symbol)
+            if df is not None:
+                # yf.download는 날짜만 있는(타임존 없는) 인덱스로 반환
+                df = self._slice(df, period, start, end)
+                self._count_bars(len(df))
+                frames[symbol] = df.set_axis(df.index.tz_localize(None).normalize())
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame()
+
+    def _info(self, symbol):
+        self._serve(1)
+        if self.root:
+            path = os.path.join(self.root, f"{symbol}.info.json")
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+
+        korean = symbol.endswith(('.KS', '.KQ'))
+        df = self.frame(symbol)
+        price = float(df['Close'].iloc[-1]) if df is not None and not df.empty else 0.0
+        shares = 1_000_000 + zlib.crc32(symbol.encode()) % 1_000_000_000
+        return {
+            'symbol': symbol,
+            'longName': symbol,
+            'shortName': symbol,
+            'sector': 'N/A',
+            'industry': 'N/A',
+            'marketCap': int(price * shares),
+            'trailingPE': 10 + zlib.crc32(symbol.encode()) % 30,
+            'currentPrice': price,
+            'regularMarketPrice': price,
+            'currency': 'KRW' if korean else 'USD'
+        }
+
+
+def record(symbols: List[str], root: str, period: str = "2y",
+           provider: Optional[MarketDataProvider] = None) -> Dict[str, int]:
+    """provider(기본: 현재 데이터 소스)에서 받은 이력을 ReplayProvider용 파일로 저장
+
+    반환값은 {symbol: 저장한 봉 수}입니다.
+    """
+    provider = provider or get_provider()
+    os.makedirs(root, exist_ok=True)
+    saved = {}
+    for symbol in symbols:
+        try:
+            df = provider.history(symbol, period=period)
+        except Exception:
+            continue
+        if df is None or df.empty:
+            continue
+        df[[c for c in OHLCV_COLUMNS if c in df.columns]].to_parquet(
+            os.path.join(root, f"{symbol}.parquet")
+        )
+        saved[symbol] = len(df)
+    return saved
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def _default_provider() -> MarketDataProvider:
+    if PROVIDER == "replay":
+        return ReplayProvider(REPLAY_DIR, latency=REPLAY_LATENCY, error_rate=REPLAY_ERROR_RATE)
+    return YFinanceProvider()
+
+
+def get_provider() -> MarketDataProvider:
+    """프로세스 공용 데이터 소스 (STOCK_SCREENER_PROVIDER 환경 변수로 선택)"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = _default_provider()
+        return _provider
+
+
+def set_provider(provider: Optional[MarketDataProvider]) -> Optional[MarketDataProvider]:
+    """데이터 소스 교체 (None이면 환경 변수 기본값으로 되돌림), 이전 데이터 소스 반환"""
+    global _provider
+    with _provider_lock:
+        previous, _provider = _provider, provider
+        return previous
@@ -0,0 +1,494 @@
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from bulk_download import chunk_symbols, download_bulk
+import market_calendar
+from market_data import get_provider, period_start
+from single_flight import get_single_flight
+
+# 저장소 위치 (시장별 하위 디렉토리에 종목별 Parquet 파일)
+STORE_DIR = os.environ.get("STOCK_SCREENER_STORE", "data_store")
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# 장중 진행 중인 봉을 다시 받기 전까지 기다리는 시간 (초)
+REFRESH_TTL = market_calendar.INTRADAY_TTL
+
+# 종목별 저장이 이어질 때 매니페스트를 다시 쓰는 최소 간격 (초)
+MANIFEST_SAVE_INTERVAL = 1.0
+
+# 수정주가 변경(배당/분할) 감지 허용 오차
+ADJUSTMENT_TOLERANCE = 0.005
+
+
+def symbol_market(symbol: str) -> str:
+    """종목 코드로 저장소 파티션(시장) 결정"""
+    if symbol.endswith('.KS'):
+        return "KOSPI"
+    if symbol.endswith('.KQ'):
+        return "KOSDAQ"
+    return "US"
+
+
+def _naive(ts) -> pd.Timestamp:
+    """타임존 정보를 제거한 Timestamp (날짜 비교용)"""
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize(None) if ts.tz is not None else ts
+
+
+def _fetch_history(symbol: str, period: str = None, start=None, end=None) -> pd.DataFrame:
+    """데이터 소스에 개별 종목 요청"""
+    return get_provider().history(symbol, period=period, start=start, end=end)
+
+
+class OHLCVStore:
+    """시장별로 파티션된 종목별 OHLCV Parquet 저장소
+
+    시장마다 _manifest.json에 종목별 마지막 봉(워터마크), 첫 봉, 마지막 갱신 시각을 기록합니다.
+    갱신 시에는 워터마크 이후 봉만 받아서 뒤에 붙입니다.
+    종목별 마지막 네트워크 응답(ok/empty)은 take_responses()로 가져가 종목 상태 기록에 씁니다.
+    """
+
+    def __init__(self, root: str = STORE_DIR, refresh_ttl: int = REFRESH_TTL):
+        self.root = root
+        self.refresh_ttl = refresh_ttl
+        self._manifests = {}
+        self._dirty = set()
+        self._saved_at = {}
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    # ---- 경로 / 매니페스트 ----
+
+    def _market_dir(self, market: str) -> str:
+        return os.path.join(self.root, market)
+
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self._market_dir(symbol_market(symbol)), f"{symbol}.parquet")
+
+    def _manifest(self, market: str) -> Dict[str, dict]:
+        if market not in self._manifests:
+            path = os.path.join(self._market_dir(market), "_manifest.json")
+            manifest = {}
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        manifest = json.load(f)
+                except Exception:
+                    manifest = {}
+            self._manifests[market] = manifest
+        return self._manifests[market]
+
+    def _save_manifest(self, market: str):
+        self._dirty.discard(market)
+        self._saved_at[market] = time.monotonic()
+        os.makedirs(self._market_dir(market), exist_ok=True)
+        path = os.path.join(self._market_dir(market), "_manifest.json")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifests[market], f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _mark_dirty(self, market: str, flush: bool):
+        """매니페스트 변경 표시 (flush=True여도 최소 간격 안이면 다음 저장으로 미룸)"""
+        self._dirty.add(market)
+        if flush and time.monotonic() - self._saved_at.get(market, 0) >= MANIFEST_SAVE_INTERVAL:
+            self._save_manifest(market)
+
+    def flush(self):
+        """미뤄 둔 매니페스트 저장"""
+        with self._lock:
+            for market in list(self._dirty):
+                self._save_manifest(market)
+
+    def entry(self, symbol: str) -> Optional[dict]:
+        """종목의 매니페스트 항목"""
+        with self._lock:
+            return self._manifest(symbol_market(symbol)).get(symbol)
+
+    def symbols(self) -> List[str]:
+        """저장된 전체 종목 (시장별 매니페스트 기준)"""
+        markets = [m for m in sorted(os.listdir(self.root))
+                   if os.path.isdir(self._market_dir(m))] if os.path.isdir(self.root) else []
+        with self._lock:
+            return [symbol for market in markets for symbol in self._manifest(market)]
+
+    def watermark(self, symbol: str) -> Optional[pd.Timestamp]:
+        """저장된 마지막 봉 시각"""
+        entry = self.entry(symbol)
+        return pd.Timestamp(entry['last_bar']) if entry else None
+
+    # ---- 읽기 / 쓰기 ----
+
+    def load(self, symbol: str) -> Optional[pd.DataFrame]:
+        """저장된 전체 이력"""
+        path = self._path(symbol)
+        if self.entry(symbol) is None or not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            return None
+
+    def write(self, symbol: str, df: pd.DataFrame, covers_from: Optional[pd.Timestamp] = None,
+              flush: bool = True, refreshed: bool = True):
+        """이력 전체를 저장하고 워터마크 갱신 (flush=False면 매니페스트 저장을 flush()까지 미룸)
+
+        refreshed=False면(앞부분만 붙인 경우) 최근 봉을 확인한 것이 아니므로 갱신 시각을 그대로 둡니다.
+        """
+        df = df[[c for c in OHLCV_COLUMNS if c in df.columns]]
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+
+        market = symbol_market(symbol)
+        os.makedirs(self._market_dir(market), exist_ok=True)
+        path = self._path(symbol)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            manifest = self._manifest(market)
+            previous = manifest.get(symbol, {})
+            covers = _naive(covers_from if covers_from is not None else df.index[0])
+            if previous.get('covers_from'):
+                covers = min(_naive(previous['covers_from']), covers)
+            manifest[symbol] = {
+                'first_bar': df.index[0].isoformat(),
+                'last_bar': df.index[-1].isoformat(),
+                'covers_from': covers.isoformat(),
+                'updated': previous['updated'] if previous and not refreshed
+                           else datetime.now(timezone.utc).isoformat()
+            }
+            self._mark_dirty(market, flush)
+
+    def append(self, symbol: str, new_bars: pd.DataFrame, flush: bool = True) -> Optional[pd.DataFrame]:
+        """워터마크 이후 봉을 기존 이력 뒤에 붙임 (겹치는 봉은 새 값으로 교체)
+
+        겹치는 완료 봉의 종가가 달라졌다면 수정주가가 바뀐 것이므로 None을 반환해
+        호출 측이 전체를 다시 받도록 합니다.
+        """
+        existing = self.load(symbol)
+        if new_bars is None or new_bars.empty:
+            # 새 봉을 확인한 것이 아니므로 갱신 시각도 그대로 (다음 조회에서 다시 요청)
+            return existing
+        if existing is None or existing.empty:
+            self.write(symbol, new_bars, flush=flush)
+            return new_bars
+
+        overlap = existing.index.intersection(new_bars.index)
+        if len(overlap) > 1:
+            # 마지막(진행 중일 수 있는) 봉을 제외한 겹치는 봉으로 수정주가 변경 확인
+            check = overlap[:-1]
+            old_close = existing.loc[check, 'Close'].astype(float)
+            new_close = new_bars.loc[check, 'Close'].astype(float)
+            if ((old_close - new_close).abs() > old_close.abs() * ADJUSTMENT_TOLERANCE).any():
+                return None
+
+        merged = pd.concat([existing[existing.index < new_bars.index[0]], new_bars[OHLCV_COLUMNS]])
+        self.write(symbol, merged, flush=flush)
+        return merged
+
+    def prepend(self, symbol: str, old_bars: Optional[pd.DataFrame], covers_from: pd.Timestamp,
+                flush: bool = True) -> Optional[pd.DataFrame]:
+        """저장된 첫 봉 이전 구간을 앞에 붙이고 covers_from까지 포함한다고 기록
+
+        old_bars는 저장된 첫 봉까지 포함해서 받아야 하며, 그 봉의 종가가 다르면
+        수정주가가 바뀐 것이므로 None을 반환합니다. 빈 응답(상장 전 구간)이어도
+        covers_from은 갱신되어 같은 구간을 다시 요청하지 않습니다.
+        """
+        existing = self.load(symbol)
+        if existing is None or existing.empty:
+            return None
+
+        if old_bars is not None and not old_bars.empty:
+            overlap = existing.index.intersection(old_bars.index)
+            if len(overlap):
+                old_close = existing.loc[overlap, 'Close'].astype(float)
+                new_close = old_bars.loc[overlap, 'Close'].astype(float)
+                if ((old_close - new_close).abs() > old_close.abs() * ADJUSTMENT_TOLERANCE).any():
+                    return None
+            older = old_bars[old_bars.index < existing.index[0]]
+            if not older.empty:
+                existing = pd.concat([older[OHLCV_COLUMNS].astype(existing.dtypes.to_dict()), existing])
+
+        self.write(symbol, existing, covers_from=covers_from, flush=flush, refreshed=False)
+        return existing
+
+    # ---- 네트워크 응답 ----
+
+    def _record_response(self, symbol: str, bars: Optional[pd.DataFrame]):
+        with self._lock:
+            self._responses[symbol] = "empty" if bars is None or bars.empty else "ok"
+
+    def take_responses(self, symbols: List[str]) -> Dict[str, str]:
+        """종목별 마지막 네트워크 응답(ok/empty)을 꺼냄
+
+        요청하지 않은(저장된 이력이 신선한) 종목, 상장 전 구간 요청, 묶음 전체가 빈 일괄 요청의
+        종목은 응답으로 판단할 수 없으므로 포함되지 않습니다.
+        """
+        with self._lock:
+            return {symbol: self._responses.pop(symbol) for symbol in symbols if symbol in self._responses}
+
+    def _download(self, symbols: List[str], chunk_size: int, downloader: Callable = None,
+                  **window) -> Dict[str, pd.DataFrame]:
+        """일괄 다운로드 후 묶음별로 종목 응답 기록
+
+        묶음 전체가 비었으면(요청 한도, 일시 장애) 종목 탓이 아니므로 기록하지 않습니다.
+        """
+        frames = {}
+        for chunk in chunk_symbols(list(symbols), chunk_size):
+            received = download_bulk(chunk, chunk_size=len(chunk), downloader=downloader, **window)
+            if received:
+                for symbol in chunk:
+                    self._record_response(symbol, received.get(symbol))
+            frames.update(received)
+        return frames
+
+    # ---- 신선도 판단 ----
+
+    def is_fresh(self, symbol: str, now: datetime = None) -> bool:
+        """네트워크 요청 없이 저장된 데이터를 그대로 써도 되는지 확인
+
+        종목 시장(KRX/NYSE)의 거래소 달력 기준입니다 (market_calendar.is_fresh).
+        장 마감 후 확인한 이력은 다음 장 마감 전까지(야간/주말/휴장일 내내) 유효하고,
+        장중에는 진행 중인 봉만 바뀌므로 refresh_ttl초마다 마지막 봉만 다시 받습니다.
+        """
+        entry = self.entry(symbol)
+        if entry is None:
+            return False
+
+        updated = datetime.fromisoformat(entry['updated'])
+        return market_calendar.is_fresh(symbol, updated, now, intraday_ttl=self.refresh_ttl)
+
+    def backfill_range(self, symbol: str, start: pd.Timestamp):
+        """요청 구간 중 저장되지 않은 앞부분 [start, 첫 봉 다음 날) (첫 봉은 수정주가 확인용으로 겹침)"""
+        first_bar = _naive(self.entry(symbol)['first_bar']).normalize()
+        return (_naive(start).strftime('%Y-%m-%d'),
+                (first_bar + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+
+    def covers(self, symbol: str, start: Optional[pd.Timestamp]) -> bool:
+        """저장된 이력이 요청 구간의 시작까지 포함하는지"""
+        entry = self.entry(symbol)
+        if entry is None:
+            return False
+        if start is None:
+            return False
+        return _naive(entry['covers_from']) <= _naive(start)
+
+    # ---- 조회 ----
+
+    def get_history(self, symbol: str, period: str = "3mo",
+                    fetcher: Callable = None) -> Optional[pd.DataFrame]:
+        """저장소 우선 조회 후 필요한 만큼만 네트워크 요청
+
+        저장된 이력보다 짧은 구간은 그대로 잘라서 반환합니다.
+        - 이력이 없으면(또는 "max" 요청이 전체를 포함하지 않으면) period 전체 요청
+        - 요청 구간보다 짧으면 모자란 앞부분만 요청해서 앞에 붙임
+        - 오래되었으면 워터마크 직전 봉부터 요청해서 붙임
+
+        같은 (저장소, 종목, 주기, 구간) 동시 요청은 세션과 관계없이 한 번만 수행합니다.
+        """
+        key = ('get_history', self.root, symbol, "1d", period)
+        df, shared = get_single_flight().do(key, self._get_history, symbol, period, fetcher)
+        return df.copy(deep=False) if shared and df is not None else df
+
+    def _get_history(self, symbol: str, period: str, fetcher: Callable = None) -> Optional[pd.DataFrame]:
+        fetcher = fetcher or _fetch_history
+        start = period_start(period, pd.Timestamp.now())
+
+        df = self.load(symbol)
+        if df is None or (start is None and not self.covers(symbol, start)):
+            df = fetcher(symbol, period=period)
+            self._record_response(symbol, df)
+            if df is None or df.empty:
+                return None
+            self.write(symbol, df, covers_from=start)
+            return self._window(df, start)
+
+        if not self.covers(symbol, start):
+            backfill_start, backfill_end = self.backfill_range(symbol, start)
+            old_bars = fetcher(symbol, start=backfill_start, end=backfill_end)
+            extended = self.prepend(symbol, self._match_tz(symbol, old_bars), covers_from=start)
+            if extended is None:
+                # 수정주가 변경 → 전체 재수집
+                self.forget(symbol)
+                return self._get_history(symbol, period, fetcher)
+            df = extended
+
+        if not self.is_fresh(symbol):
+            resume = df.index[-2] if len(df) > 1 else df.index[-1]
+            new_bars = fetcher(symbol, start=resume.strftime('%Y-%m-%d'))
+            self._record_response(symbol, new_bars)
+            merged = self.append(symbol, self._match_tz(symbol, new_bars))
+            if merged is None:
+                # 수정주가 변경 → 전체 재수집
+                self.forget(symbol)
+                return self._get_history(symbol, period, fetcher)
+            df = merged
+
+        return self._window(df, start)
+
+    def refresh_many(self, symbols: List[str], period: str = "3mo",
+                     chunk_size: int = 100, downloader: Callable = None) -> Dict[str, pd.DataFrame]:
+        """여러 종목을 일괄 갱신 후 요청 구간만 반환
+
+        신선한 종목은 요청하지 않고, 이력이 없는 종목은 period 전체를, 이력이 요청 구간보다
+        짧은 종목은 모자란 앞부분만, 오래된 종목은 밀린 최근 봉만(_refresh_tails) 일괄 다운로드로 받습니다.
+        같은 종목 묶음에 대한 동시 갱신(여러 세션이 같은 시장을 스크리닝)은 한 번만 수행합니다.
+        """
+        key = ('refresh_many', self.root, tuple(symbols), "1d", period)
+        frames, shared = get_single_flight().do(
+            key, self._refresh_many, symbols, period, chunk_size, downloader
+        )
+        if shared:
+            frames = {symbol: df.copy(deep=False) for symbol, df in frames.items()}
+        return frames
+
+    def _refresh_many(self, symbols: List[str], period: str, chunk_size: int,
+                      downloader: Callable = None) -> Dict[str, pd.DataFrame]:
+        start = period_start(period, pd.Timestamp.now())
+        result = {}
+        missing, short, stale = [], [], []
+
+        for symbol in symbols:
+            if self.entry(symbol) is None or start is None:
+                missing.append(symbol)
+                continue
+            if not self.covers(symbol, start):
+                short.append(symbol)
+            if not self.is_fresh(symbol):
+                stale.append(symbol)
+
+        if missing:
+            frames = self._download(missing, chunk_size, downloader, period=period)
+            for symbol, df in frames.items():
+                self.write(symbol, df, covers_from=start, flush=False)
+
+        if short:
+            backfill_end = max(self.backfill_range(s, start)[1] for s in short)
+            backfill_start = _naive(start).strftime('%Y-%m-%d')
+            frames = download_bulk(short, start=backfill_start, end=backfill_end,
+                                   chunk_size=chunk_size, downloader=downloader)
+            for symbol in short:
+                old_bars = frames.get(symbol)
+                if old_bars is not None:
+                    old_bars = self._match_tz(symbol, old_bars)
+                if self.prepend(symbol, old_bars, covers_from=start, flush=False) is None:
+                    self.forget(symbol)
+                    missing_frames = self._download([symbol], chunk_size, downloader, period=period)
+                    if symbol in missing_frames:
+                        self.write(symbol, missing_frames[symbol], covers_from=start, flush=False)
+
+        # 앞부분 갱신 중 삭제되고 다시 받지도 못한 종목은 붙일 이력이 없음
+        stale = [symbol for symbol in stale if self.entry(symbol) is not None]
+        if stale:
+            rewrite = self._refresh_tails(stale, chunk_size, downloader)
+            if rewrite:
+                # 수정주가 변경 → 전체 재수집
+                frames = self._download(rewrite, chunk_size, downloader, period=period)
+                for symbol, df in frames.items():
+                    self.write(symbol, df, covers_from=start, flush=False)
+
+        self.flush()
+
+        for symbol in symbols:
+            df = self.load(symbol)
+            if df is not None and not df.empty:
+                result[symbol] = self._window(df, start)
+
+        return result
+
+    def _refresh_tails(self, stale: List[str], chunk_size: int,
+                       downloader: Callable = None) -> List[str]:
+        """오래된 종목의 최근 봉만 받아 뒤에 붙이고, 수정주가가 바뀐 종목 목록 반환
+
+        밀린 거래일 수(market_calendar.missing_sessions)에 따라 최근 1거래일("1d": 진행 중인
+        마지막 봉) / 5거래일("5d") / 워터마크 1주 전부터로 나눠 일괄 요청합니다.
+        요청 구간은 항상 저장된 마지막 봉을 포함하므로 장중에 저장된(미완성) 봉도 확정 값으로 바뀝니다.
+        장중 재스크리닝은 대부분 "1d"이므로 종목당 봉 하나만 전송됩니다.
+        """
+        groups = {"1d": [], "5d": [], "resume": []}
+        for symbol in stale:
+            missing = market_calendar.missing_sessions(symbol, self.entry(symbol)['last_bar'])
+            if missing == 0:
+                groups["1d"].append(symbol)
+            elif missing <= 4:
+                groups["5d"].append(symbol)
+            else:
+                groups["resume"].append(symbol)
+
+        rewrite = []
+        for window, group in groups.items():
+            if not group:
+                continue
+            if window == "resume":
+                resume = min(_naive(self.entry(s)['last_bar']) for s in group)
+                resume = (resume - pd.Timedelta(days=7)).strftime('%Y-%m-%d')
+                frames = self._download(group, chunk_size, downloader, start=resume)
+            else:
+                frames = self._download(group, chunk_size, downloader, period=window)
+
+            for symbol in group:
+                new_bars = frames.get(symbol)
+                if new_bars is None:
+                    # 빈 응답은 확인한 것이 아니므로 갱신 시각을 그대로 둠 (다음 조회에서 다시 요청)
+                    continue
+                if self.append(symbol, self._match_tz(symbol, new_bars), flush=False) is None:
+                    self.forget(symbol)
+                    rewrite.append(symbol)
+        return rewrite
+
+    def forget(self, symbol: str):
+        """저장된 이력 삭제"""
+        market = symbol_market(symbol)
+        with self._lock:
+            if self._manifest(market).pop(symbol, None) is not None:
+                self._save_manifest(market)
+        if os.path.exists(self._path(symbol)):
+            os.remove(self._path(symbol))
+
+    def _match_tz(self, symbol: str, bars: pd.DataFrame) -> pd.DataFrame:
+        """일괄 다운로드(날짜만 있는 인덱스)를 저장된 이력의 타임존에 맞춤"""
+        if bars is None or bars.empty or not isinstance(bars.index, pd.DatetimeIndex):
+            # 빈 응답은 인덱스가 날짜가 아님 (prepend/append가 빈 응답으로 처리)
+            return bars
+        entry = self.entry(symbol)
+        stored_tz = pd.Timestamp(entry['last_bar']).tz if entry else None
+        if stored_tz is not None and bars.index.tz is None:
+            bars = bars.copy()
+            bars.index = bars.index.tz_localize(stored_tz)
+        elif stored_tz is None and bars.index.tz is not None:
+            bars = bars.copy()
+            bars.index = bars.index.tz_localize(None)
+        return bars
+
+    @staticmethod
+    def _window(df: pd.DataFrame, start: Optional[pd.Timestamp]) -> pd.DataFrame:
+        if start is None:
+            return df
+        if df.index.tz is not None:
+            start = pd.Timestamp(start).tz_localize(df.index.tz)
+        return df[df.index >= start]
+
+
+_default_store = None
+
+
+def get_store() -> OHLCVStore:
+    """프로세스 공용 저장소"""
+    global _default_store
+    if _default_store is None:
+        _default_store = OHLCVStore()
+        atexit.register(_default_store.flush)
+    return _default_store
+
+
+def load_history(symbol: str, period: str = "3mo") -> Optional[pd.DataFrame]:
+    """저장소를 거쳐 종목 이력 조회"""
+    return get_store().get_history(symbol, period)
@@ -0,0 +1,265 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from indicator_core import INDICATOR_PARAMS
+from indicator_demand import needs
+
+PANEL_FIELDS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+class Panel:
+    """여러 종목의 OHLCV를 (봉 × 종목) 2차원 float64 배열로 정렬한 묶음
+
+    각 종목의 봉을 마지막 봉 기준으로 오른쪽 정렬하고 앞쪽 빈 칸은 NaN으로 채웁니다.
+    같은 시장 종목이면 행이 곧 거래일이고, 종목마다 자기 봉 순서를 그대로 유지하므로
+    지표 값이 종목별 계산과 같습니다 (거래정지로 빠진 날이 있어도 어긋나지 않음).
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], fields: Sequence[str] = PANEL_FIELDS):
+        self.frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+        self.symbols: List[str] = list(self.frames)
+        self.index = {symbol: j for j, symbol in enumerate(self.symbols)}
+        self.lengths = np.array([len(self.frames[s]) for s in self.symbols], dtype=np.int64)
+        self.rows = int(self.lengths.max()) if self.symbols else 0
+        self.first_row = self.rows - self.lengths
+        self.fields = {}
+        for field in fields:
+            if not all(field in df.columns for df in self.frames.values()):
+                continue
+            data = np.full((self.rows, len(self.symbols)), np.nan)
+            for column, symbol in enumerate(self.symbols):
+                data[self.first_row[column]:, column] = self.frames[symbol][field].to_numpy(dtype=np.float64)
+            self.fields[field] = data
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.fields[field]
+
+    @property
+    def age(self) -> np.ndarray:
+        """종목별 몇 번째 봉인지 (앞쪽 빈 칸은 음수)"""
+        return np.arange(self.rows)[:, None] - self.first_row[None, :]
+
+    def column(self, values: np.ndarray, symbol: str) -> np.ndarray:
+        """한 종목의 실제 봉 구간 값"""
+        j = self.index[symbol]
+        return values[self.first_row[j]:, j]
+
+    def last(self, values: np.ndarray, back: int = 0) -> np.ndarray:
+        """종목별 마지막(back=1이면 그 전) 봉 값"""
+        return values[self.rows - 1 - back]
+
+    def by_date(self, values: np.ndarray, fill=np.nan) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+        """(봉 × 종목) 값을 (날짜 × 종목)으로: 날짜는 종목별 현지 날짜의 합집합, 그날 봉이 없는 칸은 fill
+
+        시장마다 휴장일이 달라도 같은 날짜 행에 모입니다 (종목 프레임 인덱스가 DatetimeIndex여야 함).
+        """
+        dates = [local_dates(self.frames[s].index) for s in self.symbols]
+        calendar = pd.DatetimeIndex(np.unique(np.concatenate([d.to_numpy() for d in dates]))) if dates \
+            else pd.DatetimeIndex([])
+        out = np.full((len(calendar), len(self.symbols)), fill, dtype=values.dtype)
+        for j, index in enumerate(dates):
+            out[calendar.get_indexer(index), j] = values[self.first_row[j]:, j]
+        return calendar, out
+
+    def attach(self, values: Dict[str, np.ndarray], columns: Optional[Dict[str, str]] = None,
+               symbols: Optional[Iterable[str]] = None) -> Dict[str, pd.DataFrame]:
+        """{symbol: 원본 프레임 + 지표 컬럼} (columns: {붙일 컬럼명: values 키}, 기본은 values 그대로)"""
+        columns = columns or {name: name for name in values}
+        result = {}
+        for symbol in (symbols if symbols is not None else self.symbols):
+            j = self.index[symbol]
+            df = self.frames[symbol]
+            data = {name: df[name].to_numpy() for name in df.columns if name not in columns}
+            for name, key in columns.items():
+                data[name] = values[key][self.first_row[j]:, j]
+            result[symbol] = pd.DataFrame(data, index=df.index)
+        return result
+
+
+def local_dates(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    """시간대가 있으면 현지 시각 그대로 시간대만 떼고 날짜로 (한국/미국 종목 날짜를 같은 축에)"""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+# ---- 2차원 기본 연산 (행 방향, 창 안에 NaN이 있으면 NaN: pandas rolling(min_periods=window)과 같음) ----
+
+def _shift(x: np.ndarray, periods: int = 1) -> np.ndarray:
+    shifted = np.full_like(x, np.nan)
+    shifted[periods:] = x[:-periods]
+    return shifted
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """이동평균 (누적합 차분, 열 평균을 빼서 정밀도 유지)"""
+    valid = ~np.isnan(x)
+    # 값이 하나도 없는 열(봉이 모자란 종목의 지표 등)은 0을 기준으로 (nanmean 경고 방지)
+    counted = valid.sum(axis=0)
+    center = np.where(counted > 0, np.where(valid, x, 0.0).sum(axis=0) / np.maximum(counted, 1), 0.0)
+    filled = np.where(valid, x - center, 0.0)
+    sums = np.cumsum(filled, axis=0)
+    counts = np.cumsum(valid, axis=0)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    out = sums / window + center
+    out[counts < window] = np.nan
+    return out
+
+
+def _windows(x: np.ndarray, window: int, reduce) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    if len(x) >= window:
+        with np.errstate(invalid='ignore'):
+            out[window - 1:] = reduce(sliding_window_view(x, window, axis=0), axis=-1)
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """이동 표본표준편차 (ddof=1)"""
+    return _windows(x, window, lambda w, axis: w.std(axis=axis, ddof=1))
+
+
+def rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    return _windows(x, window, np.max)
+
+
+def rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    return _windows(x, window, np.min)
+
+
+def ewm(x: np.ndarray, alpha: float, adjust: bool = False) -> np.ndarray:
+    """지수이동평균 (pandas ewm(alpha, adjust).mean()과 같음, 열마다 첫 유효 값부터 시작)
+
+    행 수만큼 반복하지만 각 단계는 전체 종목에 대한 벡터 연산입니다.
+    """
+    out = np.full_like(x, np.nan)
+    if not len(x):
+        return out
+    decay = 1 - alpha
+    if adjust:
+        # 가중합/가중치합 재귀: y_t = Σ decay^i x_{t-i} / Σ decay^i
+        numerator = np.where(np.isnan(x[0]), 0.0, x[0])
+        weights = np.where(np.isnan(x[0]), 0.0, 1.0)
+        out[0] = np.where(weights > 0, numerator, np.nan)
+        for t in range(1, len(x)):
+            valid = ~np.isnan(x[t])
+            numerator = np.where(valid, decay * numerator + np.where(valid, x[t], 0.0), numerator)
+            weights = np.where(valid, decay * weights + 1.0, weights)
+            out[t] = np.where(weights > 0, numerator / np.where(weights > 0, weights, 1.0), np.nan)
+        return out
+
+    out[0] = x[0]
+    for t in range(1, len(x)):
+        previous = out[t - 1]
+        out[t] = np.where(np.isnan(previous), x[t], decay * previous + alpha * x[t])
+    return out
+
+
+# ---- 지표 묶음 ----
+
+def _mask_warmup(values: np.ndarray, age: np.ndarray, rows: int) -> np.ndarray:
+    """종목별 처음 rows개 봉은 NaN (ta 라이브러리의 min_periods와 같은 처리)"""
+    values[age < rows] = np.nan
+    return values
+
+
+def ta_indicators(panel: Panel, params: Optional[dict] = None, oscillators: bool = False,
+                  keys: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """ta 라이브러리 정의의 전체 종목 지표 (indicator_core.compute_arrays와 같은 값)
+
+    BB_Middle/Upper/Lower, RSI, MACD, MACD_Signal, MACD_Histogram, MA_{창}, Volume_MA와
+    oscillators=True면 Stoch_K, Stoch_D, Williams_R(14, 3)까지 계산합니다.
+    keys를 주면 그 지표가 속한 묶음만 계산합니다 (indicator_demand.indicator_group).
+    """
+    p = params or INDICATOR_PARAMS
+    fast, slow, signal = p['macd']
+    close, age = panel['Close'], panel.age
+    values = {}
+
+    if needs(keys, 'BB'):
+        middle = rolling_mean(close, p['bb_period'])
+        std = rolling_std(close, p['bb_period'])
+        values['BB_Middle'] = middle
+        values['BB_Upper'] = middle + std * p['bb_std']
+        values['BB_Lower'] = middle - std * p['bb_std']
+    for window in p['ma_windows']:
+        if needs(keys, f'MA_{window}'):
+            values[f'MA_{window}'] = rolling_mean(close, window)
+    if needs(keys, 'Volume_MA'):
+        values['Volume_MA'] = rolling_mean(panel['Volume'], p['volume_ma'])
+
+    if needs(keys, 'RSI'):
+        # RSI: 첫 봉의 변화량은 0으로 시작 (ta와 같음)
+        padding = age < 0
+        diff = close - _shift(close)
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+        up[padding] = np.nan
+        down[padding] = np.nan
+        alpha = 1 / p['rsi_window']
+        ema_up, ema_down = ewm(up, alpha), ewm(down, alpha)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(ema_down == 0, 100.0, 100 - (100 / (1 + ema_up / ema_down)))
+        rsi[padding] = np.nan
+        values['RSI'] = _mask_warmup(rsi, age, p['rsi_window'] - 1)
+
+    if needs(keys, 'MACD'):
+        macd = ewm(close, 2 / (fast + 1)) - ewm(close, 2 / (slow + 1))
+        macd = _mask_warmup(macd, age, slow - 1)
+        signal_line = _mask_warmup(ewm(macd, 2 / (signal + 1)), age, slow + signal - 2)
+        values['MACD'] = macd
+        values['MACD_Signal'] = signal_line
+        values['MACD_Histogram'] = macd - signal_line
+
+    if oscillators and (needs(keys, 'Stoch') or needs(keys, 'Williams_R')):
+        high, low = panel['High'], panel['Low']
+        highest, lowest = rolling_max(high, 14), rolling_min(low, 14)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stoch_k = 100 * (close - lowest) / (highest - lowest)
+            values['Williams_R'] = -100 * (highest - close) / (highest - lowest)
+        values['Stoch_K'] = stoch_k
+        values['Stoch_D'] = rolling_mean(stoch_k, 3)
+    return values
+
+
+def simple_indicators(panel: Panel, ma_windows: Sequence[int] = (5, 20, 60)) -> Dict[str, np.ndarray]:
+    """complete_app.CompleteStockScreener 정의의 전체 종목 지표
+
+    RSI는 단순 이동평균(rolling mean) 방식, MACD는 pandas ewm 기본값(adjust=True)입니다.
+    """
+    close = panel['Close']
+    values = {}
+
+    middle = rolling_mean(close, 20)
+    std = rolling_std(close, 20)
+    values['BB_Middle'] = middle
+    values['BB_Upper'] = middle + std * 2
+    values['BB_Lower'] = middle - std * 2
+
+    diff = close - _shift(close)
+    gain = np.where(diff > 0, diff, 0.0)
+    loss = np.where(diff < 0, -diff, 0.0)
+    # 첫 봉의 변화량(NaN)은 0으로 취급 (Series.where와 같음), 앞쪽 빈 칸만 NaN
+    padding = panel.age < 0
+    gain[padding] = np.nan
+    loss[padding] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values['RSI'] = 100 - (100 / (1 + rolling_mean(gain, 14) / rolling_mean(loss, 14)))
+
+    macd = ewm(close, 2 / 13, adjust=True) - ewm(close, 2 / 27, adjust=True)
+    signal_line = ewm(macd, 2 / 10, adjust=True)
+    values['MACD'] = macd
+    values['MACD_Signal'] = signal_line
+    values['MACD_Histogram'] = macd - signal_line
+
+    for window in ma_windows:
+        values[f'MA_{window}'] = rolling_mean(close, window)
+    values['Volume_MA'] = rolling_mean(panel['Volume'], 20)
+    return values
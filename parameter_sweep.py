@@ -0,0 +1,196 @@
+import itertools
+import random
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backtest import HORIZONS, forward_arrays, map_chunks, panel_from_arrays, strategy_columns
+from indicator_pool import POOL_WORKERS
+from panel_indicators import Panel, rolling_mean, rolling_std, ta_indicators
+from strategy_builder import PresetStrategies
+from strategy_compiler import STRATEGY_INDICATOR_PARAMS
+
+# 탐색할 값 (현재 기본값: BB(20, 2), RSI 70/30, 거래량 1.5배, 이동평균 20/50)
+SWEEP_GRID = {
+    'bb_period': (10, 20, 30),
+    'bb_std': (1.5, 2.0, 2.5, 3.0),
+    'rsi_upper': (60, 65, 70, 75, 80),
+    'rsi_lower': (20, 25, 30, 35, 40),
+    'volume_multiplier': (1.0, 1.2, 1.5, 2.0, 3.0),
+    'ma_fast': (5, 10, 20, 30),
+    'ma_slow': (50, 60, 100, 120, 200),
+}
+
+# 사전 정의 전략별 탐색 변수 (bb_*는 지표 계산 변수, 나머지는 PresetStrategies 인자)
+PRESET_PARAMETERS = {
+    'momentum_breakout': ('bb_period', 'bb_std', 'rsi_upper', 'volume_multiplier'),
+    'oversold_reversal': ('bb_period', 'bb_std', 'rsi_lower'),
+    'golden_cross': ('ma_fast', 'ma_slow'),
+}
+INDICATOR_PARAMETERS = ('bb_period', 'bb_std')
+
+# 결과 표 정렬 기준 보유 기간과 최소 신호 수 (신호가 적은 조합은 우연히 순위가 높아지므로 제외)
+RANK_HORIZON = 20
+MIN_SIGNALS = 30
+
+# 조합 × 보유 기간별 누적 통계 열
+_COUNT, _SUM, _SQUARES, _HITS, _DRAWDOWN, _WORST = range(6)
+
+
+def parameter_points(preset: str, grid: Optional[Dict[str, Sequence]] = None, samples: Optional[int] = None,
+                     seed: int = 0) -> List[dict]:
+    """전략의 탐색 변수 격자 전체 또는 samples개 무작위 조합 (단기 이동평균 >= 장기인 조합은 제외)"""
+    grid = dict(SWEEP_GRID, **(grid or {}))
+    names = PRESET_PARAMETERS[preset]
+    points = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    points = [p for p in points if p.get('ma_fast', 0) < p.get('ma_slow', 1)]
+    if samples is not None and samples < len(points):
+        points = random.Random(seed).sample(points, samples)
+    return points
+
+
+def preset_strategy(preset: str, point: dict):
+    """조합의 전략 인자로 만든 PresetStrategies 전략"""
+    return getattr(PresetStrategies, preset)(**{k: v for k, v in point.items() if k not in INDICATOR_PARAMETERS})
+
+
+class SweepIndicators:
+    """한 패널에서 조합들이 같이 쓰는 중간 배열 캐시
+
+    이동평균은 창마다, 볼린저 밴드 표준편차는 기간마다 한 번만 계산하고 배수(bb_std)가 달라도
+    같은 중간선/표준편차를 재사용합니다 (BB_Middle도 같은 창의 이동평균 그대로).
+    RSI, MACD, 거래량 평균은 탐색 변수와 상관없이 한 번만 계산합니다.
+    """
+
+    def __init__(self, panel: Panel, params: Optional[dict] = None):
+        self.panel = panel
+        self.params = params or STRATEGY_INDICATOR_PARAMS
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+    def _get(self, key: tuple, compute) -> np.ndarray:
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def moving_average(self, window: int) -> np.ndarray:
+        return self._get(('MA', window), lambda: rolling_mean(self.panel['Close'], window))
+
+    def fixed(self, key: str) -> np.ndarray:
+        """탐색 변수와 상관없는 지표 (RSI, MACD*, Volume_MA, 같은 묶음은 한 번에)"""
+        if ('fixed', key) not in self._cache:
+            for name, values in ta_indicators(self.panel, self.params, keys=[key]).items():
+                self._cache.setdefault(('fixed', name), values)
+        return self._cache[('fixed', key)]
+
+    def values(self, keys: Sequence[str], bb_period: int = 20, bb_std: float = 2.0) -> Dict[str, np.ndarray]:
+        """ta_indicators와 같은 키의 지표 배열 (keys에 있는 것만)"""
+        values = {}
+        for key in keys:
+            if key == 'BB_Middle':
+                values[key] = self.moving_average(bb_period)
+            elif key in ('BB_Upper', 'BB_Lower'):
+                middle = self.moving_average(bb_period)
+                std = self._get(('std', bb_period), lambda: rolling_std(self.panel['Close'], bb_period))
+                sign = 1 if key == 'BB_Upper' else -1
+                values[key] = self._get((key, bb_period, bb_std), lambda: middle + sign * std * bb_std)
+            elif key.startswith('MA_'):
+                values[key] = self.moving_average(int(key[3:]))
+            else:
+                values[key] = self.fixed(key)
+        return values
+
+
+def _sweep_arrays(inputs: np.ndarray, fields: Sequence[str], spans: list, preset: str, points: List[dict],
+                  horizons: Sequence[int]) -> np.ndarray:
+    """구간 종목들의 패널에서 조합마다 신호 수익률/낙폭 누적 통계 (조합 × 보유 기간 × 통계)"""
+    panel = panel_from_arrays(inputs, fields, spans)
+    indicators = SweepIndicators(panel)
+    forward = {h: forward_arrays(panel['Close'], h) for h in horizons}
+    stats = np.zeros((len(points), len(horizons), 6))
+    for i, point in enumerate(points):
+        strategy = preset_strategy(preset, point)
+        compiled = strategy.compile()
+        columns = strategy_columns(strategy)
+        keys = [columns[name] for name in compiled.indicators if name in columns]
+        values = indicators.values(keys, point.get('bb_period', 20), point.get('bb_std', 2.0))
+        signals = compiled.evaluate_panel(panel, values, columns, dates=True)
+        for k, h in enumerate(horizons):
+            returns, drawdowns = forward[h]
+            valid = signals & ~np.isnan(returns)
+            r, d = returns[valid], drawdowns[valid]
+            if len(r):
+                stats[i, k] = (len(r), r.sum(), (r * r).sum(), (r > 0).sum(), d.sum(), d.min())
+    return stats
+
+
+class SweepResult:
+    """조합별 백테스트 지표 (종목 묶음별 누적 통계를 합친 값)"""
+
+    def __init__(self, preset: str, points: List[dict], horizons: Sequence[int]):
+        self.preset = preset
+        self.points = points
+        self.horizons = list(horizons)
+        self.stats = np.zeros((len(points), len(self.horizons), 6))
+        self.symbols = 0
+        self.elapsed = 0.0
+
+    def _add(self, stats: np.ndarray):
+        self.stats[..., :_WORST] += stats[..., :_WORST]
+        self.stats[..., _WORST] = np.minimum(self.stats[..., _WORST], stats[..., _WORST])
+
+    def table(self, horizon: int = RANK_HORIZON, sort_by: str = '평균 수익률(%)',
+              min_signals: int = MIN_SIGNALS) -> pd.DataFrame:
+        """조합별 신호 수, 평균 수익률, 적중률, 신호당 샤프(평균/표준편차), 평균/최대 낙폭 (sort_by 내림차순 순위)"""
+        stats = self.stats[:, self.horizons.index(horizon)]
+        count = stats[:, _COUNT]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = stats[:, _SUM] / count
+            std = np.sqrt(np.maximum(stats[:, _SQUARES] / count - mean ** 2, 0) * count / (count - 1))
+            table = pd.DataFrame(self.points)
+            table['신호 수'] = count.astype(np.int64)
+            table['평균 수익률(%)'] = mean * 100
+            table['적중률(%)'] = stats[:, _HITS] / count * 100
+            table['샤프(신호당)'] = mean / std
+            table['평균 낙폭(%)'] = stats[:, _DRAWDOWN] / count * 100
+            table['최대 낙폭(%)'] = np.where(count > 0, stats[:, _WORST] * 100, np.nan)
+        table = table[table['신호 수'] >= min_signals]
+        table = table.sort_values(sort_by, ascending=False, kind='stable').reset_index(drop=True)
+        table.index += 1
+        return table
+
+
+def sweep(preset: str, frames: Dict[str, pd.DataFrame], grid: Optional[Dict[str, Sequence]] = None,
+          samples: Optional[int] = None, horizons: Sequence[int] = HORIZONS, workers: int = POOL_WORKERS,
+          seed: int = 0) -> SweepResult:
+    """사전 정의 전략의 임계값 조합을 과거 전체 봉에서 백테스트
+
+    종목 묶음(패널)마다 모든 조합을 평가하므로 같은 묶음 안에서는 지표 중간 배열을 조합끼리
+    공유하고(SweepIndicators), 묶음은 작업 프로세스들에 나눠 모든 코어를 씁니다 (backtest.map_chunks).
+    """
+    started = time.time()
+    points = parameter_points(preset, grid, samples, seed)
+    result = SweepResult(preset, points, horizons)
+    for symbols, stats in map_chunks(_sweep_arrays, frames, (preset, points, list(horizons)), workers):
+        result._add(stats)
+        result.symbols += len(symbols)
+    result.elapsed = time.time() - started
+    return result
+
+
+if __name__ == "__main__":
+    # 저장소의 모든 종목 이력으로 사전 정의 전략 임계값 탐색 (python parameter_sweep.py [전략] [무작위 조합 수])
+    import sys
+
+    from ohlcv_store import get_store
+
+    presets = sys.argv[1:2] or list(PRESET_PARAMETERS)
+    samples = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    store = get_store()
+    frames = {symbol: store.load(symbol) for symbol in store.symbols()}
+    for preset in presets:
+        result = sweep(preset, frames, samples=samples)
+        print(f"=== {preset}: {len(result.points)}개 조합, {result.symbols}개 종목 "
+              f"({result.elapsed:.1f}초, 프로세스 {POOL_WORKERS}개) ===")
+        print(result.table().head(20).round(2).to_string())
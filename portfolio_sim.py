@@ -0,0 +1,251 @@
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ohlcv_store import symbol_market
+
+# 시장별 통화와 통화별 기본 초기 현금 (환전 없이 통화마다 따로 운용)
+CURRENCIES = ('KRW', 'USD')
+INITIAL_CASH = {'KRW': 100_000_000, 'USD': 100_000}
+
+# 매매 수수료 + 세금 (체결 금액 대비, 매수/매도 각각)
+FEE_RATE = 0.0015
+
+# 변동성 가중에서 한 종목 비중 상한 (동일 비중의 배수)
+MAX_WEIGHT_MULTIPLE = 2.0
+
+# 연환산에 쓰는 연간 거래일 수
+TRADING_DAYS = 252
+
+# 체결 기록 배열 (사유: 0 진입, 1 청산, 2 손절, 3 재조정)
+TRADE_DTYPES = {'day': np.int64, 'symbol': np.int64, 'shares': np.float64, 'price': np.float64, 'reason': np.int64}
+
+
+def symbol_currency(symbol: str) -> str:
+    return 'KRW' if symbol_market(symbol) in ('KOSPI', 'KOSDAQ') else 'USD'
+
+
+class SimulationResult:
+    """날짜별 통화별 자산/현금/보유 종목 수와 체결 기록"""
+
+    def __init__(self, dates: pd.DatetimeIndex, symbols: List[str], currencies: Sequence[str],
+                 initial: np.ndarray, equity: np.ndarray, cash: np.ndarray, holdings: np.ndarray,
+                 trades: Dict[str, np.ndarray], elapsed: float):
+        self.dates = dates
+        self.symbols = symbols
+        self.currencies = list(currencies)
+        self.initial = initial
+        self.equity = equity
+        self.cash = cash
+        self.holdings = holdings
+        self._trades = trades
+        self.elapsed = elapsed
+
+    def equity_frame(self) -> pd.DataFrame:
+        """날짜 × 통화 평가 자산 (현지 통화)"""
+        return pd.DataFrame(self.equity, index=self.dates, columns=self.currencies)
+
+    def trades(self) -> pd.DataFrame:
+        """체결 기록: 날짜, 종목, 수량(매수 +, 매도 -), 가격, 사유(진입/청산/손절/재조정)"""
+        t = self._trades
+        return pd.DataFrame({
+            '날짜': self.dates[t['day']],
+            '종목': np.array(self.symbols, dtype=object)[t['symbol']],
+            '수량': t['shares'],
+            '가격': t['price'],
+            '사유': np.array(['진입', '청산', '손절', '재조정'], dtype=object)[t['reason']],
+        })
+
+    def summary(self) -> pd.DataFrame:
+        """통화별 초기/최종 자산, 총/연환산 수익률, 최대 낙폭, 일간 샤프(연환산), 체결 수, 평균 보유 종목 수"""
+        rows = []
+        currency = np.array([symbol_currency(s) for s in self.symbols])[self._trades['symbol']]
+        for c, name in enumerate(self.currencies):
+            equity = self.equity[:, c]
+            if not len(equity) or self.initial[c] <= 0:
+                continue
+            returns = np.diff(equity, prepend=self.initial[c]) / np.concatenate([[self.initial[c]], equity[:-1]])
+            peak = np.maximum.accumulate(np.concatenate([[self.initial[c]], equity]))[1:]
+            years = len(equity) / TRADING_DAYS
+            std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+            rows.append({
+                '통화': name,
+                '초기 자산': self.initial[c],
+                '최종 자산': equity[-1],
+                '총 수익률(%)': (equity[-1] / self.initial[c] - 1) * 100,
+                '연환산 수익률(%)': ((equity[-1] / self.initial[c]) ** (1 / years) - 1) * 100,
+                '최대 낙폭(%)': (equity / peak - 1).min() * 100,
+                '샤프': returns.mean() / std * np.sqrt(TRADING_DAYS) if std > 0 else np.nan,
+                '체결 수': int((currency == name).sum()),
+                '평균 보유 종목 수': self.holdings[:, c].mean(),
+            })
+        return pd.DataFrame(rows).set_index('통화') if rows else pd.DataFrame()
+
+
+class PortfolioSimulator:
+    """날짜별 매칭 종목으로 진입/청산/재조정을 흉내 내는 이벤트(거래일) 단위 포트폴리오 시뮬레이터
+
+    종목별 보유 수량/진입가/진입일을 배열 하나씩으로 두고 날마다 전체 종목에 대한 벡터 연산으로
+    처리하므로 거래 건마다 객체를 만들지 않습니다. 모든 체결은 그날 종가, 통화(KRW/USD)마다
+    현금과 보유 한도를 따로 둡니다. 하루 순서는 청산(보유 기간/시계열 끝/손절) → 재조정 → 신규 진입입니다.
+    보유 기간이 지났는데 거래가 없거나 시계열이 끝난(상장폐지/거래정지) 종목은 마지막 거래 종가로 청산합니다.
+
+    - weighting="equal": 종목당 그 통화 자산의 1/max_positions
+    - weighting="volatility": 동일 비중 × (그날 통화 내 변동성 중앙값 / 종목 변동성),
+      MAX_WEIGHT_MULTIPLE배 상한 (변동성이 낮은 종목을 더 많이)
+    """
+
+    def __init__(self, max_positions: int = 10, weighting: str = "equal", hold_days: int = 20,
+                 stop_loss: Optional[float] = None, rebalance_days: int = 0, fee: float = FEE_RATE,
+                 cash: Optional[Dict[str, float]] = None):
+        if weighting not in ("equal", "volatility"):
+            raise ValueError(f"알 수 없는 비중 방식: {weighting}")
+        self.max_positions = max_positions
+        self.weighting = weighting
+        self.hold_days = hold_days
+        self.stop_loss = stop_loss
+        self.rebalance_days = rebalance_days
+        self.fee = fee
+        self.cash = dict(INITIAL_CASH, **(cash or {}))
+
+    def _weights(self, volatility: Optional[np.ndarray], currency: np.ndarray) -> np.ndarray:
+        """종목별 목표 비중 (변동성 가중에서 그날 변동성을 모르는 종목은 0)"""
+        base = np.full(len(currency), 1.0 / self.max_positions)
+        if self.weighting == "equal":
+            return base
+        weights = np.zeros(len(currency))
+        known = ~np.isnan(volatility) & (volatility > 0)
+        for c in np.unique(currency[known]):
+            members = known & (currency == c)
+            reference = np.median(volatility[members])
+            weights[members] = base[members] * np.minimum(reference / volatility[members], MAX_WEIGHT_MULTIPLE)
+        return weights
+
+    def run(self, dates: pd.DatetimeIndex, symbols: List[str], close: np.ndarray, signals: np.ndarray,
+            scores: Optional[np.ndarray] = None, volatility: Optional[np.ndarray] = None) -> SimulationResult:
+        """(날짜 × 종목) 종가(그날 거래가 없으면 NaN)와 매칭 여부로 시뮬레이션
+
+        scores가 있으면 자리가 모자랄 때 점수가 높은 종목부터 (같으면 종목 순서) 진입합니다.
+        volatility는 weighting="volatility"일 때 필요한 그날까지의 일간 수익률 표준편차입니다.
+        """
+        started = time.time()
+        if self.weighting == "volatility" and volatility is None:
+            raise ValueError("변동성 가중에는 volatility 배열이 필요합니다")
+        days, n = close.shape
+        currencies = list(CURRENCIES)
+        currency = np.array([currencies.index(symbol_currency(s)) for s in symbols], dtype=np.int64)
+        scores = np.zeros((days, n)) if scores is None else scores
+
+        # 종목별 마지막 거래일 (이후로 종가가 없으면 상장폐지/거래정지로 보고 청산)
+        available = ~np.isnan(close)
+        last_day = np.where(available.any(axis=0), days - 1 - np.argmax(available[::-1], axis=0), -1)
+
+        cash = np.array([float(self.cash[c]) for c in currencies])
+        initial = cash.copy()
+        shares = np.zeros(n)
+        entry_price = np.zeros(n)
+        entry_day = np.zeros(n, dtype=np.int64)
+        last_price = np.full(n, np.nan)
+
+        equity_log = np.zeros((days, len(currencies)))
+        cash_log = np.zeros((days, len(currencies)))
+        holdings_log = np.zeros((days, len(currencies)), dtype=np.int64)
+        trades = {name: [] for name in TRADE_DTYPES}
+
+        def record(day, index, quantity, price, reason):
+            if len(index):
+                trades['day'].append(np.full(len(index), day))
+                trades['symbol'].append(index)
+                trades['shares'].append(quantity)
+                trades['price'].append(price)
+                trades['reason'].append(np.full(len(index), reason))
+
+        def settle(index, quantity, price):
+            """체결 금액(수수료 포함)을 통화별 현금에 반영 (quantity: 매수 +, 매도 -)"""
+            amount = quantity * price
+            flow = -amount - np.abs(amount) * self.fee
+            cash[:] += np.bincount(currency[index], weights=flow, minlength=len(currencies))
+            shares[index] += quantity
+
+        for t in range(days):
+            price = close[t]
+            traded = ~np.isnan(price)
+            last_price = np.where(traded, price, last_price)
+            held = shares > 0
+
+            # 1. 청산: 보유 기간이 지났거나 시계열이 끝났거나 손절가 아래
+            #    (그날 거래가 없으면 마지막 거래 종가로, 손절은 그날 거래가 있는 종목만)
+            expired = held & ((t - entry_day >= self.hold_days) | (t > last_day))
+            stopped = held & traded & ~expired
+            stopped &= price <= entry_price * (1 - self.stop_loss) if self.stop_loss else False
+            exit_price = np.where(traded, price, last_price)
+            for mask, reason in ((expired, 1), (stopped, 2)):
+                index = np.flatnonzero(mask)
+                record(t, index, -shares[index], exit_price[index], reason)
+                settle(index, -shares[index], exit_price[index])
+            held = shares > 0
+
+            value = np.where(held, shares * np.nan_to_num(last_price), 0.0)
+            equity = cash + np.bincount(currency, weights=value, minlength=len(currencies))
+
+            # 2. 재조정: 보유 종목을 목표 비중으로 (매도 먼저, 매수는 현금 한도 안에서)
+            if self.rebalance_days and t % self.rebalance_days == 0:
+                active = held & traded
+                weights = self._weights(volatility[t] if volatility is not None else None, currency)
+                target = np.where(active & (weights > 0),
+                                  np.floor(equity[currency] * weights / np.where(traded, price, 1.0)), shares)
+                change = np.where(active, target - shares, 0.0)
+                sells = np.flatnonzero(change < 0)
+                record(t, sells, change[sells], price[sells], 3)
+                settle(sells, change[sells], price[sells])
+                buys = np.flatnonzero(change > 0)
+                buys = buys[self._affordable(buys, change[buys] * price[buys], currency, cash)]
+                record(t, buys, change[buys], price[buys], 3)
+                settle(buys, change[buys], price[buys])
+
+            # 3. 신규 진입: 통화별 남은 자리만큼 점수 높은 순서로
+            candidates = signals[t] & traded & (shares == 0)
+            if candidates.any():
+                weights = self._weights(volatility[t] if volatility is not None else None, currency)
+                candidates &= weights > 0
+                slots = self.max_positions - np.bincount(currency[shares > 0], minlength=len(currencies))
+                index = np.flatnonzero(candidates)
+                index = index[np.lexsort((index, -scores[t, index]))]
+                rank = np.zeros(len(index), dtype=np.int64)
+                for c in range(len(currencies)):
+                    members = currency[index] == c
+                    rank[members] = np.arange(members.sum())
+                index = index[rank < slots[currency[index]]]
+                quantity = np.floor(equity[currency[index]] * weights[index] / (price[index] * (1 + self.fee)))
+                index, quantity = index[quantity > 0], quantity[quantity > 0]
+                keep = self._affordable(index, quantity * price[index], currency, cash)
+                index, quantity = index[keep], quantity[keep]
+                record(t, index, quantity, price[index], 0)
+                settle(index, quantity, price[index])
+                entry_price[index] = price[index]
+                entry_day[index] = t
+
+            held = shares > 0
+            value = np.where(held, shares * np.nan_to_num(last_price), 0.0)
+            equity_log[t] = cash + np.bincount(currency, weights=value, minlength=len(currencies))
+            cash_log[t] = cash
+            holdings_log[t] = np.bincount(currency[held], minlength=len(currencies))
+
+        trades = {name: np.concatenate(parts) if parts else np.empty(0, dtype=TRADE_DTYPES[name])
+                  for name, parts in trades.items()}
+        # 종목이 없는 통화는 결과에서 제외
+        used = [c for c in range(len(currencies)) if (currency == c).any()]
+        return SimulationResult(dates, symbols, [currencies[c] for c in used], initial[used],
+                                equity_log[:, used], cash_log[:, used], holdings_log[:, used], trades,
+                                time.time() - started)
+
+    def _affordable(self, index: np.ndarray, amounts: np.ndarray, currency: np.ndarray, cash: np.ndarray) -> np.ndarray:
+        """순서대로 살 때 통화별 현금(수수료 포함) 안에 드는 주문만 True"""
+        cost = amounts * (1 + self.fee)
+        keep = np.zeros(len(index), dtype=bool)
+        for c in np.unique(currency[index]):
+            members = currency[index] == c
+            keep[members] = np.cumsum(cost[members]) <= cash[c] + 1e-9
+        return keep
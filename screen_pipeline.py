@@ -0,0 +1,169 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# 단계 사이 큐의 기본 최대 길이 (앞 단계가 이만큼 앞서가면 뒤 단계가 따라올 때까지 대기)
+QUEUE_SIZE = 64
+
+# 큐 대기 중 중단 여부를 확인하는 간격 (초)
+_POLL = 0.1
+
+_END = object()
+
+
+class _Stage:
+    """파이프라인 한 단계: 입력 큐에서 꺼내 fn을 적용하고 다음 큐에 넣는 작업 스레드 묶음"""
+
+    def __init__(self, name: str, fn: Callable, workers: int, fan_out: bool, queue_size: int):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.fan_out = fan_out
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy = 0.0
+        self._running = workers
+        self._lock = threading.Lock()
+
+
+class Pipeline:
+    """크기 제한 큐로 연결된 단계별 작업 스레드 파이프라인
+
+    source → stage 1 → stage 2 → ... → run()을 소비하는 쪽 순서로 흐르며, 각 단계는 자기
+    작업 스레드에서 동시에 돌아가므로 네트워크 대기(수집)와 CPU 작업(지표 계산/조건 평가)이 겹칩니다.
+    큐 길이가 제한되어 있어 빠른 단계가 느린 단계보다 queue_size 이상 앞서가지 않습니다.
+    - fn(item)의 반환값이 다음 단계 입력 (fan_out=True면 반환한 목록의 항목 각각)
+    - fn에서 예외가 나면 그 항목은 버리고 errors에 집계
+    - stats()로 단계별 처리 수, 큐 길이, 처리량, 가동률 확인
+    """
+
+    def __init__(self, source: Iterable, queue_size: int = QUEUE_SIZE):
+        self.source = source
+        self.queue_size = queue_size
+        self.stages: List[_Stage] = []
+        self.started = None
+        self.finished = None
+        self._output = None
+        self._stop = threading.Event()
+
+    def stage(self, name: str, fn: Callable, workers: int = 1, fan_out: bool = False,
+              queue_size: Optional[int] = None) -> "Pipeline":
+        """단계 추가 (queue_size는 이 단계 입력 큐 길이)"""
+        self.stages.append(_Stage(name, fn, max(1, workers), fan_out, queue_size or self.queue_size))
+        return self
+
+    # ---- 실행 ----
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """중단되지 않는 한 큐에 넣음 (꽉 차 있으면 대기)"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _feed(self):
+        target = self.stages[0].inbox if self.stages else self._output
+        try:
+            for item in self.source:
+                if not self._put(target, item):
+                    return
+        finally:
+            self._put(target, _END)
+
+    def _work(self, stage: _Stage, target: queue.Queue):
+        while True:
+            item = self._get(stage.inbox)
+            if item is _END:
+                # 같은 단계의 다른 작업 스레드도 끝내도록 다시 넣고, 마지막 스레드가 다음 단계에 종료 전달
+                # (중단된 경우 입력 큐가 꽉 차 있을 수 있으므로 대기하지 않음)
+                self._put(stage.inbox, _END)
+                with stage._lock:
+                    stage._running -= 1
+                    last = stage._running == 0
+                if last:
+                    self._put(target, _END)
+                return
+
+            started = time.perf_counter()
+            try:
+                result = stage.fn(item)
+                outputs = list(result) if stage.fan_out else [result]
+            except Exception:
+                outputs = None
+            elapsed = time.perf_counter() - started
+
+            with stage._lock:
+                stage.busy += elapsed
+                stage.processed += 1
+                if outputs is None:
+                    stage.errors += 1
+                else:
+                    stage.emitted += len(outputs)
+            for output in outputs or ():
+                if not self._put(target, output):
+                    return
+
+    def run(self) -> Iterator:
+        """파이프라인을 시작하고 마지막 단계 결과를 나오는 순서대로 내보냄 (중간에 멈추면 작업 중단)"""
+        self._output = queue.Queue(maxsize=self.queue_size)
+        self.started = time.perf_counter()
+        threads = [threading.Thread(target=self._feed, name="pipeline-source", daemon=True)]
+        for position, stage in enumerate(self.stages):
+            target = self.stages[position + 1].inbox if position + 1 < len(self.stages) else self._output
+            threads.extend(
+                threading.Thread(target=self._work, args=(stage, target), name=f"pipeline-{stage.name}", daemon=True)
+                for _ in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(self._output)
+                if item is _END:
+                    return
+                yield item
+        finally:
+            self._stop.set()
+            self.finished = time.perf_counter()
+
+    def close(self):
+        """실행 중인 파이프라인 중단"""
+        self._stop.set()
+
+    def stats(self) -> List[Dict[str, float]]:
+        """단계별 처리 수/오류 수/입력 큐 길이/처리량(건/초)/가동률(작업 시간 ÷ 경과 시간 × 스레드 수)"""
+        if self.started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished or time.perf_counter()) - self.started
+        rows = []
+        for stage in self.stages:
+            with stage._lock:
+                processed, emitted, errors, busy = stage.processed, stage.emitted, stage.errors, stage.busy
+            rows.append({
+                'stage': stage.name,
+                'workers': stage.workers,
+                'processed': processed,
+                'emitted': emitted,
+                'errors': errors,
+                'queue_depth': stage.inbox.qsize(),
+                'queue_size': stage.inbox.maxsize,
+                'throughput': processed / elapsed if elapsed else 0.0,
+                'utilization': busy / (elapsed * stage.workers) if elapsed else 0.0
+            })
+        return rows
@@ -0,0 +1,109 @@
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import pandas as pd
+
+
+class _Call:
+    """진행 중인 호출 하나 (결과를 기다리는 쪽과 공유)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """같은 키의 동시 호출을 하나로 합침
+
+    먼저 들어온 호출(leader)만 실제로 실행하고, 실행 중에 같은 키로 들어온 호출은
+    그 결과(또는 예외)를 함께 받습니다. 완료된 뒤 들어온 호출은 새로 실행됩니다.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """(결과, 공유 여부) 반환"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        return call.result, False
+
+
+# 프로세스 공용 (Streamlit 세션은 같은 프로세스의 스레드로 실행됨)
+_group = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    return _group
+
+
+def _share(value):
+    """결과를 함께 받는 쪽이 컬럼을 추가해도 원본이 바뀌지 않도록 얕은 복사"""
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    if isinstance(value, tuple):
+        return tuple(_share(v) for v in value)
+    return value
+
+
+def single_flight(key_fn: Callable = None):
+    """함수 호출을 (함수, 인자) 키로 합치는 데코레이터
+
+    key_fn이 없으면 self/_self를 제외한 모든 인자(기본값 포함)를 키로 사용합니다.
+    메서드에 적용하면 서로 다른 인스턴스(세션)의 같은 요청도 합쳐집니다.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        def default_key(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(
+                (name, value) for name, value in bound.arguments.items()
+                if name not in ('self', '_self')
+            )
+
+        make_key = key_fn or default_key
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (fn.__module__, fn.__qualname__, make_key(*args, **kwargs))
+            result, shared = _group.do(key, fn, *args, **kwargs)
+            return _share(result) if shared else result
+
+        return wrapper
+
+    return decorator
@@ -43,6 +43,7 @@ class StrategyBuilder:
     def __init__(self):
         self.conditions = []
         self.combination_logic = "AND"  # AND, OR
+        self._compiled = None  # (조건 서명, CompiledStrategy)
         
     def add_condition(self, condition: Condition):
         """조건 추가"""
@@ -53,23 +54,29 @@ class StrategyBuilder:
         self.combination_logic = logic
         
     def evaluate_strategy(self, data: pd.DataFrame) -> bool:
-        """전략 평가"""
-        if data is None or data.empty or len(data) < 2:
-            return False
-            
-        results = []
-        
-        for condition in self.conditions:
-            result = self._evaluate_condition(data, condition)
-            results.append(result)
-            
-        if self.combination_logic == "AND":
-            return all(results)
-        else:  # OR
-            return any(results) if results else False
+        """전략 평가 (컴파일된 DAG로 같은 지표/비교는 한 번만 계산)"""
+        return self.compile().evaluate(data)
+
+    def compile(self):
+        """조건들을 지표/비교 노드 DAG로 컴파일 (조건이 그대로면 이전 결과 재사용)
+
+        여러 종목은 compile().evaluate_frames({symbol: 프레임})로 한 번에 평가합니다.
+        """
+        from strategy_compiler import compile_strategy
+        signature = repr((self.combination_logic, [
+            (c.condition_type, c.operator, c.value, c.parameters) for c in self.conditions
+        ]))
+        compiled = getattr(self, '_compiled', None)
+        if compiled is None or compiled[0] != signature:
+            compiled = self._compiled = (signature, compile_strategy(self))
+        return compiled[1]
+
+    def required_indicators(self) -> List[str]:
+        """조건들이 읽는 지표 컬럼 (이 컬럼만 계산해도 evaluate_strategy 결과가 같음)"""
+        return self.compile().indicators
     
     def _evaluate_condition(self, data: pd.DataFrame, condition: Condition) -> bool:
-        """개별 조건 평가"""
+        """개별 조건 평가 (한 종목씩 직접 계산하는 기준 구현, 컴파일 결과 검증용)"""
         try:
             if condition.condition_type == ConditionType.BOLLINGER_BAND:
                 return self._evaluate_bollinger_band(data, condition)
@@ -153,8 +160,10 @@ class StrategyBuilder:
         if condition.operator == Operator.CROSS_ABOVE:
             if condition.parameters and 'ma_type' in condition.parameters:
                 if condition.parameters['ma_type'] == 'golden_cross':
-                    # 골든 크로스 (20일선이 50일선 상향 돌파)
-                    return (prev['SMA_20'] <= prev['SMA_50']) and (latest['SMA_20'] > latest['SMA_50'])
+                    # 골든 크로스 (단기선이 장기선 상향 돌파, 기본 20일/50일)
+                    fast = f"SMA_{condition.parameters.get('fast', 20)}"
+                    slow = f"SMA_{condition.parameters.get('slow', 50)}"
+                    return (prev[fast] <= prev[slow]) and (latest[fast] > latest[slow])
                 elif condition.parameters['ma_type'] == 'price_above_ma20':
                     # 주가가 20일선 상향 돌파
                     return (prev['Close'] <= prev['SMA_20']) and (latest['Close'] > latest['SMA_20'])
@@ -204,7 +213,7 @@ class PresetStrategies:
     """사전 정의된 전략들"""
     
     @staticmethod
-    def momentum_breakout() -> StrategyBuilder:
+    def momentum_breakout(rsi_upper: float = 70, volume_multiplier: float = 1.5) -> StrategyBuilder:
         """모멘텀 돌파 전략"""
         strategy = StrategyBuilder()
         
@@ -219,11 +228,11 @@ class PresetStrategies:
         
         # RSI 70 이하 (과매수 아님)
         rsi_condition = Condition(
-            name="RSI < 70",
+            name=f"RSI < {rsi_upper}",
             condition_type=ConditionType.RSI,
             operator=Operator.LESS_THAN,
-            value=70,
-            description="RSI가 70 이하 (과매수 구간 아님)"
+            value=rsi_upper,
+            description=f"RSI가 {rsi_upper} 이하 (과매수 구간 아님)"
         )
         
         # 거래량 급증
@@ -231,8 +240,8 @@ class PresetStrategies:
             name="거래량 급증",
             condition_type=ConditionType.VOLUME,
             operator=Operator.GREATER_THAN,
-            value=1.5,
-            description="평균 거래량의 1.5배 이상"
+            value=volume_multiplier,
+            description=f"평균 거래량의 {volume_multiplier}배 이상"
         )
         
         strategy.add_condition(bb_condition)
@@ -243,7 +252,7 @@ class PresetStrategies:
         return strategy
     
     @staticmethod
-    def oversold_reversal() -> StrategyBuilder:
+    def oversold_reversal(rsi_lower: float = 30) -> StrategyBuilder:
         """과매도 반전 전략"""
         strategy = StrategyBuilder()
         
@@ -252,8 +261,8 @@ class PresetStrategies:
             name="RSI 과매도 반등",
             condition_type=ConditionType.RSI,
             operator=Operator.CROSS_ABOVE,
-            value=30,
-            description="RSI가 30을 상향 돌파"
+            value=rsi_lower,
+            description=f"RSI가 {rsi_lower}을 상향 돌파"
         )
         
         # 볼린저 밴드 하단 지지
@@ -272,7 +281,7 @@ class PresetStrategies:
         return strategy
     
     @staticmethod
-    def golden_cross() -> StrategyBuilder:
+    def golden_cross(ma_fast: int = 20, ma_slow: int = 50) -> StrategyBuilder:
         """골든 크로스 전략"""
         strategy = StrategyBuilder()
         
@@ -282,8 +291,8 @@ class PresetStrategies:
             condition_type=ConditionType.MOVING_AVERAGE,
             operator=Operator.CROSS_ABOVE,
             value=0,
-            description="20일 이동평균이 50일 이동평균을 상향 돌파",
-            parameters={'ma_type': 'golden_cross'}
+            description=f"{ma_fast}일 이동평균이 {ma_slow}일 이동평균을 상향 돌파",
+            parameters={'ma_type': 'golden_cross', 'fast': ma_fast, 'slow': ma_slow}
         )
         
         # MACD 상승 전환
@@ -0,0 +1,278 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from indicator_core import INDICATOR_PARAMS
+from panel_indicators import Panel, rolling_mean
+from strategy_builder import Condition, ConditionType, Operator
+
+# 가격/거래량 원본 컬럼 (지표가 아님)
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+# 비교 노드 연산 (값 노드끼리 또는 값 노드와 상수)
+PREDICATES = ('gt', 'lt', 'cross_above', 'cross_below', 'false')
+
+# 전체 종목 벡터 연산(panel_indicators.ta_indicators)에서 계산할 지표와 {전략 컬럼명: 키}
+# (AdvancedStockScreener.calculate_technical_indicators와 같은 정의)
+STRATEGY_INDICATOR_PARAMS = dict(INDICATOR_PARAMS, ma_windows=(20, 50, 200))
+STRATEGY_INDICATOR_COLUMNS = {
+    'BB_Middle': 'BB_Middle', 'BB_Upper': 'BB_Upper', 'BB_Lower': 'BB_Lower',
+    'RSI': 'RSI', 'MACD': 'MACD_Histogram', 'MACD_Signal': 'MACD_Signal',
+    'SMA_20': 'MA_20', 'SMA_50': 'MA_50', 'SMA_200': 'MA_200', 'Volume_SMA': 'Volume_MA',
+    'Stoch_K': 'Stoch_K', 'Stoch_D': 'Stoch_D', 'Williams_R': 'Williams_R'
+}
+
+
+def _column(name: str) -> tuple:
+    return ('column', name)
+
+
+class CompiledStrategy:
+    """StrategyBuilder 전략을 지표 노드와 비교 노드의 DAG로 펼친 실행 계획
+
+    노드는 (연산, 인자...) 튜플이라 같은 지표/같은 비교는 조건이 여러 개여도 노드 하나로 합쳐집니다
+    (예: 볼린저 밴드 상단 돌파와 상단 위 조건은 Close/BB_Upper 컬럼 노드를 같이 씀).
+    값 노드는 (봉 × 종목) 배열, 비교 노드는 같은 모양의 bool 배열이고 노드마다 한 번만 계산합니다.
+    """
+
+    def __init__(self, logic: str = "AND"):
+        self.logic = logic
+        self.nodes: Dict[tuple, None] = {}   # 위상 순서 (의존 노드가 먼저)
+        self.conditions: List[tuple] = []    # 조건별 비교 노드
+        self.lookback = 2                    # 마지막 봉 판정에 필요한 봉 수
+
+    # ---- 컴파일 ----
+
+    def _add(self, key: tuple) -> tuple:
+        if key not in self.nodes:
+            for arg in key[1:]:
+                if isinstance(arg, tuple):
+                    self._add(arg)
+            self.nodes[key] = None
+        return key
+
+    def add_condition(self, condition: Condition):
+        self.conditions.append(self._add(self._compile(condition)))
+
+    def _compile(self, condition: Condition) -> tuple:
+        """조건 하나를 비교 노드로 (StrategyBuilder._evaluate_*와 같은 분기)"""
+        kind, operator = condition.condition_type, condition.operator
+        parameters = condition.parameters or {}
+        value = float(condition.value)
+        close = _column('Close')
+
+        if kind == ConditionType.BOLLINGER_BAND:
+            if operator == Operator.BREAKOUT:
+                return ('cross_above', close, _column('BB_Upper'))
+            if operator == Operator.SUPPORT:
+                return ('cross_above', close, _column('BB_Lower'))
+            if operator == Operator.GREATER_THAN:
+                return ('gt', close, _column('BB_Upper'))
+            if operator == Operator.LESS_THAN:
+                return ('lt', close, _column('BB_Lower'))
+        elif kind == ConditionType.RSI:
+            rsi = _column('RSI')
+            if operator == Operator.GREATER_THAN:
+                return ('gt', rsi, value)
+            if operator == Operator.LESS_THAN:
+                return ('lt', rsi, value)
+            if operator == Operator.CROSS_ABOVE:
+                return ('cross_above', rsi, value)
+            if operator == Operator.CROSS_BELOW:
+                return ('cross_below', rsi, value)
+        elif kind == ConditionType.MACD:
+            macd, signal = _column('MACD'), _column('MACD_Signal')
+            if operator == Operator.CROSS_ABOVE:
+                return ('cross_above', macd, signal)
+            if operator == Operator.CROSS_BELOW:
+                return ('cross_below', macd, signal)
+            if operator == Operator.GREATER_THAN:
+                return ('gt', macd, value)
+            if operator == Operator.LESS_THAN:
+                return ('lt', macd, value)
+        elif kind == ConditionType.MOVING_AVERAGE:
+            if operator == Operator.CROSS_ABOVE:
+                if parameters.get('ma_type') == 'golden_cross':
+                    return ('cross_above', _column(f"SMA_{parameters.get('fast', 20)}"),
+                            _column(f"SMA_{parameters.get('slow', 50)}"))
+                if parameters.get('ma_type') == 'price_above_ma20':
+                    return ('cross_above', close, _column('SMA_20'))
+            elif operator == Operator.GREATER_THAN and 'period' in parameters:
+                return ('gt', close, _column(f"SMA_{parameters['period']}"))
+        elif kind == ConditionType.VOLUME:
+            if operator == Operator.GREATER_THAN:
+                # Volume_SMA가 없을 때만 기간 평균을 계산 (같은 기간은 노드 하나)
+                average = ('volume_average', int(parameters.get('period', 20)))
+                self.lookback = max(self.lookback, average[1])
+                return ('gt', _column('Volume'), ('scale', average, value))
+        elif kind == ConditionType.PRICE_ACTION:
+            if operator == Operator.GREATER_THAN:
+                if parameters.get('type') == 'daily_change':
+                    return ('gt', ('change_pct', close, close), value)
+                if parameters.get('type') == 'gap_up':
+                    return ('gt', ('change_pct', _column('Open'), close), value)
+        return ('false',)
+
+    @property
+    def columns(self) -> List[str]:
+        """DAG가 읽는 컬럼 (없으면 그 컬럼을 읽는 비교는 거짓)"""
+        names = [key[1] for key in self.nodes if key[0] == 'column']
+        if any(key[0] == 'volume_average' for key in self.nodes):
+            names += [name for name in ('Volume_SMA', 'Volume') if name not in names]
+        return names
+
+    @property
+    def indicators(self) -> List[str]:
+        """DAG가 읽는 지표 컬럼 (가격/거래량 원본 제외)"""
+        return [name for name in self.columns if name not in PRICE_COLUMNS]
+
+    @property
+    def predicate_nodes(self) -> List[tuple]:
+        return [key for key in self.nodes if key[0] in PREDICATES]
+
+    @property
+    def value_nodes(self) -> List[tuple]:
+        return [key for key in self.nodes if key[0] not in PREDICATES]
+
+    # ---- 실행 ----
+
+    def run(self, source: Dict[str, np.ndarray], shape: tuple) -> np.ndarray:
+        """source({컬럼: shape(봉 × 종목) 배열})의 모든 봉에 대한 전략 결과 (bool 배열)
+
+        교차 조건은 직전 봉이 필요하므로 첫 봉은 거짓입니다.
+        """
+        return self._combine(self._masks(source, shape), shape)
+
+    def _masks(self, source: Dict[str, np.ndarray], shape: tuple) -> List[np.ndarray]:
+        """조건별 결과 배열 (노드마다 한 번만 계산)"""
+        values = {}
+        for key in self.nodes:
+            values[key] = self._evaluate(key, values, source, shape)
+        return [values[key] for key in self.conditions]
+
+    def _combine(self, results: List[np.ndarray], shape: tuple) -> np.ndarray:
+        if self.logic == "AND":
+            return np.logical_and.reduce(results) if results else np.ones(shape, dtype=bool)
+        return np.logical_or.reduce(results) if results else np.zeros(shape, dtype=bool)
+
+    def _evaluate(self, key: tuple, values: dict, source: Dict[str, np.ndarray], shape: tuple):
+        op = key[0]
+        if op == 'column':
+            return source.get(key[1])
+        if op == 'volume_average':
+            if 'Volume_SMA' in source:
+                return source['Volume_SMA']
+            return rolling_mean(source['Volume'], key[1]) if 'Volume' in source else None
+        if op == 'scale':
+            inner = values[key[1]]
+            return None if inner is None else inner * key[2]
+        if op == 'change_pct':
+            current, base = values[key[1]], values[key[2]]
+            if current is None or base is None:
+                return None
+            out = np.full(shape, np.nan)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                out[1:] = (current[1:] - base[:-1]) / base[:-1] * 100
+            return out
+
+        # 비교 노드: 입력 컬럼이 없으면 거짓, NaN과의 비교도 거짓
+        out = np.zeros(shape, dtype=bool)
+        if op == 'false':
+            return out
+        a = values[key[1]]
+        b = values[key[2]] if isinstance(key[2], tuple) else key[2]
+        if a is None or b is None:
+            return out
+        if op == 'gt':
+            return a > b
+        if op == 'lt':
+            return a < b
+        prev_b, b = (b[:-1], b[1:]) if isinstance(b, np.ndarray) else (b, b)
+        if op == 'cross_above':
+            out[1:] = (a[:-1] <= prev_b) & (a[1:] > b)
+        elif op == 'cross_below':
+            out[1:] = (a[:-1] >= prev_b) & (a[1:] < b)
+        return out
+
+    def _stack(self, frames: List[pd.DataFrame], rows: int) -> Dict[str, np.ndarray]:
+        """종목 프레임들의 마지막 rows개 봉을 (rows × 종목) 배열로 (짧은 종목은 앞쪽 NaN)"""
+        source = {}
+        for name in self.columns:
+            if name not in frames[0].columns:
+                continue
+            data = np.full((rows, len(frames)), np.nan)
+            for j, df in enumerate(frames):
+                tail = df[name].to_numpy(dtype=np.float64)[-rows:]
+                data[rows - len(tail):, j] = tail
+            source[name] = data
+        return source
+
+    def evaluate(self, data: Optional[pd.DataFrame]) -> bool:
+        """한 종목 마지막 봉의 전략 결과 (StrategyBuilder.evaluate_strategy와 같은 값)"""
+        if data is None or data.empty or len(data) < 2:
+            return False
+        return bool(self.run(self._stack([data], self.lookback), (self.lookback, 1))[-1, 0])
+
+    def evaluate_frames(self, frames: Dict[str, Optional[pd.DataFrame]]) -> Dict[str, bool]:
+        """{symbol: 마지막 봉의 전략 결과}: 읽는 컬럼 구성이 같은 종목끼리 묶어 DAG를 한 번씩 실행"""
+        groups = {}
+        for symbol, df in frames.items():
+            if df is not None and len(df) >= 2:
+                present = tuple(name in df.columns for name in self.columns)
+                groups.setdefault(present, []).append(symbol)
+
+        result = {symbol: False for symbol in frames}
+        for symbols in groups.values():
+            source = self._stack([frames[s] for s in symbols], self.lookback)
+            matched = self.run(source, (self.lookback, len(symbols)))[-1]
+            result.update(zip(symbols, matched.tolist()))
+        return result
+
+
+    # ---- 전체 종목 벡터 평가 ----
+
+    def _panel_source(self, panel: Panel, values: Dict[str, np.ndarray], columns: Optional[Dict[str, str]],
+                      rows: Optional[int]) -> Dict[str, np.ndarray]:
+        """Panel 가격 필드와 지표 values({키: 배열})를 전략 컬럼 이름으로 (rows를 주면 마지막 rows개 봉만)"""
+        columns = columns or {}
+        source = {}
+        for name in self.columns:
+            if name in panel.fields:
+                data = panel[name]
+            elif columns.get(name, name) in values:
+                data = values[columns.get(name, name)]
+            else:
+                continue
+            source[name] = data if rows is None else data[-rows:]
+        return source
+
+    def condition_masks(self, panel: Panel, values: Dict[str, np.ndarray], columns: Optional[Dict[str, str]] = None,
+                        dates: bool = False) -> List[np.ndarray]:
+        """조건별 bool 마스크: 종목별 마지막 봉 (종목,) 또는 dates=True면 모든 봉 (봉 × 종목)
+
+        values는 ta_indicators 등 (봉 × 종목) 지표 배열, columns는 {전략 컬럼명: values 키}
+        (예: advanced_dashboard.ADVANCED_INDICATOR_COLUMNS, 없으면 이름 그대로)입니다.
+        t번째 봉의 값은 그 봉까지 자른 프레임에 evaluate_strategy를 적용한 결과와 같습니다 (봉이 2개 미만이면 거짓).
+        """
+        rows = None if dates else min(self.lookback, panel.rows)
+        age = panel.age if dates else panel.age[panel.rows - rows:]
+        shape = age.shape
+        enough = age >= 1
+        masks = [mask & enough for mask in self._masks(self._panel_source(panel, values, columns, rows), shape)]
+        return masks if dates else [mask[-1] for mask in masks]
+
+    def evaluate_panel(self, panel: Panel, values: Dict[str, np.ndarray], columns: Optional[Dict[str, str]] = None,
+                       dates: bool = False) -> np.ndarray:
+        """전략 결과 bool 마스크 (종목,) 또는 dates=True면 (봉 × 종목), NumPy 연산 한 번에 전체 종목"""
+        masks = self.condition_masks(panel, values, columns, dates)
+        shape = (panel.rows, len(panel)) if dates else (len(panel),)
+        return self._combine(masks, shape) & (panel.age >= 1 if dates else panel.lengths >= 2)
+
+
+def compile_strategy(strategy) -> CompiledStrategy:
+    """StrategyBuilder → CompiledStrategy"""
+    compiled = CompiledStrategy(strategy.combination_logic)
+    for condition in strategy.conditions:
+        compiled.add_condition(condition)
+    return compiled
@@ -0,0 +1,381 @@
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from indicator_core import ALL_COLUMNS, INDICATOR_PARAMS, compute_arrays
+from ohlcv_store import STORE_DIR
+
+# 상태 파일을 다시 쓰는 최소 간격 (초)
+SAVE_INTERVAL = 5.0
+
+# 누적합 반올림 오차가 쌓이지 않도록 이 봉 수마다 보관 중인 창에서 합을 다시 구함
+RESUM_INTERVAL = 256
+
+_NaT = np.iinfo(np.int64).min
+
+
+class _Layout:
+    """종목별 상태 행(float64 배열 하나)의 칸 배치
+
+    [봉 수, 기준값, 마지막 종가, RSI 상승/하락 평균, MACD 단기/장기/시그널 EMA,
+     종가 창별 합, 볼린저 제곱합, 거래량 합, 진행 중 봉 종가/거래량, 최근 종가 링 버퍼, 최근 거래량 링 버퍼]
+    합은 기준값(anchor)을 뺀 값으로 쌓아 큰 가격(원화)에서도 분산 계산 정밀도를 유지합니다.
+    """
+
+    SCALARS = ('count', 'anchor', 'last_close', 'ema_up', 'ema_down', 'ema_fast', 'ema_slow', 'ema_signal',
+               'sumsq_bb', 'volume_sum', 'pending_close', 'pending_volume')
+
+    def __init__(self, params: dict):
+        self.params = params
+        self.windows = sorted({params['bb_period'], *params['ma_windows']})
+        names = list(self.SCALARS) + [f'sum_{w}' for w in self.windows]
+        self.slot = {name: i for i, name in enumerate(names)}
+        self.close_ring = max(self.windows)
+        self.volume_ring = params['volume_ma']
+        self.close_at = len(names)
+        self.volume_at = self.close_at + self.close_ring
+        self.width = self.volume_at + self.volume_ring
+
+
+class StreamingIndicators:
+    """종목별 지표 상태를 보관하고 새 봉마다 O(1)로 갱신하는 스트리밍 지표 엔진
+
+    Wilder RSI 평균, MACD EMA, 이동 창의 합/제곱합과 최근 봉 링 버퍼를 종목당 float64 한 행에 담아
+    전체 종목 상태를 (종목 × 칸) 배열 하나로 _indicator_state.npz에 저장하므로 재시작해도 이어집니다.
+    - 확정된 봉까지의 상태(committed)와 진행 중인 마지막 봉(pending)을 따로 두어,
+      장중에 마지막 봉이 바뀌면 그 봉만 다시 반영하고 다음 봉이 오면 확정합니다.
+    - 값은 상태를 처음 만든 시점의 이력부터 이어서 계산한 것으로,
+      같은 이력 전체를 한 번에 계산한 값(indicator_core.compute_arrays)과 같습니다.
+    """
+
+    def __init__(self, root: str = STORE_DIR, params: Optional[dict] = None):
+        self.root = root
+        self.params = dict(params or INDICATOR_PARAMS)
+        self.layout = _Layout(self.params)
+        self.seeded = 0
+        self.appended = 0
+        self.unchanged = 0
+        self.cpu_time = 0.0
+        self._rows: Dict[str, int] = None
+        self._state = None
+        self._stamps = None
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+
+    # ---- 파일 ----
+
+    def _path(self) -> str:
+        return os.path.join(self.root, "_indicator_state.npz")
+
+    def _signature(self) -> str:
+        return json.dumps({'params': self.params, 'width': self.layout.width}, sort_keys=True)
+
+    def _table(self):
+        if self._rows is None:
+            self._rows, self._state, self._stamps = {}, np.empty((0, self.layout.width)), np.empty((0, 2), np.int64)
+            if os.path.exists(self._path()):
+                try:
+                    with np.load(self._path()) as saved:
+                        if str(saved['signature']) == self._signature():
+                            self._rows = {str(s): i for i, s in enumerate(saved['symbols'])}
+                            self._state, self._stamps = saved['state'], saved['stamps']
+                except Exception:
+                    pass
+        return self._rows
+
+    def _save(self):
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        os.makedirs(self.root, exist_ok=True)
+        size = len(self._rows)
+        tmp_path = f"{self._path()}.{threading.get_ident()}.tmp.npz"
+        np.savez(tmp_path, signature=np.array(self._signature()), symbols=np.array(list(self._rows), dtype=str),
+                 state=self._state[:size], stamps=self._stamps[:size])
+        os.replace(tmp_path, self._path())
+
+    def flush(self):
+        """미뤄 둔 파일 저장"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _row(self, symbol: str) -> int:
+        rows = self._table()
+        if symbol not in rows:
+            if len(rows) == len(self._state):
+                # 두 배씩 늘려 종목 추가를 평균 O(1)로
+                grow = max(64, len(self._state))
+                self._state = np.vstack([self._state, np.zeros((grow, self.layout.width))])
+                self._stamps = np.vstack([self._stamps, np.full((grow, 2), _NaT, np.int64)])
+            rows[symbol] = len(rows)
+        return rows[symbol]
+
+    # ---- 상태 계산 (종목당 O(1), 여러 종목은 행 묶음으로 한 번에) ----
+
+    def _advance(self, S: np.ndarray, close: np.ndarray, volume: np.ndarray):
+        """확정 상태 행 묶음 S (종목 × 칸)에 종목마다 봉 하나씩 반영 (제자리 수정)"""
+        L, p = self.layout, self.params
+        slot = L.slot
+        fast, slow, signal = p['macd']
+        rows = np.arange(len(S))
+        n = S[:, slot['count']].astype(np.int64)
+        first = n == 0
+
+        S[first, slot['anchor']] = close[first]
+        diff = np.where(first, 0.0, close - S[:, slot['last_close']])
+        alpha = 1 / p['rsi_window']
+        S[:, slot['ema_up']] += alpha * (np.where(diff > 0, diff, 0.0) - S[:, slot['ema_up']])
+        S[:, slot['ema_down']] += alpha * (np.where(diff < 0, -diff, 0.0) - S[:, slot['ema_down']])
+        for name, span in (('ema_fast', fast), ('ema_slow', slow)):
+            S[:, slot[name]] = np.where(first, close, S[:, slot[name]] + 2 / (span + 1) * (close - S[:, slot[name]]))
+        macd = S[:, slot['ema_fast']] - S[:, slot['ema_slow']]
+        signal_line = S[:, slot['ema_signal']]
+        S[:, slot['ema_signal']] = np.where(
+            n == slow - 1, macd,
+            np.where(n > slow - 1, signal_line + 2 / (signal + 1) * (macd - signal_line), signal_line))
+
+        anchor = S[:, slot['anchor']]
+        for window in L.windows:
+            leaving = np.where(n >= window, S[rows, L.close_at + (n - window) % L.close_ring] - anchor, 0.0)
+            S[:, slot[f'sum_{window}']] += (close - anchor) - leaving
+            if window == p['bb_period']:
+                S[:, slot['sumsq_bb']] += (close - anchor) ** 2 - leaving ** 2
+        leaving = np.where(n >= L.volume_ring, S[rows, L.volume_at + (n - L.volume_ring) % L.volume_ring], 0.0)
+        S[:, slot['volume_sum']] += volume - leaving
+
+        S[rows, L.close_at + n % L.close_ring] = close
+        S[rows, L.volume_at + n % L.volume_ring] = volume
+        S[:, slot['last_close']] = close
+        S[:, slot['count']] = n + 1
+        for row in np.flatnonzero((n + 1) % RESUM_INTERVAL == 0):
+            self._resum(S[row])
+
+    def _resum(self, s: np.ndarray):
+        """링 버퍼에서 합/제곱합을 다시 구함 (기준값도 마지막 종가로 옮김)"""
+        L, slot = self.layout, self.layout.slot
+        n = int(s[slot['count']])
+        anchor = s[slot['last_close']]
+        s[slot['anchor']] = anchor
+        for window in L.windows:
+            k = min(n, window)
+            recent = s[[L.close_at + i % L.close_ring for i in range(n - k, n)]] - anchor
+            s[slot[f'sum_{window}']] = recent.sum()
+            if window == self.params['bb_period']:
+                s[slot['sumsq_bb']] = (recent ** 2).sum()
+        k = min(n, L.volume_ring)
+        s[slot['volume_sum']] = s[[L.volume_at + i % L.volume_ring for i in range(n - k, n)]].sum()
+
+    def _values(self, S: np.ndarray) -> Dict[str, np.ndarray]:
+        """상태 행 묶음의 마지막 봉 지표 값 (전체 계산과 같은 위치에서 NaN)"""
+        L, p = self.layout, self.params
+        slot = L.slot
+        fast, slow, signal = p['macd']
+        n = S[:, slot['count']]
+        anchor = S[:, slot['anchor']]
+        values = {}
+
+        def when(ready, value):
+            return np.where(ready, value, np.nan)
+
+        bb = p['bb_period']
+        total = S[:, slot[f'sum_{bb}']]
+        middle = when(n >= bb, total / bb + anchor)
+        variance = np.maximum(0.0, (S[:, slot['sumsq_bb']] - total * total / bb) / (bb - 1))
+        std = when(n >= bb, np.sqrt(variance))
+        values['BB_Middle'] = middle
+        values['BB_Upper'] = middle + std * p['bb_std']
+        values['BB_Lower'] = middle - std * p['bb_std']
+        for window in p['ma_windows']:
+            values[f'MA_{window}'] = when(n >= window, S[:, slot[f'sum_{window}']] / window + anchor)
+        values['Volume_MA'] = when(n >= L.volume_ring, S[:, slot['volume_sum']] / L.volume_ring)
+
+        up, down = S[:, slot['ema_up']], S[:, slot['ema_down']]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(down == 0, 100.0, 100 - (100 / (1 + up / down)))
+        values['RSI'] = when(n >= p['rsi_window'], rsi)
+        values['MACD'] = when(n >= slow, S[:, slot['ema_fast']] - S[:, slot['ema_slow']])
+        values['MACD_Signal'] = when(n >= slow + signal - 1, S[:, slot['ema_signal']])
+        values['MACD_Histogram'] = values['MACD'] - values['MACD_Signal']
+        return values
+
+    def _seed(self, row: int, close: np.ndarray, volume: np.ndarray):
+        """이력 전체로 확정 상태를 한 번에 만듦 (마지막 봉 직전까지)"""
+        L, slot = self.layout, self.layout.slot
+        s = np.zeros(L.width)
+        n = len(close) - 1
+        if n > 0:
+            _, states = compute_arrays(close[:n], volume[:n], self.params)
+            s[slot['count']] = n
+            s[slot['last_close']] = close[n - 1]
+            for name in ('ema_up', 'ema_down', 'ema_fast', 'ema_slow', 'ema_signal'):
+                s[slot[name]] = states[name][n - 1]
+            for i in range(max(0, n - L.close_ring), n):
+                s[L.close_at + i % L.close_ring] = close[i]
+            for i in range(max(0, n - L.volume_ring), n):
+                s[L.volume_at + i % L.volume_ring] = volume[i]
+            self._resum(s)
+        self._state[row] = s
+
+    # ---- 진입점 ----
+
+    def _tail(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """종목별 [직전 봉, 진행 중 봉] 지표 값 ({지표: (종목 × 2)})"""
+        slot = self.layout.slot
+        committed = self._state[rows]
+        current = committed.copy()
+        self._advance(current, committed[:, slot['pending_close']], committed[:, slot['pending_volume']])
+        before, after = self._values(committed), self._values(current)
+        return {name: np.column_stack([before[name], after[name]]) for name in ALL_COLUMNS}
+
+    def update_many(self, symbols: List[str], timestamp, close: np.ndarray,
+                    volume: np.ndarray) -> Dict[str, np.ndarray]:
+        """여러 종목에 같은 시각의 봉 하나씩 반영 (종목당 O(1), 배열 연산 한 번)
+
+        진행 중 봉과 같은 시각이면 그 봉을 고치고, 새 시각이면 이전 진행 중 봉을 확정합니다.
+        → {지표: (종목 × [직전 봉, 이번 봉])}
+        """
+        started = time.thread_time()
+        stamp = pd.Timestamp(timestamp).as_unit('ns').value
+        close = np.asarray(close, dtype=np.float64)
+        volume = np.asarray(volume, dtype=np.float64)
+        slot = self.layout.slot
+        with self._lock:
+            rows = np.array([self._row(symbol) for symbol in symbols], dtype=np.int64)
+            pending = self._stamps[rows, 1]
+            if np.any((pending != _NaT) & (stamp < pending)):
+                raise ValueError("진행 중인 봉보다 이전 시각의 봉은 반영할 수 없습니다")
+            commit = rows[(pending != _NaT) & (stamp > pending)]
+            if len(commit):
+                block = self._state[commit]
+                self._advance(block, block[:, slot['pending_close']], block[:, slot['pending_volume']])
+                self._state[commit] = block
+                self._stamps[commit, 0] = self._stamps[commit, 1]
+                self.appended += len(commit)
+            self._stamps[rows, 1] = stamp
+            self._state[rows, slot['pending_close']] = close
+            self._state[rows, slot['pending_volume']] = volume
+            values = self._tail(rows)
+            self._mark_dirty(started)
+        return values
+
+    def update(self, symbol: str, timestamp, close: float, volume: float) -> Dict[str, np.ndarray]:
+        """봉 하나 반영 (O(1)) → {지표: [직전 봉, 이번 봉]}"""
+        values = self.update_many([symbol], timestamp, [close], [volume])
+        return {name: array[0] for name, array in values.items()}
+
+    def sync(self, symbol: str, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """이력 프레임에 맞춰 상태 갱신 → 마지막 두 봉 지표 값
+
+        확정된 마지막 봉이 프레임에 그대로 있으면 그 뒤 봉만 반영하고(보통 0~1개),
+        처음 보는 종목이거나 이력이 달라졌으면(수정주가 등) 프레임 전체로 상태를 다시 만듭니다.
+        """
+        started = time.thread_time()
+        stamps = pd.DatetimeIndex(df.index).as_unit('ns').asi8
+        close = df['Close'].to_numpy(dtype=np.float64)
+        volume = df['Volume'].to_numpy(dtype=np.float64)
+        n = len(close)
+        slot = self.layout.slot
+
+        with self._lock:
+            known = symbol in self._table()
+            row = self._row(symbol)
+            s = self._state[row]
+            start = None
+            if known and s[slot['count']] > 0:
+                position = int(np.searchsorted(stamps, self._stamps[row, 0]))
+                if (position < n - 1 and stamps[position] == self._stamps[row, 0]
+                        and close[position] == s[slot['last_close']]):
+                    start = position + 1
+
+            if start is None:
+                self._seed(row, close, volume)
+                self._stamps[row, 0] = stamps[n - 2] if n > 1 else _NaT
+                self.seeded += 1
+            elif start == n - 1 and self._stamps[row, 1] == stamps[n - 1] \
+                    and s[slot['pending_close']] == close[n - 1] and s[slot['pending_volume']] == volume[n - 1]:
+                self.unchanged += 1
+            else:
+                block = self._state[row:row + 1]
+                for i in range(start, n - 1):
+                    self._advance(block, close[i:i + 1], volume[i:i + 1])
+                self._stamps[row, 0] = stamps[n - 2]
+                self.appended += n - 1 - start
+            self._stamps[row, 1] = stamps[n - 1]
+            self._state[row, slot['pending_close']] = close[n - 1]
+            self._state[row, slot['pending_volume']] = volume[n - 1]
+            values = self._tail(np.array([row]))
+            self._mark_dirty(started)
+        return {name: array[0] for name, array in values.items()}
+
+    def _mark_dirty(self, started: float):
+        self.cpu_time += time.thread_time() - started
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+            self._save()
+
+    def tail_frame(self, symbol: str, df: pd.DataFrame, columns=ALL_COLUMNS) -> pd.DataFrame:
+        """마지막 두 봉 + 지표 컬럼 (tail_indicators.tail_frames와 같은 모양)"""
+        values = self.sync(symbol, df)
+        tail = df.iloc[-2:]
+        data = {name: tail[name].to_numpy() for name in tail.columns if name not in columns}
+        data.update((name, values[name][-len(tail):]) for name in columns)
+        return pd.DataFrame(data, index=tail.index)
+
+    def forget(self, symbol: str):
+        """상태 삭제 (다음 sync에서 다시 만듦)"""
+        with self._lock:
+            row = self._table().get(symbol)
+            if row is not None:
+                self._state[row] = 0.0
+                self._stamps[row] = _NaT
+                self._dirty = True
+
+    def stats(self) -> Dict[str, float]:
+        """상태를 가진 종목 수, 새로 만든 횟수, 이어서 확정한 봉 수, 변경 없던 횟수, 누적 CPU 시간"""
+        with self._lock:
+            return {
+                'symbols': len(self._table()),
+                'seeded': self.seeded,
+                'appended': self.appended,
+                'unchanged': self.unchanged,
+                'cpu_time': self.cpu_time
+            }
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+
+def get_streaming_indicators() -> StreamingIndicators:
+    """프로세스 공용 스트리밍 지표 상태"""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = StreamingIndicators()
+            atexit.register(_default_engine.flush)
+    return _default_engine
+
+
+if __name__ == "__main__":
+    # 야간 갱신: 저장소의 모든 종목 이력으로 지표 상태를 이어서 갱신 (python streaming_indicators.py)
+    from ohlcv_store import get_store
+
+    store = get_store()
+    engine = get_streaming_indicators()
+    symbols: List[str] = store.symbols()
+    started = time.time()
+    for symbol in symbols:
+        df = store.load(symbol)
+        if df is not None and len(df) > 1:
+            engine.sync(symbol, df)
+    engine.flush()
+    stats = engine.stats()
+    print(f"✅ {len(symbols)}개 종목: 새로 만듦 {stats['seeded']}, 이어서 확정 {stats['appended']}봉, "
+          f"변경 없음 {stats['unchanged']} (CPU {stats['cpu_time'] * 1000:.0f}ms, 전체 {time.time() - started:.1f}초)")
@@ -0,0 +1,193 @@
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ohlcv_store import STORE_DIR
+
+# 연속 실패/빈 응답이 이 횟수 이상이면 다음 재확인 시각까지 요청하지 않음
+DEAD_THRESHOLD = 2
+
+# 첫 재확인 간격 (초), 이후 실패할 때마다 두 배 (최대 MAX_RECHECK)
+BASE_RECHECK = 12 * 3600
+MAX_RECHECK = 30 * 24 * 3600
+
+# 종목별 기록이 이어질 때 파일을 다시 쓰는 최소 간격 (초)
+SAVE_INTERVAL = 1.0
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SymbolHealthRegistry:
+    """종목별 수집 결과 기록 (상장폐지/코드 변경 종목에 매번 요청하지 않도록)
+
+    종목마다 연속 오류 수(failures), 연속 빈 응답 수(empties), 마지막 정상 수집 시각(last_good)을
+    _symbol_health.json에 남깁니다. 연속 실패가 DEAD_THRESHOLD 이상이면 next_check까지 건너뛰고,
+    재확인에서도 실패하면 간격을 두 배로 늘립니다. 한 번이라도 정상 응답이 오면 기록을 초기화합니다.
+    """
+
+    def __init__(self, root: str = STORE_DIR, threshold: int = DEAD_THRESHOLD,
+                 base_recheck: float = BASE_RECHECK, max_recheck: float = MAX_RECHECK):
+        self.root = root
+        self.threshold = threshold
+        self.base_recheck = base_recheck
+        self.max_recheck = max_recheck
+        self.skipped = 0
+        self._records = None
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+
+    # ---- 파일 ----
+
+    def _path(self) -> str:
+        return os.path.join(self.root, "_symbol_health.json")
+
+    def _table(self) -> Dict[str, dict]:
+        if self._records is None:
+            records = {}
+            if os.path.exists(self._path()):
+                try:
+                    with open(self._path(), 'r', encoding='utf-8') as f:
+                        records = json.load(f)
+                except Exception:
+                    records = {}
+            self._records = records
+        return self._records
+
+    def _save(self):
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self._path()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._records, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path())
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+            self._save()
+
+    def flush(self):
+        """미뤄 둔 파일 저장"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    # ---- 기록 ----
+
+    def record_ok(self, symbol: str, last_bar=None):
+        """정상 수집: 실패 기록 초기화 (last_bar는 받은 마지막 봉 날짜)"""
+        with self._lock:
+            self._table()[symbol] = {
+                'failures': 0, 'empties': 0,
+                'last_good': str(last_bar) if last_bar is not None else _now_iso(),
+                'checked': _now_iso(), 'next_check': None, 'error': None
+            }
+            self._mark_dirty()
+
+    def record_empty(self, symbol: str):
+        """빈 응답 (상장폐지/코드 변경 종목에서 흔함)"""
+        self._record_miss(symbol, 'empties', "empty")
+
+    def record_error(self, symbol: str, error: Optional[str] = None):
+        """요청 실패"""
+        self._record_miss(symbol, 'failures', error or "error")
+
+    def _record_miss(self, symbol: str, field: str, error: str):
+        with self._lock:
+            record = self._table().setdefault(symbol, {
+                'failures': 0, 'empties': 0, 'last_good': None,
+                'checked': None, 'next_check': None, 'error': None
+            })
+            record[field] = record.get(field, 0) + 1
+            record['checked'] = _now_iso()
+            record['error'] = error
+            misses = record['failures'] + record['empties']
+            if misses >= self.threshold:
+                interval = min(self.base_recheck * 2 ** (misses - self.threshold), self.max_recheck)
+                record['next_check'] = time.time() + interval
+            self._mark_dirty()
+
+    def reset(self, symbols: Optional[Iterable[str]] = None):
+        """기록 삭제 (None이면 전체) → 다음 스크리닝에서 바로 재확인"""
+        with self._lock:
+            table = self._table()
+            for symbol in (list(table) if symbols is None else symbols):
+                table.pop(symbol, None)
+            self._mark_dirty()
+
+    # ---- 조회 ----
+
+    def is_dead(self, symbol: str, now: Optional[float] = None) -> bool:
+        """재확인 시각 전까지 건너뛸 종목인지"""
+        with self._lock:
+            record = self._table().get(symbol)
+        if record is None or record.get('next_check') is None:
+            return False
+        return (now if now is not None else time.time()) < record['next_check']
+
+    def filter(self, symbols: Iterable[str], now: Optional[float] = None) -> Tuple[List[str], List[str]]:
+        """(요청할 종목, 건너뛴 종목): 최근 실패가 있는 종목은 뒤로 미룸"""
+        now = now if now is not None else time.time()
+        healthy, suspect, skipped = [], [], []
+        with self._lock:
+            table = self._table()
+            for symbol in symbols:
+                record = table.get(symbol)
+                if record is None or not (record.get('failures') or record.get('empties')):
+                    healthy.append(symbol)
+                elif record.get('next_check') is not None and now < record['next_check']:
+                    skipped.append(symbol)
+                else:
+                    suspect.append(symbol)
+            self.skipped += len(skipped)
+        return healthy + suspect, skipped
+
+    def maintenance_rows(self) -> List[dict]:
+        """점검 화면용: 실패 기록이 있는 종목 (연속 실패가 많은 순)"""
+        with self._lock:
+            items = [(s, dict(r)) for s, r in self._table().items() if r.get('failures') or r.get('empties')]
+        rows = []
+        for symbol, record in items:
+            next_check = record.get('next_check')
+            rows.append({
+                'Symbol': symbol,
+                'Status': "건너뜀" if next_check and time.time() < next_check else "재확인 대상",
+                'Failures': record.get('failures', 0),
+                'Empties': record.get('empties', 0),
+                'Last_Good': record.get('last_good') or "-",
+                'Last_Error': record.get('error') or "-",
+                'Next_Check': datetime.fromtimestamp(next_check).strftime('%Y-%m-%d %H:%M') if next_check else "-"
+            })
+        rows.sort(key=lambda row: -(row['Failures'] + row['Empties']))
+        return rows
+
+    def stats(self) -> Dict[str, int]:
+        """기록된 종목 수, 건너뛰는 종목 수, 이번 프로세스에서 건너뛴 요청 수"""
+        now = time.time()
+        with self._lock:
+            table = self._table()
+            dead = sum(1 for r in table.values() if r.get('next_check') and now < r['next_check'])
+            suspect = sum(1 for r in table.values() if r.get('failures') or r.get('empties')) - dead
+            return {'tracked': len(table), 'dead': dead, 'suspect': suspect, 'skipped': self.skipped}
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def get_symbol_health() -> SymbolHealthRegistry:
+    """프로세스 공용 종목 상태 기록"""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = SymbolHealthRegistry()
+            atexit.register(_default_registry.flush)
+    return _default_registry
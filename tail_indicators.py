@@ -0,0 +1,187 @@
+import math
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from indicator_core import INDICATOR_PARAMS
+from indicator_demand import needs
+
+# 조건 평가가 읽는 봉 수 (check_* / StrategyBuilder._evaluate_*는 iloc[-1], iloc[-2]만 사용)
+TAIL_BARS = 2
+
+# 이 가중치보다 작은 과거 봉은 반올림 오차 아래라서 지수이동평균 값에 영향이 없음
+_NEGLIGIBLE = np.finfo(np.float64).eps / 100
+
+
+def _horizon(alpha: float) -> int:
+    """지수이동평균에서 가중치가 _NEGLIGIBLE 이상인 과거 봉 수"""
+    return math.ceil(math.log(_NEGLIGIBLE) / math.log(1 - alpha))
+
+
+def _ema_weights(m: int, alpha: float, first: int, seeded: bool) -> np.ndarray:
+    """길이 m 입력의 first..m-1번째 EMA(adjust=False) 값 = W @ x 인 가중치 ((m - first) × m)
+
+    seeded=True면 0번째 값에서 시작하는 EMA (이력 전체가 창 안에 있을 때),
+    아니면 창 앞쪽은 가중치가 _NEGLIGIBLE 아래라 무시합니다.
+    """
+    t = np.arange(first, m)[:, None]
+    lag = t - np.arange(m)[None, :]
+    weights = np.where(lag >= 0, alpha * (1 - alpha) ** np.maximum(lag, 0), 0.0)
+    if seeded:
+        weights[:, 0] = (1 - alpha) ** t[:, 0]
+    return weights
+
+
+@lru_cache(maxsize=64)
+def _rsi_weights(m: int, window: int, bars: int, seeded: bool) -> np.ndarray:
+    weights = _ema_weights(m, 1 / window, m - bars, seeded)
+    weights.flags.writeable = False
+    return weights
+
+
+@lru_cache(maxsize=64)
+def _macd_weights(m: int, macd: tuple, start: int, bars: int, seeded: bool):
+    """마지막 bars개 봉의 (MACD, 시그널) 가중치: 종가 창(길이 m)에 곱하면 값이 나옴
+
+    시그널은 MACD의 EMA이므로 MACD 가중치 행들을 시그널 가중치로 한 번 더 묶어 둡니다
+    (start는 창 안에서 MACD가 처음 유효한 위치).
+    """
+    fast, slow, signal = macd
+    a_fast, a_slow, a_signal = 2 / (fast + 1), 2 / (slow + 1), 2 / (signal + 1)
+    rows = (_ema_weights(m, a_fast, start, seeded) - _ema_weights(m, a_slow, start, seeded))
+    signal_weights = _ema_weights(m - start, a_signal, m - start - bars, seeded) @ rows
+    macd_weights = rows[-bars:].copy()
+    for array in (macd_weights, signal_weights):
+        array.flags.writeable = False
+    return macd_weights, signal_weights
+
+
+def _rolling_tail(x: np.ndarray, window: int, bars: int, reduce) -> np.ndarray:
+    """마지막 bars개 봉의 이동 창 값 (봉 수가 창보다 적은 위치는 NaN)"""
+    n = len(x)
+    out = np.full((bars,) + x.shape[1:], np.nan)
+    for row, t in enumerate(range(n - bars, n)):
+        if t >= window - 1:
+            out[row] = reduce(x[t - window + 1:t + 1])
+    return out
+
+
+def _mask(values: np.ndarray, n: int, bars: int, rows: int) -> np.ndarray:
+    """전체 계산에서 처음 rows개 봉이 NaN인 지표의 끝부분 가림"""
+    positions = np.arange(n - bars, n)
+    values[positions < rows] = np.nan
+    return values
+
+
+def tail_arrays(close: np.ndarray, volume: np.ndarray, params: Optional[dict] = None,
+                bars: int = TAIL_BARS, high: Optional[np.ndarray] = None,
+                low: Optional[np.ndarray] = None, keys: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """마지막 bars개 봉의 지표 값만 계산 (indicator_core.compute_arrays / ta와 같은 값)
+
+    close/volume은 (봉,) 또는 같은 길이 종목들을 묶은 (봉 × 종목) 배열입니다.
+    - 이동평균/볼린저 밴드/거래량 평균: 끝 봉마다 창 크기만큼만 읽음
+    - RSI/MACD: 지수이동평균 재귀를 펼친 가중치(길이별로 캐시)와 곱해 시작 상태까지 정확히 반영하고,
+      가중치가 반올림 오차 아래로 떨어지는 과거 봉은 읽지 않음
+    high/low를 주면 Stoch_K, Stoch_D, Williams_R(14, 3)도 계산합니다.
+    keys를 주면 그 지표가 속한 묶음만 계산합니다.
+    """
+    p = params or INDICATOR_PARAMS
+    fast, slow, signal = p['macd']
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    n = len(close)
+    bars = min(bars, n)
+    values = {}
+
+    if needs(keys, 'BB'):
+        middle = _rolling_tail(close, p['bb_period'], bars, lambda w: w.mean(axis=0))
+        std = _rolling_tail(close, p['bb_period'], bars, lambda w: w.std(axis=0, ddof=1))
+        values['BB_Middle'] = middle
+        values['BB_Upper'] = middle + std * p['bb_std']
+        values['BB_Lower'] = middle - std * p['bb_std']
+    for window in p['ma_windows']:
+        if needs(keys, f'MA_{window}'):
+            values[f'MA_{window}'] = _rolling_tail(close, window, bars, lambda w: w.mean(axis=0))
+    if needs(keys, 'Volume_MA'):
+        values['Volume_MA'] = _rolling_tail(volume, p['volume_ma'], bars, lambda w: w.mean(axis=0))
+
+    if needs(keys, 'RSI'):
+        # RSI: 변화량 창(첫 봉의 변화량은 0)에 Wilder 평균 가중치를 곱함
+        m = min(n, _horizon(1 / p['rsi_window']) + bars)
+        seeded = m == n
+        window_close = close[n - m - (0 if seeded else 1):]
+        diff = np.diff(window_close, axis=0)
+        if seeded:
+            diff = np.concatenate([np.zeros((1,) + close.shape[1:]), diff])
+        weights = _rsi_weights(m, p['rsi_window'], bars, seeded)
+        ema_up = weights @ np.where(diff > 0, diff, 0.0)
+        ema_down = weights @ np.where(diff < 0, -diff, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(ema_down == 0, 100.0, 100 - (100 / (1 + ema_up / ema_down)))
+        values['RSI'] = _mask(rsi, n, bars, p['rsi_window'] - 1)
+
+    if needs(keys, 'MACD'):
+        # MACD: 시그널까지 종가 창 하나에 대한 가중치로 계산
+        m = min(n, _horizon(2 / (slow + 1)) + _horizon(2 / (signal + 1)) + bars)
+        seeded = m == n
+        start = slow - 1 if seeded else 0
+        macd = np.full((bars,) + close.shape[1:], np.nan)
+        signal_line = np.full_like(macd, np.nan)
+        valid = min(bars, m - start)
+        if valid > 0:
+            macd_weights, signal_weights = _macd_weights(m, (fast, slow, signal), start, valid, seeded)
+            macd[bars - valid:] = macd_weights @ close[n - m:]
+            signal_line[bars - valid:] = signal_weights @ close[n - m:]
+        values['MACD'] = _mask(macd, n, bars, slow - 1)
+        values['MACD_Signal'] = _mask(signal_line, n, bars, slow + signal - 2)
+        values['MACD_Histogram'] = values['MACD'] - values['MACD_Signal']
+
+    if high is not None and low is not None and (needs(keys, 'Stoch') or needs(keys, 'Williams_R')):
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        k_bars = min(bars + 2, n)
+        highest = _rolling_tail(high, 14, k_bars, lambda w: w.max(axis=0))
+        lowest = _rolling_tail(low, 14, k_bars, lambda w: w.min(axis=0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            stoch_k = 100 * (close[n - k_bars:] - lowest) / (highest - lowest)
+            williams = -100 * (highest - close[n - k_bars:]) / (highest - lowest)
+        values['Stoch_K'] = stoch_k[-bars:]
+        values['Williams_R'] = williams[-bars:]
+        values['Stoch_D'] = _rolling_tail(stoch_k, 3, bars, lambda w: w.mean(axis=0))
+    return values
+
+
+def tail_frames(frames: Dict[str, pd.DataFrame], columns: Dict[str, str], params: Optional[dict] = None,
+                bars: int = TAIL_BARS, oscillators: bool = False) -> Dict[str, pd.DataFrame]:
+    """{symbol: 마지막 bars개 봉 + 지표 컬럼} (columns: {붙일 컬럼명: tail_arrays 키})
+
+    봉 수가 같은 종목끼리 묶어 가중치 곱을 행렬 곱 한 번으로 계산하고, columns에 없는 지표 묶음은 건너뜁니다.
+    """
+    keys = list(columns.values())
+    oscillators = oscillators and (needs(keys, 'Stoch') or needs(keys, 'Williams_R'))
+    groups = {}
+    for symbol, df in frames.items():
+        if df is not None and not df.empty:
+            groups.setdefault(len(df), []).append(symbol)
+
+    result = {}
+    for symbols in groups.values():
+        def stack(field):
+            return np.column_stack([frames[s][field].to_numpy(dtype=np.float64) for s in symbols])
+        high_low = (stack('High'), stack('Low')) if oscillators else (None, None)
+        values = tail_arrays(stack('Close'), stack('Volume'), params, bars, *high_low, keys=keys)
+        for j, symbol in enumerate(symbols):
+            tail = frames[symbol].iloc[-bars:]
+            data = {name: tail[name].to_numpy() for name in tail.columns if name not in columns}
+            for name, key in columns.items():
+                data[name] = values[key][:, j]
+            result[symbol] = pd.DataFrame(data, index=tail.index)
+    return {symbol: result[symbol] for symbol in frames if symbol in result}
+
+
+def tail_frame(df: pd.DataFrame, columns: Dict[str, str], params: Optional[dict] = None,
+               bars: int = TAIL_BARS, oscillators: bool = False) -> pd.DataFrame:
+    """한 종목의 마지막 bars개 봉 + 지표 컬럼"""
+    return tail_frames({'': df}, columns, params, bars, oscillators).get('', df)
@@ -0,0 +1,74 @@
+from streamlit import logger
+
+logger.set_log_level("error")
+
+import numpy as np
+import pandas as pd
+
+from advanced_dashboard import AdvancedStockScreener
+from backtest import backtest
+from market_data import ReplayProvider
+from strategy_builder import Condition, ConditionType, Operator, PresetStrategies, StrategyBuilder
+
+
+def _frames():
+    provider = ReplayProvider(days=400)
+    frames = {f"S{i:03d}": provider.frame(f"S{i:03d}").iloc[5 * i:] for i in range(24)}
+    frames["005930.KS"] = provider.frame("005930.KS")
+    frames["ONE_BAR"] = provider.frame("ONE_BAR").iloc[-1:]
+    return frames
+
+
+def _expected(strategy, frames, horizons):
+    """종목별로 지표를 다 계산하고 봉마다 전략을 평가해 pandas로 수익률/낙폭 계산"""
+    screener = AdvancedStockScreener.__new__(AdvancedStockScreener)
+    compiled = strategy.compile()
+    returns = {h: [] for h in horizons}
+    drawdowns = {h: [] for h in horizons}
+    dates = []
+    for df in frames.values():
+        if len(df) < 2:
+            continue
+        full = screener.calculate_technical_indicators(df.copy())
+        signals = compiled.run(compiled._stack([full], len(full)), (len(full), 1))[:, 0]
+        close = df['Close']
+        dates.extend(df.index[signals].tz_localize(None).normalize())
+        for h in horizons:
+            forward = (close.shift(-h) / close - 1)[signals].dropna()
+            lowest = close.rolling(h).min().shift(-h)[signals].dropna()
+            returns[h].extend(forward)
+            drawdowns[h].extend(np.minimum(lowest / close[signals].loc[lowest.index] - 1, 0))
+    return returns, drawdowns, pd.Series(dates).value_counts().sort_index()
+
+
+def test_backtest_matches_per_symbol_evaluation():
+    """전체 종목 × 전체 봉 신호의 수익률/낙폭/날짜가 종목별 직접 계산과 같음, 프로세스 모드도 같음"""
+    frames = _frames()
+    horizons = (1, 5, 20)
+    rsi = StrategyBuilder()
+    rsi.add_condition(Condition("RSI", ConditionType.RSI, Operator.LESS_THAN, 40, ""))
+    rsi.add_condition(Condition("거래량", ConditionType.VOLUME, Operator.GREATER_THAN, 1.2, ""))
+    strategies = [PresetStrategies.momentum_breakout(), PresetStrategies.oversold_reversal(),
+                  PresetStrategies.golden_cross(), rsi]
+
+    for strategy in strategies:
+        returns, drawdowns, dates = _expected(strategy, frames, horizons)
+        result = backtest(strategy, frames, horizons, chunk_symbols=7)
+        assert result.symbols == len(frames) - 1
+        assert result.signals == dates.sum()
+        for h in horizons:
+            assert np.allclose(np.sort(np.concatenate(result.returns[h])), np.sort(returns[h]), rtol=1e-9)
+            assert np.allclose(np.sort(np.concatenate(result.drawdowns[h])), np.sort(drawdowns[h]), rtol=1e-9)
+        assert result.signals_per_date().tolist() == dates.tolist()
+        assert result.signals_per_date().index.tolist() == dates.index.tolist()
+
+        summary = result.summary()
+        assert summary['신호 수'].tolist() == [len(returns[h]) for h in horizons]
+        assert np.isclose(summary.loc[5, '적중률(%)'], np.mean(np.array(returns[5]) > 0) * 100)
+        assert (summary['최대 낙폭(%)'] <= summary['평균 낙폭(%)']).all()
+
+        pooled = backtest(strategy, frames, horizons, workers=2, chunk_symbols=7)
+        assert pooled.summary().equals(summary)
+        assert pooled.signals_per_date().equals(result.signals_per_date())
+
+    assert len(returns[1]) > 50
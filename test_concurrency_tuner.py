@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+from concurrency_tuner import AdaptiveConcurrency
+from fetch_engine import MARKET_RATE_LIMITS, AsyncFetchEngine, acquire_for, configure_rate_limit
+
+
+class RateLimitedFakeProvider:
+    """초당 rate_limit건을 넘으면 빈 응답을 주는 로컬 가짜 데이터 소스"""
+
+    def __init__(self, rate_limit=500, latency=0.02):
+        self.rate_limit = rate_limit
+        self.latency = latency
+        self.rejected = 0
+        self.served = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def history(self, symbol):
+        acquire_for(symbol)  # 엔진이 네트워크 호출로 인식하도록 경계 표시
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 0.1:
+                self._recent.popleft()
+            limited = len(self._recent) >= self.rate_limit * 0.1
+            self._recent.append(now)
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+
+        try:
+            time.sleep(self.latency)
+            if limited:
+                self.rejected += 1
+                return None
+            self.served += 1
+            return pd.DataFrame({'Close': [1.0]})
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+def simulate_provider(concurrency, capacity=12, base_latency=0.05, rate_limit_errors=True):
+    """가상 시간 시뮬레이션: 동시 요청 수에 따른 지연/실패 모델
+
+    capacity를 넘으면 초과분 비율만큼 실패하고, 지연은 동시 요청이 늘수록 증가합니다.
+    """
+    overload = max(0, concurrency - capacity)
+    failure_rate = overload / concurrency if rate_limit_errors else 0.0
+    latency = base_latency * (1 + overload / capacity * 2)
+    return latency, failure_rate
+
+
+def test_tuner_converges_to_provider_capacity():
+    """동시 요청 수가 용량 근처로 수렴하고 과부하 상태에 머물지 않는지"""
+    tuner = AdaptiveConcurrency(initial=2, min_limit=1, max_limit=50, window=20)
+    capacity = 12
+    history = []
+
+    for step in range(3000):
+        latency, failure_rate = simulate_provider(tuner.limit, capacity)
+        status = "error" if (step % 100) < failure_rate * 100 else "ok"
+        tuner.record(latency, status)
+        history.append(tuner.limit)
+
+    tail = history[-1000:]
+    assert 0.5 * capacity <= sum(tail) / len(tail) <= 1.5 * capacity
+    assert max(tail) <= 2 * capacity
+    assert tuner.recent_reasons()
+
+
+def test_tuner_backs_off_when_errors_rise():
+    """실패율이 오르면 즉시 감소하고 사유를 남기는지"""
+    tuner = AdaptiveConcurrency(initial=40, window=10, max_failure_rate=0.1)
+    for _ in range(10):
+        tuner.record(0.05, "empty")
+
+    assert tuner.limit < 40
+    assert "실패율" in tuner.recent_reasons(1)[0]
+
+
+def test_tuner_ramps_up_while_latency_flat():
+    """지연이 평탄하면 한계까지 증가하는지"""
+    tuner = AdaptiveConcurrency(initial=4, max_limit=20, window=10)
+    for _ in range(200):
+        tuner.record(0.05, "ok")
+
+    assert tuner.limit == 20
+    assert "유지" in tuner.recent_reasons(1)[0]
+
+
+def test_engine_with_rate_limited_fake_provider():
+    """실제 엔진 + 요청 한도가 있는 가짜 데이터 소스: 빈 응답이 줄어드는 쪽으로 조정되는지"""
+    default_limit = MARKET_RATE_LIMITS["US"]
+    configure_rate_limit("US", 1e9, 1e9)
+    provider = RateLimitedFakeProvider(rate_limit=500, latency=0.02)
+    tuner = AdaptiveConcurrency(initial=40, min_limit=1, max_limit=40, window=20)
+    engine = AsyncFetchEngine(max_threads=64)
+
+    symbols = [f"SYM{i:04d}" for i in range(1500)]
+    try:
+        first = engine.run(symbols[:300], provider.history, tuner=tuner)
+        rest = engine.run(symbols[300:], provider.history, tuner=tuner)
+    finally:
+        configure_rate_limit("US", *default_limit)
+
+    first_empty = sum(1 for df in first.values() if df is None) / len(first)
+    tail = list(rest.values())[-600:]
+    tail_empty = sum(1 for df in tail if df is None) / len(tail)
+
+    # 시작(40개 동시)은 한도(≈ 500건/초 × 20ms = 10개)를 크게 넘으므로 실패가 많고,
+    # 조정 후에는 실패율이 크게 줄어야 함
+    assert tuner.limit < 40
+    assert tail_empty < first_empty
+    assert tail_empty < 0.25
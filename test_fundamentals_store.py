@@ -0,0 +1,53 @@
+import time
+
+from fundamentals_store import FIELDS, FundamentalsStore, project
+
+
+def test_projection_keeps_only_ui_fields():
+    """화면에서 쓰는 필드만 남기고 숫자가 아닌 PER은 버림"""
+    record = project("005930.KS", {'shortName': 'SAMSUNG', 'marketCap': 4e14, 'trailingPE': 'Infinity',
+                                   'longBusinessSummary': 'x' * 10_000})
+    assert tuple(record) == FIELDS
+    assert record['name'] == 'SAMSUNG'
+    assert record['trailingPE'] is None
+    assert record['currency'] == 'KRW'
+
+
+def test_warm_persists_and_skips_fresh(root, provider):
+    """병렬 미리 받기 결과는 재시작 후에도 요청 없이 조회"""
+    symbols = ["AAPL", "MSFT", "005930.KS", "035720.KQ"]
+    result = FundamentalsStore(root).warm(symbols)
+    assert result == {'requested': 4, 'fetched': 4, 'failed': 0}
+    requests = provider.requests
+
+    restarted = FundamentalsStore(root)
+    assert restarted.warm(symbols)['requested'] == 0
+    assert restarted.lookup("005930.KS")['currency'] == 'KRW'
+    assert provider.requests == requests
+
+
+def test_lookup_never_blocks_on_info(root, provider):
+    """없는 종목은 바로 None을 주고 백그라운드에서 받아 둠"""
+    provider.latency = 0.2
+    store = FundamentalsStore(root)
+
+    started = time.perf_counter()
+    assert store.lookup("NVDA") is None
+    assert time.perf_counter() - started < 0.1
+
+    while store.pending():
+        time.sleep(0.05)
+    assert store.lookup("NVDA")['name'] == "NVDA"
+
+
+def test_failures_are_retried_later_and_keep_old_values(root, provider):
+    """실패한 종목은 retry_ttl 동안 다시 요청하지 않고 예전 값은 유지"""
+    store = FundamentalsStore(root)
+    store.warm(["AAPL"])
+    store.ttl = 0                                    # 오래된 값
+    provider.error_rate = 1.0
+
+    assert store.warm(["AAPL", "TSLA"]) == {'requested': 2, 'fetched': 0, 'failed': 2}
+    assert store.get("AAPL")['name'] == "AAPL"
+    assert store.get("TSLA") is None
+    assert store.warm(["AAPL", "TSLA"])['requested'] == 0
@@ -0,0 +1,60 @@
+import pandas as pd
+
+from indicator_cache import IndicatorCache, cached_indicators, get_indicator_cache
+from market_data import ReplayProvider
+
+calls = []
+
+
+@cached_indicators({'window': 20})
+def moving_average(df):
+    calls.append(len(df))
+    df['MA_20'] = df['Close'].rolling(window=20).mean()
+    return df
+
+
+def _history(symbol, bars=120):
+    return ReplayProvider().frame(symbol).iloc[-bars:].copy()
+
+
+def test_hit_returns_same_values_without_recompute():
+    """같은 (종목, 구간) 재호출은 계산 없이 같은 결과"""
+    get_indicator_cache().clear()
+    calls.clear()
+    df = _history("AAPL")
+
+    first = moving_average(df.copy(), "AAPL")
+    second = moving_average(df.copy(), "AAPL")
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+    stats = get_indicator_cache().stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+    assert stats['bytes'] == 120 * 4  # 지표 컬럼만 float32로 보관
+
+
+def test_key_changes_with_window_and_last_bar():
+    """구간 시작/마지막 봉(진행 중인 봉 값 포함)이 바뀌면 다시 계산"""
+    get_indicator_cache().clear()
+    calls.clear()
+    df = _history("005930.KS")
+
+    moving_average(df, "005930.KS")
+    moving_average(df.iloc[-60:], "005930.KS")       # 짧은 구간
+    updated = df.copy()
+    updated.iloc[-1, updated.columns.get_loc('Close')] *= 1.01
+    moving_average(updated, "005930.KS")             # 장중 갱신된 마지막 봉
+    moving_average(df, "MSFT")                       # 다른 종목
+    moving_average(df)                               # 종목 없음 → 캐시 우회
+
+    assert len(calls) == 5
+    stats = get_indicator_cache().stats()
+    assert (stats['hits'], stats['bypassed']) == (0, 1)
+
+
+def test_key_does_not_hash_frame_contents():
+    """키는 프레임 크기와 무관한 작은 튜플"""
+    df = _history("NVDA", bars=500)
+    key = IndicatorCache.make_key(df, "NVDA", params={'window': 20})
+    assert len(key) == 9
+    assert all(not isinstance(part, (pd.DataFrame, pd.Series)) for part in key)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from indicator_core import ALL_COLUMNS, compute_arrays
+from market_data import ReplayProvider
+
+
+def _reference(df):
+    """ta 라이브러리로 계산한 기준값 (ultra_complete_app과 같은 정의)"""
+    import ta
+    close = df['Close']
+    bb = ta.volatility.BollingerBands(close, window=20, window_dev=2)
+    macd = ta.trend.MACD(close)
+    return {
+        'BB_Middle': close.rolling(window=20).mean(),
+        'RSI': ta.momentum.RSIIndicator(close, window=14).rsi(),
+        'MACD': macd.macd(),
+        'MACD_Signal': macd.macd_signal(),
+        'MACD_Histogram': macd.macd_diff(),
+        'MA_50': close.rolling(window=50).mean(),
+        'Volume_MA': df['Volume'].rolling(window=20).mean(),
+    }
+
+
+def _assert_matches(values, df):
+    for name, expected in _reference(df).items():
+        expected = expected.to_numpy(dtype=np.float64)
+        assert np.array_equal(np.isnan(values[name]), np.isnan(expected)), name
+        mask = ~np.isnan(expected)
+        assert np.allclose(values[name][mask], expected[mask], rtol=1e-9), name
+
+
+def test_compute_arrays_matches_ta():
+    """공용 지표 계산은 ta 라이브러리와 같은 값"""
+    history = ReplayProvider().frame("AAPL").iloc[-120:]
+    values, _ = compute_arrays(history['Close'].to_numpy(dtype=np.float64),
+                               history['Volume'].to_numpy(dtype=np.float64))
+    _assert_matches(values, history)
+    assert set(values) == set(ALL_COLUMNS)
+
@@ -0,0 +1,68 @@
+import numpy as np
+from streamlit import logger
+
+logger.set_log_level("error")
+
+import ultra_complete_app as app
+from advanced_dashboard import (ADVANCED_INDICATOR_COLUMNS, STRATEGY_RESULT_COLUMNS, AdvancedStockScreener)
+from market_data import ReplayProvider
+from strategy_builder import Condition, ConditionType, Operator, PresetStrategies, StrategyBuilder
+
+OHLCV = {'Open', 'High', 'Low', 'Close', 'Volume'}
+
+
+def test_rsi_only_screen_computes_only_rsi(app_store):
+    """RSI 조건만 켜면 RSI만 계산하고, 결과 행은 지표 전체를 계산했을 때와 같음"""
+    stocks = {f"S{i:03d}": f"종목{i}" for i in range(60)}
+    conditions = {"rsi_condition": {"type": "초과", "value": 55}}
+    assert app.required_columns(conditions) == ['RSI']
+    assert app.required_columns({"bb_breakout": False, "volume_surge": 1.5}) == ['Volume_MA']
+
+    raw = {symbol: app.load_raw_stock_data(symbol) for symbol in stocks}
+    expected = {symbol: app.evaluate_stock(symbol, stocks[symbol], app.prepare_stock_frame(df.copy()), conditions)
+                for symbol, df in raw.items()}
+    runs = {}
+    for engine in ("thread", "panel", "tail"):
+        pipeline = app.build_screen_pipeline(stocks, conditions, engine=engine)
+        runs[engine] = (dict(pipeline.run()), pipeline.demand.stats())
+
+    lazy = app.calculate_technical_indicators_fast(app.optimize_stock_frame(raw["S000"]).copy(), ['RSI'])
+    assert set(lazy.columns) - OHLCV == {'RSI'}
+
+    matched = sum(row is not None for row in expected.values())
+    assert 0 < matched < len(stocks)
+    for engine, (rows, stats) in runs.items():
+        assert rows == expected, engine
+        # 종목당 6개 묶음 중 RSI 1개 + 결과 표용(거래량 평균, 볼린저 밴드)은 조건을 만족한 종목만
+        assert stats['computed'] == len(stocks) + 2 * matched, engine
+        assert stats['completed'] == matched
+        assert stats['saved_ratio'] > 0.5
+
+
+def test_strategy_required_indicators():
+    """전략이 읽는 지표만 계산해도 평가 결과가 같고, 결과 표 지표는 조건을 만족한 종목만 채움"""
+    rsi_only = StrategyBuilder()
+    rsi_only.add_condition(Condition("RSI 과매도", ConditionType.RSI, Operator.LESS_THAN, 45, "RSI < 45"))
+    assert rsi_only.required_indicators() == ['RSI']
+    assert PresetStrategies.golden_cross().required_indicators()
+
+    provider = ReplayProvider()
+    frames = {symbol: provider.frame(symbol).iloc[-250:] for symbol in [f"S{i:03d}" for i in range(40)]}
+    screener = AdvancedStockScreener.__new__(AdvancedStockScreener)
+    full = screener.calculate_technical_indicators_many(frames, bars=2)
+
+    lazy = screener.calculate_technical_indicators_many(frames, 2, ['RSI'])
+    assert all(set(df.columns) - OHLCV == {'RSI'} for df in lazy.values())
+
+    strategies = [rsi_only, PresetStrategies.momentum_breakout(), PresetStrategies.oversold_reversal(),
+                  PresetStrategies.golden_cross()]
+    for strategy in strategies:
+        columns = strategy.required_indicators()
+        assert set(columns) <= set(ADVANCED_INDICATOR_COLUMNS)
+        tails = screener.calculate_technical_indicators_many(frames, 2, columns)
+        for symbol in frames:
+            assert strategy.evaluate_strategy(tails[symbol]) == strategy.evaluate_strategy(full[symbol]), symbol
+
+    completed = screener.complete_indicators(lazy["S000"], frames["S000"], STRATEGY_RESULT_COLUMNS)
+    for name in STRATEGY_RESULT_COLUMNS:
+        assert np.allclose(completed[name], full["S000"][name], rtol=1e-9), name
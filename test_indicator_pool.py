@@ -0,0 +1,33 @@
+import numpy as np
+from streamlit import logger
+
+logger.set_log_level("error")
+
+from indicator_pool import IndicatorProcessPool
+from market_data import ReplayProvider
+from ultra_complete_app import FAST_INDICATOR_COLUMNS, calculate_technical_indicators_fast, optimize_stock_frame
+
+
+def test_process_pool_matches_per_symbol_computation():
+    """공유 메모리 프로세스 풀 결과가 종목별 계산(ta)과 같음, 짧은 이력은 그대로"""
+    provider = ReplayProvider()
+    frames = {symbol: optimize_stock_frame(provider.frame(symbol).iloc[-(60 + i * 7):])
+              for i, symbol in enumerate(["AAPL", "MSFT", "005930.KS", "NVDA", "035720.KQ"])}
+    frames["SHORT"] = optimize_stock_frame(provider.frame("SHORT").iloc[-30:])
+
+    pool = IndicatorProcessPool(workers=2)
+    try:
+        result = pool.attach(frames, FAST_INDICATOR_COLUMNS)
+    finally:
+        pool.shutdown()
+
+    assert result["SHORT"] is frames["SHORT"]
+    for symbol, df in frames.items():
+        if symbol == "SHORT":
+            continue
+        expected = calculate_technical_indicators_fast(df.copy())
+        for name in FAST_INDICATOR_COLUMNS:
+            a, b = result[symbol][name].to_numpy(), expected[name].to_numpy(dtype=np.float64)
+            assert np.array_equal(np.isnan(a), np.isnan(b)), (symbol, name)
+            assert np.allclose(a[~np.isnan(a)], b[~np.isnan(b)], rtol=1e-6), (symbol, name)
+        assert list(result[symbol].index) == list(df.index)
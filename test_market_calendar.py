@@ -0,0 +1,51 @@
+from datetime import date
+
+import pandas as pd
+
+from market_calendar import KRX, NYSE, cache_token, is_fresh, nyse_holidays
+
+
+def _seoul(text):
+    return pd.Timestamp(text, tz="Asia/Seoul")
+
+
+def _new_york(text):
+    return pd.Timestamp(text, tz="America/New_York")
+
+
+def test_holidays_and_sessions():
+    """주말/휴장일은 세션이 아니고 마지막 마감 시각은 직전 거래일"""
+    assert date(2026, 4, 3) in nyse_holidays(2026)           # Good Friday
+    assert date(2026, 7, 3) in nyse_holidays(2026)           # 7/4(토) 대체
+    assert not KRX.is_session(date(2026, 2, 17))             # 설날
+    assert KRX.last_close(_seoul("2026-02-19 08:00")) == _seoul("2026-02-13 15:30")
+    assert NYSE.is_open(_new_york("2026-10-16 10:00"))
+    assert not NYSE.is_open(_new_york("2026-10-17 10:00"))   # 토요일
+
+
+def test_overnight_and_weekend_data_stays_fresh():
+    """마감 후 받은 일봉은 주말 내내 유효하고 다음 장 마감 뒤에 만료"""
+    checked = _new_york("2026-10-16 17:00")                  # 금요일 장 마감 후
+    assert is_fresh("AAPL", checked, _new_york("2026-10-16 23:00"))
+    assert is_fresh("AAPL", checked, _new_york("2026-10-18 12:00"))
+    assert is_fresh("AAPL", checked, _new_york("2026-10-19 09:00"))
+    assert not is_fresh("AAPL", checked, _new_york("2026-10-19 16:30"))
+
+    # 장중에 받은 진행 중인 봉은 마감 후 한 번 다시 받아야 함
+    assert not is_fresh("AAPL", _new_york("2026-10-16 15:55"), _new_york("2026-10-16 20:00"))
+
+
+def test_intraday_refreshes_only_after_short_ttl():
+    """장중에는 INTRADAY_TTL 안에서만 유효하고 시장마다 따로 판단"""
+    checked = _seoul("2026-10-16 10:00")
+    assert is_fresh("005930.KS", checked, _seoul("2026-10-16 10:04"))
+    assert not is_fresh("005930.KS", checked, _seoul("2026-10-16 10:06"))
+    # 같은 시각 미국은 장 마감 후 → 전날 마감 뒤 받은 데이터는 유효
+    assert is_fresh("AAPL", _new_york("2026-10-15 18:00"), _seoul("2026-10-16 10:06"))
+
+
+def test_cache_token_changes_only_with_market_state():
+    """마감 후에는 고정, 장중에는 TTL마다 변경"""
+    assert cache_token("AAPL", _new_york("2026-10-16 22:00")) == cache_token("AAPL", _new_york("2026-10-19 08:00"))
+    assert cache_token("AAPL", _new_york("2026-10-19 08:00")) != cache_token("AAPL", _new_york("2026-10-19 17:00"))
+    assert cache_token("005930.KS", _seoul("2026-10-16 10:00")) != cache_token("005930.KS", _seoul("2026-10-16 10:10"))
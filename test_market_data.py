@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+import market_data
+from bulk_download import download_bulk
+from market_data import ReplayError, ReplayProvider, record
+
+
+def test_replay_generates_reproducible_history():
+    """같은 종목/시드는 같은 시세, period에 맞게 잘림"""
+    first = ReplayProvider().history("AAPL", period="3mo")
+    second = ReplayProvider().history("AAPL", period="3mo")
+    year = ReplayProvider().history("AAPL", period="1y")
+
+    pd.testing.assert_frame_equal(first, second)
+    assert list(first.columns) == market_data.OHLCV_COLUMNS
+    assert 55 <= len(first) <= 70
+    assert len(year) > len(first)
+    assert str(first.index.tz) == "America/New_York"
+    assert (first['High'] >= first['Low']).all()
+
+
+def test_replay_injects_errors_and_empty_responses():
+    """error_rate/empty_rate 비율만큼 실패와 빈 응답을 주입"""
+    provider = ReplayProvider(error_rate=0.2, empty_rate=0.1, seed=1)
+    errors = empties = 0
+    for i in range(500):
+        try:
+            df = provider.history(f"SYM{i}", period="1mo")
+            empties += df.empty
+        except ReplayError:
+            errors += 1
+
+    assert provider.requests == 500
+    assert errors == provider.errors and 70 <= errors <= 130
+    assert empties == provider.empties and 25 <= empties <= 75
+
+
+def test_replay_serves_recorded_files(root):
+    """record()로 저장한 파일을 생성 데이터 대신 재생"""
+    source = ReplayProvider(seed=7)
+    saved = record(["005930.KS"], root, period="6mo", provider=source)
+    replay = ReplayProvider(root, generate=False)
+
+    recorded = replay.history("005930.KS", period="6mo")
+    assert saved == {"005930.KS": len(recorded)}
+    assert recorded['Close'].iloc[-1] == pytest.approx(source.frame("005930.KS")['Close'].iloc[-1])
+    assert replay.history("MISSING", period="6mo").empty
+
+
+def test_fetch_paths_go_through_provider(store, provider):
+    """저장소 조회와 일괄 다운로드가 현재 데이터 소스를 사용"""
+    df = store.get_history("MSFT", "3mo")
+    assert df is not None and provider.requests == 1
+
+    frames = download_bulk(["AAPL", "000660.KS", "NVDA"], period="1mo")
+    assert set(frames) == {"AAPL", "000660.KS", "NVDA"}
+    assert provider.requests == 3  # 시장별 묶음 2회
+
+    bulk = store.refresh_many(["MSFT", "GOOGL"], "3mo")
+    assert set(bulk) == {"MSFT", "GOOGL"}
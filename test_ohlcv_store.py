@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+import ohlcv_store
+from market_data import ReplayProvider, set_provider
+
+
+def test_longer_window_fetches_only_missing_older_segment(store, provider):
+    """스크리닝(3mo) 후 차트(6mo): 앞부분만 한 번 요청하고 전체 요청과 같은 결과"""
+    store.refresh_many(["AAPL", "005930.KS"], "3mo")
+    requests = provider.requests
+
+    chart = store.get_history("AAPL", "6mo")
+    assert provider.requests == requests + 1
+
+    full = provider.frame("AAPL")
+    full = full[full.index >= chart.index[0].tz_localize(full.index.tz)]
+    assert len(chart) == len(full)
+    assert np.allclose(chart['Close'], full['Close'], rtol=1e-5)
+
+
+def test_sub_windows_served_without_requests(store, provider):
+    """더 긴 이력이 있으면 짧은 구간은 요청 없이 잘라서 반환"""
+    year = store.get_history("MSFT", "1y")
+    requests = provider.requests
+
+    for period in ("6mo", "3mo", "1mo", "1y"):
+        df = store.get_history("MSFT", period)
+        assert df.index[-1] == year.index[-1]
+        assert len(df) <= len(year)
+    assert provider.requests == requests
+
+
+def test_bulk_refresh_backfills_short_histories(store, provider):
+    """일괄 갱신도 이력이 짧은 종목은 앞부분만 묶어서 요청"""
+    symbols = ["AAPL", "MSFT", "NVDA"]
+    store.refresh_many(symbols, "1mo")
+    requests = provider.requests
+
+    frames = store.refresh_many(symbols, "6mo")
+    assert provider.requests == requests + 1
+    assert all(len(frames[s]) > 120 for s in symbols)
+
+
+def test_stale_refresh_transfers_only_last_bars(store, provider):
+    """오래된 종목 갱신은 종목당 최근 봉만 받아 저장된 이력 뒤에 붙임"""
+    symbols = ["AAPL", "MSFT", "005930.KS", "000660.KS"]
+    first = store.refresh_many(symbols, "3mo")
+    full_bars = provider.bars
+
+    store.is_fresh = lambda symbol, now=None: False      # 장중 재스크리닝
+    frames = store.refresh_many(symbols, "3mo")
+    tail_bars = provider.bars - full_bars
+
+    assert tail_bars <= len(symbols) * 5
+    assert tail_bars / full_bars < 0.05
+    for symbol in symbols:
+        pd.testing.assert_index_equal(frames[symbol].index, first[symbol].index)
+
+
+def test_empty_answers_keep_stored_history(store, provider):
+    """빈 응답(상장 전 구간, 새 봉 없음)에도 저장된 이력을 반환하고 같은 구간을 다시 요청하지 않음"""
+    store.get_history("AAPL", "3mo")
+    store.refresh_many(["MSFT", "NVDA"], "1mo")
+    stored = {s: store.load(s) for s in ("AAPL", "MSFT", "NVDA")}
+    for symbol in stored:
+        store.entry(symbol)['updated'] = "2000-01-01T00:00:00+00:00"
+
+    empty = ReplayProvider(empty_rate=1.0)
+    set_provider(empty)
+    assert len(store.get_history("AAPL", "6mo")) == len(stored["AAPL"])
+    frames = store.refresh_many(["MSFT", "NVDA"], "6mo")
+    assert all(len(frames[s]) == len(stored[s]) for s in ("MSFT", "NVDA"))
+    assert not any(store.is_fresh(s) for s in stored)                  # 최근 봉은 확인하지 못함
+
+    # 다시 조회하면 최근 봉만 요청 (AAPL 1회, MSFT/NVDA 묶음 1회), 앞부분은 요청하지 않음
+    requests = empty.requests
+    store.get_history("AAPL", "6mo")
+    store.refresh_many(["MSFT", "NVDA"], "6mo")
+    assert empty.requests == requests + 2
+
+
+def test_bulk_refresh_survives_dropped_short_stale_symbol(store, provider):
+    """짧고 오래된 종목의 수정주가가 바뀌었는데 전체 재수집도 비면 그 종목만 빠지고 나머지는 갱신"""
+    symbols = ["AAPL", "MSFT"]
+    store.refresh_many(symbols, "1mo")
+    for symbol in symbols:
+        store.entry(symbol)['updated'] = "2000-01-01T00:00:00+00:00"
+    adjusted = ReplayProvider(seed=1)
+
+    def downloader(chunk, **kwargs):
+        if 'start' in kwargs and kwargs.get('end'):
+            # 앞부분: MSFT만 다른 가격(수정주가 변경)
+            return adjusted.download(chunk, **kwargs) if chunk == ["MSFT"] else provider.download(chunk, **kwargs)
+        if chunk == ["MSFT"]:
+            return pd.DataFrame()
+        return provider.download(chunk, **kwargs)
+
+    frames = store.refresh_many(symbols, "6mo", chunk_size=1, downloader=downloader)
+    assert "MSFT" not in frames and store.entry("MSFT") is None
+    assert len(frames["AAPL"]) > 120
+
+
+def test_empty_tail_is_recorded_but_not_marked_fresh(store, provider):
+    """새 봉 요청이 빈 종목은 빈 응답으로 남고 갱신 시각도 그대로, 묶음 전체가 빈 응답은 종목별로 기록하지 않음"""
+    symbols = ["AAPL", "MSFT"]
+    store.refresh_many(symbols, "3mo")
+    assert store.take_responses(symbols) == {"AAPL": "ok", "MSFT": "ok"}
+    for symbol in symbols:
+        store.entry(symbol)['updated'] = "2000-01-01T00:00:00+00:00"
+
+    def delisted(chunk, **kwargs):
+        listed = [s for s in chunk if s != "MSFT"]
+        return provider.download(listed, **kwargs) if listed else pd.DataFrame()
+
+    store.refresh_many(symbols, "3mo", downloader=delisted)
+    assert store.take_responses(symbols) == {"AAPL": "ok", "MSFT": "empty"}
+    assert store.is_fresh("AAPL") and not store.is_fresh("MSFT")
+
+    provider.empty_rate = 1.0
+    store.entry("AAPL")['updated'] = "2000-01-01T00:00:00+00:00"
+    assert len(store.refresh_many(symbols, "3mo")) == 2
+    assert store.take_responses(symbols) == {}
+
+
+def test_partial_last_bar_corrected_after_one_session(store, provider, monkeypatch):
+    """장중에 저장된 미완성 봉은 한 거래일이 지난 뒤 갱신에서 확정 값으로 바뀜"""
+    store.refresh_many(["AAPL"], "3mo")
+    full = store.load("AAPL")
+    partial = full.iloc[:-1].copy()
+    partial.iloc[-1, partial.columns.get_loc('Close')] *= 0.9
+    partial.iloc[-1, partial.columns.get_loc('Volume')] //= 3
+    store.write("AAPL", partial)
+    store.entry("AAPL")['updated'] = "2000-01-01T00:00:00+00:00"
+    monkeypatch.setattr(ohlcv_store.market_calendar, "missing_sessions", lambda symbol, last_bar: 1)
+
+    frames = store.refresh_many(["AAPL"], "3mo")
+    pd.testing.assert_frame_equal(frames["AAPL"].iloc[-2:], full.iloc[-2:])
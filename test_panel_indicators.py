@@ -0,0 +1,93 @@
+import numpy as np
+from streamlit import logger
+
+logger.set_log_level("error")
+
+import ultra_complete_app as app
+from advanced_dashboard import AdvancedStockScreener
+from complete_app import CompleteStockScreener
+from market_data import ReplayProvider
+from panel_indicators import Panel, simple_indicators
+from ultra_complete_app import (FAST_INDICATOR_COLUMNS, calculate_technical_indicators_fast,
+                                calculate_technical_indicators_panel, optimize_stock_frame)
+
+
+def _frames():
+    """길이가 제각각인 종목들 (오른쪽 정렬 시 앞쪽 빈 칸이 생기도록)"""
+    provider = ReplayProvider()
+    symbols = ["AAPL", "MSFT", "005930.KS", "NVDA", "035720.KQ", "TSLA"]
+    return {symbol: provider.frame(symbol).iloc[-(60 + i * 23):] for i, symbol in enumerate(symbols)}
+
+
+def _assert_same(a, b, label):
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    assert np.array_equal(np.isnan(a), np.isnan(b)), label
+    assert np.allclose(a[~np.isnan(a)], b[~np.isnan(b)], rtol=1e-9, atol=1e-9), label
+
+
+def test_panel_matches_ultra_indicators():
+    """전체 종목 벡터 연산 결과가 calculate_technical_indicators_fast와 같음, 짧은 이력은 그대로"""
+    frames = {symbol: optimize_stock_frame(df) for symbol, df in _frames().items()}
+    frames["SHORT"] = optimize_stock_frame(ReplayProvider().frame("SHORT").iloc[-30:])
+
+    result = calculate_technical_indicators_panel(frames)
+    assert result["SHORT"] is frames["SHORT"]
+    for symbol, df in frames.items():
+        if symbol == "SHORT":
+            continue
+        expected = calculate_technical_indicators_fast(df.copy())
+        for name in FAST_INDICATOR_COLUMNS:
+            _assert_same(result[symbol][name], expected[name], (symbol, name))
+        assert list(result[symbol].index) == list(df.index)
+
+
+def test_panel_matches_advanced_indicators():
+    """AdvancedStockScreener 일괄 계산이 종목별 calculate_technical_indicators와 같음 (스토캐스틱/윌리엄스 포함)"""
+    screener = AdvancedStockScreener.__new__(AdvancedStockScreener)
+    frames = _frames()
+    result = screener.calculate_technical_indicators_many(frames)
+    for symbol, df in frames.items():
+        expected = screener.calculate_technical_indicators(df.copy())
+        for name in ['BB_Middle', 'BB_Upper', 'BB_Lower', 'RSI', 'MACD', 'MACD_Signal', 'SMA_20',
+                     'SMA_50', 'SMA_200', 'Volume_SMA', 'Stoch_K', 'Stoch_D', 'Williams_R']:
+            _assert_same(result[symbol][name], expected[name], (symbol, name))
+
+
+def test_panel_matches_complete_app_analysis():
+    """CompleteStockScreener 일괄 분석이 종목별 analyze_stock과 같음"""
+    screener = CompleteStockScreener.__new__(CompleteStockScreener)
+    frames = _frames()
+    infos = {symbol: {'name': symbol, 'sector': 'Tech'} for symbol in frames}
+    result = screener.analyze_stocks(frames, infos)
+
+    screener.get_stock_data = lambda symbol, period="3mo": frames[symbol]
+    for symbol, df in frames.items():
+        expected = screener.analyze_stock(symbol, infos[symbol])
+        for key, value in expected.items():
+            if isinstance(value, str):
+                assert result[symbol][key] == value, (symbol, key)
+            else:
+                _assert_same([result[symbol][key]], [value], (symbol, key))
+
+    # 단순 이동평균 RSI, adjust=True MACD도 시계열 전체가 같음
+    panel = Panel(frames)
+    values = simple_indicators(panel)
+    for symbol, df in frames.items():
+        macd = screener.calculate_macd(df)
+        _assert_same(panel.column(values['RSI'], symbol), screener.calculate_rsi(df), (symbol, 'RSI'))
+        _assert_same(panel.column(values['MACD'], symbol), macd['macd'], (symbol, 'MACD'))
+        _assert_same(panel.column(values['MACD_Signal'], symbol), macd['signal'], (symbol, 'MACD_Signal'))
+        _assert_same(panel.column(values['MA_60'], symbol), screener.calculate_moving_averages(df)['ma60'],
+                     (symbol, 'MA_60'))
+
+
+def test_panel_engine_screens_like_per_symbol_checks(app_store):
+    """ultra 전체 종목 벡터 조건 평가가 종목별 check_conditions와 같은 결과 행을 냄"""
+    stocks = {f"S{i:03d}": f"종목{i}" for i in range(80)}
+    for rsi_type in ("초과", "미만", "상향돌파", "하향돌파"):
+        conditions = {"bb_breakout": True, "rsi_condition": {"type": rsi_type, "value": 50},
+                      "volume_surge": 1.2, "price_momentum": True, "macd_bullish": True}
+        full = dict(app.build_screen_pipeline(stocks, conditions, engine="thread").run())
+        panel = dict(app.build_screen_pipeline(stocks, conditions, engine="panel").run())
+        assert any(full.values())
+        assert panel == full, rsi_type
@@ -0,0 +1,62 @@
+from streamlit import logger
+
+logger.set_log_level("error")
+
+import numpy as np
+
+from backtest import backtest, forward_outcomes
+from market_data import ReplayProvider
+from panel_indicators import Panel, ta_indicators
+from parameter_sweep import parameter_points, preset_strategy, sweep
+from strategy_builder import PresetStrategies
+from strategy_compiler import STRATEGY_INDICATOR_COLUMNS, STRATEGY_INDICATOR_PARAMS
+
+GRID = {'bb_period': (10, 20), 'bb_std': (1.5, 2.0), 'rsi_upper': (60, 70), 'rsi_lower': (30, 40),
+        'volume_multiplier': (1.2, 1.5), 'ma_fast': (10, 20), 'ma_slow': (20, 50)}
+
+
+def _frames():
+    provider = ReplayProvider(days=300)
+    return {f"S{i:03d}": provider.frame(f"S{i:03d}").iloc[4 * i:] for i in range(20)}
+
+
+def test_sweep_matches_independent_backtests():
+    """조합마다 지표를 새로 계산해 백테스트한 결과와 같음 (중간 배열 공유, 프로세스 모드 포함)"""
+    frames = _frames()
+    panel = Panel(frames)
+    horizons = (5, 20)
+    assert PresetStrategies.momentum_breakout().conditions[1].value == 70
+    assert PresetStrategies.golden_cross().required_indicators() == ['SMA_20', 'SMA_50', 'MACD', 'MACD_Signal']
+
+    for preset in ('momentum_breakout', 'oversold_reversal', 'golden_cross'):
+        points = parameter_points(preset, GRID)
+        assert all(p.get('ma_fast', 0) < p.get('ma_slow', 1) for p in points)
+        result = sweep(preset, frames, GRID, horizons=horizons, workers=1)
+        pooled = sweep(preset, frames, GRID, horizons=horizons, workers=2)
+        assert np.allclose(pooled.stats, result.stats)
+        assert result.symbols == len(frames)
+
+        for i, point in enumerate(points):
+            strategy = preset_strategy(preset, point)
+            params = dict(STRATEGY_INDICATOR_PARAMS, bb_period=point.get('bb_period', 20),
+                          bb_std=point.get('bb_std', 2.0), ma_windows=(point.get('ma_fast', 20), point.get('ma_slow', 50)))
+            columns = dict(STRATEGY_INDICATOR_COLUMNS, **{f"SMA_{w}": f"MA_{w}" for w in params['ma_windows']})
+            signals = strategy.compile().evaluate_panel(panel, ta_indicators(panel, params), columns, dates=True)
+            for k, h in enumerate(horizons):
+                returns, drawdowns = forward_outcomes(panel['Close'], signals, h)
+                assert result.stats[i, k, 0] == len(returns), (preset, point)
+                assert np.isclose(result.stats[i, k, 1], returns.sum()), (preset, point)
+                assert np.isclose(result.stats[i, k, 4], drawdowns.sum()), (preset, point)
+
+            # 기본값 조합은 backtest()와 같음
+            if point.get('bb_period', 20) == 20 and point.get('bb_std', 2.0) == 2.0:
+                summary = backtest(strategy, frames, horizons).summary()
+                assert summary['신호 수'].tolist() == result.stats[i, :, 0].tolist()
+
+        table = result.table(horizon=20, min_signals=1)
+        assert len(table) == int((result.stats[:, 1, 0] >= 1).sum())
+        assert table['평균 수익률(%)'].is_monotonic_decreasing
+        assert list(table.columns[:len(points[0])]) == list(points[0])
+
+    sampled = parameter_points('momentum_breakout', samples=10, seed=3)
+    assert len(sampled) == 10 and sampled == parameter_points('momentum_breakout', samples=10, seed=3)
@@ -0,0 +1,141 @@
+import math
+
+from streamlit import logger
+
+logger.set_log_level("error")
+
+import numpy as np
+
+import ultra_complete_app as app
+from market_data import ReplayProvider
+from panel_indicators import local_dates
+from portfolio_sim import INITIAL_CASH, PortfolioSimulator, symbol_currency
+
+CONDITIONS = {"bb_breakout": True, "rsi_condition": {"type": "미만", "value": 45}, "volume_surge": 1.3}
+
+
+def _frames():
+    provider = ReplayProvider(days=260)
+    symbols = [f"S{i:03d}" for i in range(12)] + [f"{i:06d}.KS" for i in range(10)]
+    # 한국 종목은 다른 시간대, 종목마다 상장일이 다름
+    return {symbol: provider.frame(symbol).iloc[6 * i:] for i, symbol in enumerate(symbols)}
+
+
+def _reference(result_dates, symbols, close, signals, scores, simulator):
+    """포지션을 종목별 리스트로 들고 하루씩 처리하는 직접 구현 (동일 비중, 재조정 없음)"""
+    cash = {c: float(v) for c, v in INITIAL_CASH.items()}
+    positions, last, equity, trades = {}, {}, [], 0
+    currency = [symbol_currency(s) for s in symbols]
+    ends = [max(t for t in range(len(result_dates)) if not np.isnan(close[t, j])) for j in range(len(symbols))]
+    for t in range(len(result_dates)):
+        for j in range(len(symbols)):
+            if not np.isnan(close[t, j]):
+                last[j] = close[t, j]
+        for j, (shares, entry, day) in list(positions.items()):
+            price = close[t, j]
+            stopped = (not np.isnan(price) and simulator.stop_loss
+                       and price <= entry * (1 - simulator.stop_loss))
+            if t - day >= simulator.hold_days or t > ends[j] or stopped:
+                # 거래가 없는 날(정지/상장폐지 이후)은 마지막 거래 종가로 청산
+                cash[currency[j]] += shares * last[j] * (1 - simulator.fee)
+                del positions[j]
+                trades += 1
+        value = {c: cash[c] + sum(q * last[j] for j, (q, _, _) in positions.items() if currency[j] == c) for c in cash}
+        candidates = sorted((j for j in range(len(symbols))
+                             if signals[t, j] and not np.isnan(close[t, j]) and j not in positions),
+                            key=lambda j: (-scores[t, j], j))
+        for c in cash:
+            slots = simulator.max_positions - sum(currency[j] == c for j in positions)
+            for j in [j for j in candidates if currency[j] == c][:max(slots, 0)]:
+                price = close[t, j]
+                shares = math.floor(value[c] / simulator.max_positions / (price * (1 + simulator.fee)))
+                if shares <= 0:
+                    continue
+                if shares * price * (1 + simulator.fee) > cash[c] + 1e-9:
+                    break
+                cash[c] -= shares * price * (1 + simulator.fee)
+                positions[j] = (shares, price, t)
+                trades += 1
+        equity.append([cash[c] + sum(q * last[j] for j, (q, _, _) in positions.items() if currency[j] == c)
+                       for c in cash])
+    return np.array(equity), trades
+
+
+def test_screen_history_matches_daily_screens():
+    """과거 봉별 매칭이 그날까지 자른 프레임의 screen_frames_panel 결과와 같고, 날짜 축으로 맞춰짐"""
+    frames = _frames()
+    panel, counts = app.screen_history(frames, CONDITIONS)
+    assert counts.shape == (panel.rows, len(panel))
+    for back in (0, 1, 5, 30, 120):
+        end = panel.rows - back
+        cut = {symbol: df.iloc[:len(df) - back] for symbol, df in frames.items() if len(df) > back}
+        met, _ = app.screen_frames_panel(cut, CONDITIONS)
+        for symbol in cut:
+            assert counts[end - 1, panel.index[symbol]] == len(met[symbol]), (back, symbol)
+    assert (counts > 0).sum() > 20
+
+    dates, by_date = panel.by_date(counts, fill=0)
+    assert dates.is_monotonic_increasing and dates.is_unique
+    for symbol in ("S000", "000003.KS"):
+        column = by_date[:, panel.index[symbol]]
+        positions = dates.get_indexer(local_dates(frames[symbol].index))
+        assert (column[positions] == panel.column(counts, symbol)).all()
+        assert not np.delete(column, positions).any()
+
+
+def test_simulator_matches_position_by_position_reference():
+    """배열 상태 시뮬레이션이 포지션별 직접 구현과 같은 자산 곡선, 보유 한도/현금 제약 유지"""
+    frames = _frames()
+    panel, counts = app.screen_history(frames, CONDITIONS)
+    dates, matched = panel.by_date(counts, fill=0)
+    _, close = panel.by_date(panel['Close'])
+
+    for simulator in (PortfolioSimulator(max_positions=3, hold_days=5),
+                      PortfolioSimulator(max_positions=4, hold_days=15, stop_loss=0.03, fee=0.0)):
+        result = simulator.run(dates, panel.symbols, close, matched > 0, matched)
+        expected, trades = _reference(dates, panel.symbols, close, matched > 0, matched, simulator)
+        assert result.currencies == ['KRW', 'USD']
+        assert np.allclose(result.equity, expected, rtol=1e-9)
+        assert len(result.trades()) == trades > 20
+        assert (result.cash >= -1e-6).all()
+        assert (result.holdings <= simulator.max_positions).all()
+
+    for simulator in (PortfolioSimulator(max_positions=3, weighting="volatility", rebalance_days=5),
+                      PortfolioSimulator(max_positions=3, rebalance_days=3)):
+        result = app.simulate_screen_portfolio(frames, CONDITIONS, simulator)
+        trades = result.trades()
+        assert (result.cash >= -1e-6).all()
+        assert (result.holdings <= 3).all()
+        assert (trades['사유'] == '재조정').any()
+        summary = result.summary()
+        assert list(summary.index) == ['KRW', 'USD']
+        assert summary['체결 수'].sum() == len(trades)
+        assert np.allclose(result.equity_frame().iloc[-1].to_numpy(), summary['최종 자산'].to_numpy())
+
+
+def test_truncated_series_is_closed_at_last_bar():
+    """시계열이 중간에 끝난(상장폐지) 종목과 보유 기간 내내 거래정지인 종목도 마지막 거래 종가로 청산"""
+    frames = _frames()
+    panel, counts = app.screen_history(frames, CONDITIONS)
+    dates, matched = panel.by_date(counts, fill=0)
+    _, close = panel.by_date(panel['Close'])
+    simulator = PortfolioSimulator(max_positions=3, hold_days=5)
+
+    entries = simulator.run(dates, panel.symbols, close, matched > 0, matched)._trades
+    entries = [(d, j) for d, j, r in zip(entries['day'], entries['symbol'], entries['reason']) if r == 0 and d < 200]
+    (delisted_day, delisted), (halted_day, halted) = entries[0], next(e for e in entries if e[1] != entries[0][1])
+    close = close.copy()
+    close[delisted_day + 1:, delisted] = np.nan
+    close[halted_day + 1:halted_day + simulator.hold_days + 3, halted] = np.nan
+
+    result = simulator.run(dates, panel.symbols, close, matched > 0, matched)
+    expected, trades = _reference(dates, panel.symbols, close, matched > 0, matched, simulator)
+    assert np.allclose(result.equity, expected, rtol=1e-9)
+    assert len(result.trades()) == trades
+
+    exits = result.trades()
+    exits = exits[exits['사유'] == '청산']
+    for day, j, until in ((delisted_day, delisted, delisted_day + 1),
+                          (halted_day, halted, halted_day + simulator.hold_days)):
+        row = exits[(exits['종목'] == panel.symbols[j]) & (exits['날짜'] > dates[day])].iloc[0]
+        assert row['날짜'] == dates[until] and row['가격'] == close[day, j]
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from screen_pipeline import Pipeline
+
+
+def test_stages_overlap_and_keep_all_items():
+    """느린 수집(I/O)과 계산이 겹쳐서 전체 시간이 단계별 시간의 합보다 짧음"""
+    def fetch(chunk):
+        time.sleep(0.05)
+        return chunk
+
+    def compute(item):
+        time.sleep(0.01)
+        return item * 2
+
+    chunks = [list(range(i, i + 5)) for i in range(0, 50, 5)]
+    pipeline = (Pipeline(chunks, queue_size=8)
+                .stage("fetch", fetch, fan_out=True, queue_size=1)
+                .stage("compute", compute, workers=2))
+
+    started = time.perf_counter()
+    results = sorted(pipeline.run())
+    elapsed = time.perf_counter() - started
+
+    assert results == [i * 2 for i in range(50)]
+    assert elapsed < 10 * 0.05 + 50 * 0.01 / 2 * 0.9 + 0.1
+    fetch_stats, compute_stats = pipeline.stats()
+    assert (fetch_stats['processed'], fetch_stats['emitted'], compute_stats['processed']) == (10, 50, 50)
+    assert compute_stats['throughput'] > 0
+
+
+def test_bounded_queue_limits_run_ahead():
+    """뒤 단계가 멈춰 있으면 앞 단계는 큐 길이만큼만 앞서감"""
+    produced = []
+    release = threading.Event()
+
+    def source():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    def slow(item):
+        release.wait()
+        return item
+
+    pipeline = Pipeline(source(), queue_size=4).stage("slow", slow)
+    stream = pipeline.run()
+    consumer = threading.Thread(target=lambda: list(stream))
+    consumer.start()
+    time.sleep(0.3)
+    assert len(produced) <= 4 + 2                # 큐 4개 + 작업 중 1개 + 넣으려고 대기 중 1개
+    release.set()
+    consumer.join(timeout=5)
+    assert len(produced) == 100
+
+
+def test_errors_are_counted_and_stop_on_close():
+    """예외가 난 항목은 버리고 집계, 소비를 멈추면 작업 스레드도 종료"""
+    def flaky(item):
+        if item % 10 == 0:
+            raise ValueError(item)
+        return item
+
+    pipeline = Pipeline(range(1000), queue_size=4).stage("flaky", flaky, workers=3)
+    stream = pipeline.run()
+    taken = [next(stream) for _ in range(20)]
+    stream.close()
+    deadline = time.monotonic() + 3
+    while time.monotonic() < deadline and any(t.name.startswith("pipeline-") for t in threading.enumerate()):
+        time.sleep(0.05)
+
+    assert all(item % 10 for item in taken)
+    stats = pipeline.stats()[0]
+    assert stats['errors'] >= 2
+    assert stats['processed'] < 1000
+    assert not any(t.name.startswith("pipeline-") for t in threading.enumerate())
@@ -0,0 +1,137 @@
+import itertools
+
+from streamlit import logger
+
+logger.set_log_level("error")
+
+import numpy as np
+
+from advanced_dashboard import ADVANCED_INDICATOR_COLUMNS, ADVANCED_INDICATOR_PARAMS, AdvancedStockScreener
+from market_data import ReplayProvider
+from panel_indicators import Panel, ta_indicators
+from strategy_builder import Condition, ConditionType, Operator, PresetStrategies, StrategyBuilder
+
+
+def _conditions():
+    """모든 조건 타입 × 연산자 조합 (지원하지 않는 조합 포함)"""
+    values = {ConditionType.RSI: 50, ConditionType.MACD: 0, ConditionType.VOLUME: 1.2, ConditionType.PRICE_ACTION: 0.5}
+    parameters = {
+        ConditionType.MOVING_AVERAGE: [{'ma_type': 'golden_cross'}, {'ma_type': 'price_above_ma20'},
+                                       {'period': 20}, {'period': 200}, {'period': 60}],
+        ConditionType.VOLUME: [None, {'period': 10}],
+        ConditionType.PRICE_ACTION: [{'type': 'daily_change'}, {'type': 'gap_up'}],
+    }
+    for kind, operator in itertools.product(ConditionType, Operator):
+        for params in parameters.get(kind, [None]):
+            yield Condition(f"{kind.value} {operator.value}", kind, operator, values.get(kind, 0), "", params)
+
+
+def _reference(strategy, data):
+    """조건별 직접 평가 (컴파일 전 방식)"""
+    if data is None or data.empty or len(data) < 2:
+        return False
+    results = [strategy._evaluate_condition(data, condition) for condition in strategy.conditions]
+    return all(results) if strategy.combination_logic == "AND" else any(results)
+
+
+def _name(strategy):
+    return f"{strategy.combination_logic}: " + ", ".join(c.name for c in strategy.conditions)
+
+
+def _frames():
+    provider = ReplayProvider()
+    screener = AdvancedStockScreener.__new__(AdvancedStockScreener)
+    frames = {}
+    for i in range(30):
+        df = provider.frame(f"S{i:03d}")
+        for end in (-1, -7, -40):
+            frames[f"S{i:03d}{end}"] = screener.calculate_technical_indicators(df.iloc[-260:end].copy())
+    # 거래량 평균 컬럼이 없는 종목(기간 평균으로 대체), 봉이 모자란 종목
+    frames["NO_VOLUME_SMA"] = frames["S000-1"].drop(columns=['Volume_SMA'])
+    frames["ONE_BAR"] = frames["S001-1"].iloc[-1:]
+    return frames
+
+
+def test_compiled_strategy_matches_condition_by_condition():
+    """DAG 실행 결과가 조건별 평가와 같음 (단일 조건, AND/OR 조합, 종목 묶음 실행)"""
+    frames = _frames()
+    conditions = list(_conditions())
+    strategies = []
+    for condition in conditions:
+        strategy = StrategyBuilder()
+        strategy.add_condition(condition)
+        strategies.append(strategy)
+    for logic in ("AND", "OR"):
+        for start in range(0, len(conditions), 5):
+            strategy = StrategyBuilder()
+            for condition in conditions[start:start + 5]:
+                strategy.add_condition(condition)
+            strategy.set_combination_logic(logic)
+            strategies.append(strategy)
+
+    matches = 0
+    for strategy in strategies:
+        expected = {symbol: _reference(strategy, df) for symbol, df in frames.items()}
+        assert strategy.compile().evaluate_frames(frames) == expected, _name(strategy)
+        for symbol in ("S000-1", "NO_VOLUME_SMA", "ONE_BAR"):
+            assert strategy.evaluate_strategy(frames[symbol]) == expected[symbol], (_name(strategy), symbol)
+        matches += sum(expected.values())
+    assert matches > 100
+
+
+def test_common_subexpressions_are_merged():
+    """같은 지표/같은 비교는 노드 하나, 조건이 바뀌면 다시 컴파일"""
+    strategy = StrategyBuilder()
+    for operator in (Operator.BREAKOUT, Operator.GREATER_THAN, Operator.BREAKOUT):
+        strategy.add_condition(Condition("BB", ConditionType.BOLLINGER_BAND, operator, 0, ""))
+    for operator in (Operator.GREATER_THAN, Operator.CROSS_ABOVE):
+        strategy.add_condition(Condition("RSI", ConditionType.RSI, operator, 70, ""))
+    for value in (1.5, 2.0):
+        strategy.add_condition(Condition("거래량", ConditionType.VOLUME, Operator.GREATER_THAN, value, ""))
+
+    compiled = strategy.compile()
+    assert len(compiled.conditions) == 7
+    assert len(compiled.predicate_nodes) == 6
+    assert [key for key in compiled.value_nodes if key[0] in ('column', 'volume_average')] == [
+        ('column', 'Close'), ('column', 'BB_Upper'), ('column', 'RSI'), ('column', 'Volume'), ('volume_average', 20)]
+    assert compiled.indicators == ['BB_Upper', 'RSI', 'Volume_SMA']
+    assert strategy.compile() is compiled
+
+    strategy.set_combination_logic("OR")
+    assert strategy.compile() is not compiled
+
+
+def test_panel_masks_match_per_date_evaluation():
+    """전체 종목 × 전체 날짜 마스크가 그 날짜까지 자른 프레임의 evaluate_strategy와 같음"""
+    provider = ReplayProvider()
+    screener = AdvancedStockScreener.__new__(AdvancedStockScreener)
+    frames = {f"S{i:03d}": provider.frame(f"S{i:03d}").iloc[-(80 + 7 * i):] for i in range(16)}
+    frames["ONE_BAR"] = provider.frame("ONE_BAR").iloc[-1:]
+    full = {symbol: screener.calculate_technical_indicators(df.copy()) for symbol, df in frames.items()}
+    panel = Panel(frames)
+    values = ta_indicators(panel, ADVANCED_INDICATOR_PARAMS, oscillators=True)
+
+    conditions = list(_conditions())
+    strategies = [PresetStrategies.momentum_breakout(), PresetStrategies.oversold_reversal(),
+                  PresetStrategies.golden_cross()]
+    for logic, start in (("OR", 0), ("OR", 40), ("AND", 60)):
+        strategy = StrategyBuilder()
+        for condition in conditions[start:start + 12]:
+            strategy.add_condition(condition)
+        strategy.set_combination_logic(logic)
+        strategies.append(strategy)
+
+    hits = 0
+    for strategy in strategies:
+        compiled = strategy.compile()
+        masks = compiled.evaluate_panel(panel, values, ADVANCED_INDICATOR_COLUMNS, dates=True)
+        latest = compiled.evaluate_panel(panel, values, ADVANCED_INDICATOR_COLUMNS)
+        assert masks.shape == (panel.rows, len(panel))
+        assert latest.tolist() == masks[-1].tolist()
+        assert not masks[panel.age < 0].any()
+        for j, symbol in enumerate(panel.symbols):
+            column = panel.column(masks, symbol)
+            expected = [strategy.evaluate_strategy(full[symbol].iloc[:end]) for end in range(1, len(column) + 1)]
+            assert column.tolist() == expected, (_name(strategy), symbol)
+            hits += int(np.sum(column))
+    assert hits > 100
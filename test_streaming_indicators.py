@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from indicator_core import ALL_COLUMNS, compute_arrays
+from streaming_indicators import RESUM_INTERVAL, StreamingIndicators
+
+
+def _history(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = (70_000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))).astype(np.float32)
+    volume = rng.integers(100_000, 5_000_000, n)
+    return pd.DataFrame({'Close': close, 'Volume': volume}, index=pd.date_range('2021-01-04', periods=n, freq='B'))
+
+
+def _assert_matches_full(values, df):
+    full, _ = compute_arrays(df['Close'].to_numpy(dtype=np.float64), df['Volume'].to_numpy(dtype=np.float64))
+    for name in ALL_COLUMNS:
+        a, b = values[name], full[name][-2:]
+        assert np.array_equal(np.isnan(a), np.isnan(b)), name
+        assert np.allclose(a[~np.isnan(a)], b[~np.isnan(b)], rtol=1e-9), name
+
+
+def test_daily_appends_match_full_history_and_survive_restart(root):
+    """하루씩 이어 붙인 값이 전체 이력 계산과 같고, 재시작 후에도 상태를 이어서 씀"""
+    df = _history(RESUM_INTERVAL + 120)
+    engine = StreamingIndicators(root)
+    for end in range(2, 120):
+        _assert_matches_full(engine.sync('005930.KS', df.iloc[:end]), df.iloc[:end])
+    assert engine.stats()['seeded'] == 1
+    engine.flush()
+
+    restarted = StreamingIndicators(root)
+    for end in range(120, len(df) + 1):
+        # 조회 구간이 밀려도(앞쪽 봉이 빠져도) 상태를 처음 만든 시점부터의 값
+        values = restarted.sync('005930.KS', df.iloc[max(0, end - 63):end])
+        _assert_matches_full(values, df.iloc[:end])
+    stats = restarted.stats()
+    assert stats['seeded'] == 0
+    assert stats['appended'] == len(df) - 120 + 1
+
+
+def test_intraday_revision_and_adjusted_history(root):
+    """장중에 마지막 봉이 바뀌면 그 봉만 다시 반영, 과거 종가가 바뀌면(수정주가) 상태를 다시 만듦"""
+    df = _history(80)
+    engine = StreamingIndicators(root)
+    engine.sync('AAPL', df.iloc[:-1])
+    for price in (70_100.0, 69_500.0):
+        engine.update('AAPL', df.index[-1], price, 1_000_000)
+    values = engine.update('AAPL', df.index[-1], float(df['Close'].iloc[-1]), float(df['Volume'].iloc[-1]))
+    _assert_matches_full(values, df)
+    _assert_matches_full(engine.sync('AAPL', df), df)
+    assert engine.stats()['unchanged'] == 1
+
+    adjusted = df.copy()
+    adjusted['Close'] = adjusted['Close'] * np.float32(0.98)
+    _assert_matches_full(engine.sync('AAPL', adjusted), adjusted)
+    assert engine.stats()['seeded'] == 2
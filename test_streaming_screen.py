@@ -0,0 +1,61 @@
+from streamlit import logger
+
+logger.set_log_level("error")
+
+import streaming_indicators
+import ultra_complete_app as app
+from streaming_indicators import StreamingIndicators
+
+STOCKS = {f"S{i:03d}": f"종목{i}" for i in range(120)}
+CONDITIONS = {"price_momentum": True}
+
+
+def test_bulk_stream_yields_first_batch_early(app_store):
+    """일괄 모드는 첫 묶음(FIRST_BATCH개)을 받은 시점에 결과가 나오기 시작"""
+    pipeline = app.build_screen_pipeline(STOCKS, CONDITIONS, bulk=True)
+    stream = pipeline.run()
+    first, _ = next(stream)
+    assert first in list(STOCKS)[:app.FIRST_BATCH]
+
+    rest = list(stream)
+    assert len(rest) == len(STOCKS) - 1
+    fetch, compute, evaluate = pipeline.stats()
+    assert (fetch['processed'], fetch['emitted']) == (2, len(STOCKS))    # 20개 + 100개 묶음
+    assert compute['processed'] == evaluate['processed'] == len(STOCKS)
+
+
+def test_per_symbol_stream_matches_batch_evaluation(app_store):
+    """종목별 모드도 모든 종목을 한 번씩 내보내고 결과는 일괄 평가와 같음"""
+    streamed = dict(app.build_screen_pipeline(STOCKS, CONDITIONS, bulk=False).run())
+    assert set(streamed) == set(STOCKS)
+
+    for symbol in list(STOCKS)[:10]:
+        _, df = app.get_single_stock_data(symbol)
+        expected = app.evaluate_stock(symbol, STOCKS[symbol], df, CONDITIONS)
+        assert streamed[symbol] == expected
+
+
+def test_failed_fetch_still_emits_every_symbol(app_store, monkeypatch):
+    """일괄/대체 요청이 모두 실패한 묶음의 종목도 결과 없음으로 내보내 진행률이 끝까지 감"""
+    def fail(*args, **kwargs):
+        raise ConnectionError("요청 실패")
+
+    class FailingEngine:
+        run = staticmethod(fail)
+
+    monkeypatch.setattr(app, "load_raw_stock_data_bulk", fail)
+    monkeypatch.setattr(app, "get_fetch_engine", FailingEngine)
+    for engine in ("thread", "panel"):
+        streamed = dict(app.build_screen_pipeline(STOCKS, CONDITIONS, bulk=True, engine=engine).run())
+        assert streamed == dict.fromkeys(STOCKS), engine
+
+
+def test_refresh_uses_streaming_state_for_every_engine(app_store, root, monkeypatch):
+    """장중 빠른 갱신은 지표 계산 방식과 관계없이 스트리밍 상태로 계산하고 결과는 전체 계산과 같음"""
+    monkeypatch.setattr(streaming_indicators, "_default_engine", StreamingIndicators(root))
+    expected = dict(app.build_screen_pipeline(STOCKS, CONDITIONS, bulk=True).run())
+    for engine in ("panel", "thread", "tail"):
+        streamed = dict(app.build_screen_pipeline(STOCKS, CONDITIONS, refresh=True, engine=engine).run())
+        assert streamed == expected, engine
+    stats = streaming_indicators.get_streaming_indicators().stats()
+    assert stats['seeded'] == len(STOCKS) and stats['unchanged'] == 2 * len(STOCKS)
@@ -0,0 +1,66 @@
+import time
+
+from symbol_health import SymbolHealthRegistry
+
+
+def test_dead_symbols_skipped_with_exponential_recheck(root):
+    """연속 실패가 기준 이상이면 건너뛰고 재확인 간격은 실패마다 두 배"""
+    health = SymbolHealthRegistry(root, threshold=2, base_recheck=100)
+    health.record_empty("DEAD")
+    assert health.filter(["DEAD", "AAPL"]) == (["AAPL", "DEAD"], [])   # 한 번 실패 → 뒤로 미룸
+
+    health.record_error("DEAD", "ConnectionError")
+    active, skipped = health.filter(["AAPL", "DEAD"])
+    assert (active, skipped) == (["AAPL"], ["DEAD"])
+
+    first = health._table()["DEAD"]['next_check'] - time.time()
+    health.record_empty("DEAD")                                         # 재확인에서도 실패
+    second = health._table()["DEAD"]['next_check'] - time.time()
+    assert 90 < first <= 100 and 190 < second <= 200
+    assert not health.is_dead("DEAD", now=time.time() + 250)
+
+
+def test_success_resets_and_registry_persists(root):
+    """정상 응답은 기록을 초기화하고, 기록은 재시작 후에도 유지"""
+    health = SymbolHealthRegistry(root)
+    for _ in range(3):
+        health.record_empty("OLD.KS")
+    health.record_empty("FLAKY")
+    health.record_ok("FLAKY", "2026-10-16")
+    health.flush()
+
+    restarted = SymbolHealthRegistry(root)
+    assert restarted.is_dead("OLD.KS")
+    assert not restarted.is_dead("FLAKY")
+    rows = restarted.maintenance_rows()
+    assert [row['Symbol'] for row in rows] == ["OLD.KS"]
+    assert rows[0]['Empties'] == 3
+
+    restarted.reset(["OLD.KS"])
+    assert restarted.filter(["OLD.KS"]) == (["OLD.KS"], [])
+
+
+def test_bulk_screening_health_follows_provider_responses(app_store, provider):
+    """빈 일괄 묶음(요청 한도)은 종목 탓으로 세지 않고, 저장된 이력이 있어도 새 봉이 안 오는 종목은 건너뜀"""
+    import ultra_complete_app as app
+
+    symbols = [f"S{i:03d}" for i in range(5)]
+    app.load_raw_stock_data_bulk(symbols)
+
+    def make_stale():
+        for symbol in symbols:
+            app_store.entry(symbol)['updated'] = "2000-01-01T00:00:00+00:00"
+
+    provider.empty_rate = 1.0
+    for _ in range(3):
+        make_stale()
+        assert len(app.load_raw_stock_data_bulk(symbols)) == 5          # 저장된 이력은 그대로 사용
+    assert app.get_symbol_health().filter(symbols) == (symbols, [])
+
+    provider.empty_rate = 0.0
+    provider._frames["S003"] = None                                     # 상장폐지
+    for _ in range(2):
+        make_stale()
+        app.load_raw_stock_data_bulk(symbols)
+    active, skipped = app.get_symbol_health().filter(symbols)
+    assert skipped == ["S003"] and "S003" not in active
@@ -0,0 +1,56 @@
+import numpy as np
+from streamlit import logger
+
+logger.set_log_level("error")
+
+import ultra_complete_app as app
+from advanced_dashboard import ADVANCED_INDICATOR_COLUMNS, AdvancedStockScreener
+from indicator_core import ALL_COLUMNS, compute_arrays
+from market_data import ReplayProvider
+from tail_indicators import tail_arrays
+
+
+def _assert_same(a, b, label):
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    assert np.array_equal(np.isnan(a), np.isnan(b)), label
+    assert np.allclose(a[~np.isnan(a)], b[~np.isnan(b)], rtol=1e-9, atol=1e-9), label
+
+
+def test_tail_matches_full_series_for_any_length():
+    """끝부분 값이 전체 계산의 마지막 봉들과 같음 (워밍업 구간 NaN 포함, EMA 창보다 긴 이력 포함)"""
+    rng = np.random.default_rng(7)
+    for n in (1, 2, 14, 26, 34, 35, 50, 63, 250, 1500):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        volume = rng.integers(100_000, 1_000_000, n).astype(np.float64)
+        full, _ = compute_arrays(close, volume)
+        tail = tail_arrays(close, volume, bars=3)
+        for name in ALL_COLUMNS:
+            _assert_same(tail[name], full[name][-3:], (n, name))
+
+
+def test_tail_frames_match_advanced_indicators():
+    """AdvancedStockScreener 끝부분 일괄 계산이 종목별 calculate_technical_indicators의 마지막 두 봉과 같음"""
+    provider = ReplayProvider()
+    frames = {symbol: provider.frame(symbol).iloc[-(30 + i * 40):]
+              for i, symbol in enumerate(["AAPL", "MSFT", "005930.KS", "NVDA", "TSLA", "AMZN"])}
+    frames["SAME"] = provider.frame("SAME").iloc[-150:]     # NVDA와 같은 길이 → 한 묶음으로 계산
+    screener = AdvancedStockScreener.__new__(AdvancedStockScreener)
+
+    tails = screener.calculate_technical_indicators_many(frames, bars=2)
+    assert list(tails) == list(frames)
+    for symbol, df in frames.items():
+        expected = screener.calculate_technical_indicators(df.copy()).iloc[-2:]
+        assert list(tails[symbol].index) == list(expected.index)
+        for name in ADVANCED_INDICATOR_COLUMNS:
+            _assert_same(tails[symbol][name], expected[name], (symbol, name))
+
+
+def test_tail_engine_screens_like_full_computation(app_store):
+    """ultra 스크리닝의 끝부분 계산 방식이 전체 계산과 같은 결과 행을 냄"""
+    stocks = {f"S{i:03d}": f"종목{i}" for i in range(60)}
+    conditions = {"bb_breakout": True, "rsi_condition": {"type": "초과", "value": 50},
+                  "volume_surge": 1.2, "price_momentum": True, "macd_bullish": True}
+    full = dict(app.build_screen_pipeline(stocks, conditions, engine="thread").run())
+    tail = dict(app.build_screen_pipeline(stocks, conditions, engine="tail").run())
+    assert any(full.values())
+    assert tail == full
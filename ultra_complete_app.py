@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import ta
@@ -9,8 +8,20 @@ from datetime import datetime, timedelta
 import json
 import os
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+from ohlcv_store import get_store, load_history
+from fetch_engine import get_fetch_engine
+from concurrency_tuner import AdaptiveConcurrency
+from single_flight import single_flight
+from symbol_health import get_symbol_health
+from screen_pipeline import Pipeline
+from indicator_pool import POOL_WORKERS, get_indicator_pool
+from panel_indicators import Panel, rolling_std, ta_indicators
+from portfolio_sim import PortfolioSimulator
+from tail_indicators import TAIL_BARS, tail_frames
+from streaming_indicators import get_streaming_indicators
+from indicator_demand import DemandStats, needs
+from strategy_builder import Condition, ConditionType, Operator, StrategyBuilder
 
 # 페이지 설정
 st.set_page_config(
@@ -48,97 +59,193 @@ def load_ultra_complete_stock_lists():
     st.stop()
 
 # 멀티스레딩 기술적 지표 계산
-def calculate_technical_indicators_fast(df):
-    """빠른 기술적 지표 계산"""
+def calculate_technical_indicators_fast(df, columns=None):
+    """빠른 기술적 지표 계산 (columns를 주면 그 컬럼이 속한 지표만 계산)"""
     try:
         if len(df) < 50:
             return df
         
         # 볼린저 밴드 (20, 2)
-        bb_period = 20
-        bb_std = 2
-        df['BB_Middle'] = df['Close'].rolling(window=bb_period).mean()
-        rolling_std = df['Close'].rolling(window=bb_period).std()
-        df['BB_Upper'] = df['BB_Middle'] + (rolling_std * bb_std)
-        df['BB_Lower'] = df['BB_Middle'] - (rolling_std * bb_std)
+        if needs(columns, 'BB'):
+            bb_period = 20
+            bb_std = 2
+            df['BB_Middle'] = df['Close'].rolling(window=bb_period).mean()
+            rolling_std = df['Close'].rolling(window=bb_period).std()
+            df['BB_Upper'] = df['BB_Middle'] + (rolling_std * bb_std)
+            df['BB_Lower'] = df['BB_Middle'] - (rolling_std * bb_std)
         
         # RSI (14일)
-        try:
-            df['RSI'] = ta.momentum.RSIIndicator(df['Close'], window=14).rsi()
-        except:
-            delta = df['Close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            df['RSI'] = 100 - (100 / (1 + rs))
+        if needs(columns, 'RSI'):
+            try:
+                df['RSI'] = ta.momentum.RSIIndicator(df['Close'], window=14).rsi()
+            except:
+                delta = df['Close'].diff()
+                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+                rs = gain / loss
+                df['RSI'] = 100 - (100 / (1 + rs))
         
         # MACD
-        try:
-            macd_ind = ta.trend.MACD(df['Close'])
-            df['MACD'] = macd_ind.macd()
-            df['MACD_Signal'] = macd_ind.macd_signal()
-        except:
-            exp1 = df['Close'].ewm(span=12).mean()
-            exp2 = df['Close'].ewm(span=26).mean()
-            df['MACD'] = exp1 - exp2
-            df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
+        if needs(columns, 'MACD'):
+            try:
+                macd_ind = ta.trend.MACD(df['Close'])
+                df['MACD'] = macd_ind.macd()
+                df['MACD_Signal'] = macd_ind.macd_signal()
+            except:
+                exp1 = df['Close'].ewm(span=12).mean()
+                exp2 = df['Close'].ewm(span=26).mean()
+                df['MACD'] = exp1 - exp2
+                df['MACD_Signal'] = df['MACD'].ewm(span=9).mean()
         
         # 이동평균
-        df['MA_20'] = df['Close'].rolling(window=20).mean()
-        df['MA_50'] = df['Close'].rolling(window=50).mean()
+        for window in (20, 50):
+            if needs(columns, f'MA_{window}'):
+                df[f'MA_{window}'] = df['Close'].rolling(window=window).mean()
         
         # 거래량 평균
-        df['Volume_MA'] = df['Volume'].rolling(window=20).mean()
+        if needs(columns, 'Volume_MA'):
+            df['Volume_MA'] = df['Volume'].rolling(window=20).mean()
         
         return df
         
     except Exception as e:
         return df
 
-# 개별 종목 데이터 가져오기 (멀티스레딩용)
+# 장중 빠른 갱신에서 이어서 계산하는 지표 (calculate_technical_indicators_fast와 같은 컬럼)
+FAST_INDICATOR_COLUMNS = ['BB_Middle', 'BB_Upper', 'BB_Lower', 'RSI', 'MACD', 'MACD_Signal',
+                          'MA_20', 'MA_50', 'Volume_MA']
+
+# 조건별로 check_* 함수가 읽는 지표 컬럼
+CONDITION_COLUMNS = {
+    "bb_breakout": ['BB_Upper'],
+    "rsi_condition": ['RSI'],
+    "volume_surge": ['Volume_MA'],
+    "price_momentum": ['MA_20'],
+    "macd_bullish": ['MACD', 'MACD_Signal']
+}
+
+# 결과 표(build_result_row)가 읽는 지표 컬럼 (조건을 만족한 종목만 필요)
+RESULT_COLUMNS = ['RSI', 'Volume_MA', 'BB_Upper', 'BB_Lower']
+
+# 포트폴리오 시뮬레이션 변동성 가중에 쓰는 일간 수익률 표준편차 창
+VOLATILITY_WINDOW = 20
+
+def required_columns(conditions):
+    """켜진 조건이 읽는 지표 컬럼 (check_conditions와 같은 기준: 값 조건은 키가 있으면, 나머지는 참이면 켜짐)"""
+    columns = []
+    for key, names in CONDITION_COLUMNS.items():
+        active = key in conditions if key in ("rsi_condition", "volume_surge") else conditions.get(key)
+        if active:
+            columns += [name for name in names if name not in columns]
+    return columns
+
+# 메모리 최적화 (float32 가격)
+def optimize_stock_frame(df):
+    """가격은 float32, 거래량은 int64로 변환"""
+    dtypes = {
+        'Open': 'float32',
+        'High': 'float32', 
+        'Low': 'float32',
+        'Close': 'float32',
+        'Volume': 'int64'
+    }
+    # 일괄 다운로드 프레임은 이미 변환되어 있으므로 복사를 생략
+    if any(df[col].dtype != dtype for col, dtype in dtypes.items()):
+        df = df.astype(dtypes)
+    return df
+
+# 전체 종목 벡터 연산 지표 계산 (calculate_technical_indicators_fast와 같은 값)
+def calculate_technical_indicators_panel(frames, columns=FAST_INDICATOR_COLUMNS):
+    """{symbol: 프레임}을 (봉 × 종목) 배열로 정렬해 한 번에 계산, 봉이 50개 미만인 종목은 그대로"""
+    short = {symbol: df for symbol, df in frames.items() if len(df) < 50}
+    panel = Panel({symbol: df for symbol, df in frames.items() if len(df) >= 50}, fields=('Close', 'Volume'))
+    if not len(panel):
+        return dict(frames)
+    values = ta_indicators(panel, keys=columns)
+    result = panel.attach(values, {name: name for name in columns})
+    result.update(short)
+    return result
+
+# 조건 평가용 끝부분 지표 계산 (calculate_technical_indicators_fast의 마지막 TAIL_BARS개 봉과 같은 값)
+def calculate_technical_indicators_tail(frames, columns=FAST_INDICATOR_COLUMNS):
+    """{symbol: 마지막 TAIL_BARS개 봉 + 지표}, 봉이 50개 미만인 종목은 그대로
+
+    조건 확인 함수들은 마지막 두 봉만 읽으므로 전체 시계열 대신 끝부분만 계산합니다.
+    """
+    tails = tail_frames({symbol: df for symbol, df in frames.items() if len(df) >= 50},
+                        {name: name for name in columns}, bars=TAIL_BARS)
+    return {symbol: tails.get(symbol, df) for symbol, df in frames.items()}
+
+# 원시 OHLCV를 스크리닝용 프레임으로 변환
+def prepare_stock_frame(df, symbol=None, incremental=False, columns=None):
+    """메모리 최적화 후 기술적 지표 계산
+
+    incremental=True면 종목별 스트리밍 지표 상태에 새 봉만 반영한 마지막 두 봉 프레임을 반환합니다 (지표 전체).
+    columns를 주면 그 컬럼이 속한 지표만 계산합니다.
+    """
+    if incremental and symbol is not None:
+        return prepare_streaming_frame(df, symbol)
+    return calculate_technical_indicators_fast(optimize_stock_frame(df), columns)
+
+# 장중 빠른 갱신용: 종목별 지표 상태에 새 봉만 반영해 마지막 두 봉 프레임 만들기
+def prepare_streaming_frame(df, symbol):
+    """메모리 최적화 후 스트리밍 지표 상태로 끝부분 지표 계산 (봉이 50개 미만이면 원본 그대로)"""
+    df = optimize_stock_frame(df)
+    if len(df) < 50:
+        return df
+    return get_streaming_indicators().tail_frame(symbol, df, FAST_INDICATOR_COLUMNS)
+
+# 저장소를 거쳐 원시 OHLCV 조회 (수집 결과는 종목 상태 기록에 남김)
+def record_symbol_health(symbols, frames):
+    """종목별 네트워크 응답으로 상태 기록
+
+    저장소에서만 읽은 종목과 묶음 전체가 빈 일괄 요청의 종목은 판단할 수 없으므로 기록하지 않고,
+    저장된 이력이 있어도 새 봉 요청이 비었으면 빈 응답으로 기록합니다 (상장폐지 종목 감지).
+    """
+    health = get_symbol_health()
+    for symbol, status in get_store().take_responses(symbols).items():
+        df = frames.get(symbol)
+        if status == "ok" and df is not None and not df.empty:
+            health.record_ok(symbol, df.index[-1].date())
+        else:
+            health.record_empty(symbol)
+
+def load_raw_stock_data(symbol, period="3mo"):
+    """개별 종목 원시 OHLCV (없거나 실패하면 None)"""
+    try:
+        # 저장소 우선 조회 (더 긴 이력은 잘라서 반환, 모자란 앞부분/워터마크 이후 봉만 요청)
+        df = load_history(symbol, period=period)
+    except Exception as e:
+        get_store().take_responses([symbol])
+        get_symbol_health().record_error(symbol, type(e).__name__)
+        return None
+    
+    record_symbol_health([symbol], {symbol: df})
+    if df is None or df.empty:
+        return None
+    return df
+
+def load_raw_stock_data_bulk(symbols, period="3mo", chunk_size=100):
+    """저장소에 없는/오래된 종목만 일괄 다운로드로 갱신 후 {symbol: 원시 OHLCV}"""
+    frames = get_store().refresh_many(symbols, period=period, chunk_size=chunk_size)
+    record_symbol_health(symbols, frames)
+    get_symbol_health().flush()
+    return {symbol: df for symbol, df in frames.items() if df is not None and not df.empty}
+
+# 개별 종목 데이터 가져오기 (멀티스레딩용, 같은 요청은 세션 간에 합침)
+@single_flight()
 def get_single_stock_data(symbol, period="3mo"):
     """개별 종목 데이터 수집"""
+    df = load_raw_stock_data(symbol, period)
+    if df is None:
+        return symbol, None
+    
     try:
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=period)
-        
-        if df.empty:
-            return symbol, None
-            
-        # 메모리 최적화
-        df = df.astype({
-            'Open': 'float32',
-            'High': 'float32', 
-            'Low': 'float32',
-            'Close': 'float32',
-            'Volume': 'int64'
-        })
-        
-        df = calculate_technical_indicators_fast(df)
-        return symbol, df
-        
+        # 메모리 최적화 + 지표 계산
+        return symbol, prepare_stock_frame(df)
     except Exception as e:
         return symbol, None
 
-# 멀티스레딩 주식 데이터 수집
-def get_multiple_stocks_data(symbols, max_workers=20):
-    """멀티스레딩으로 여러 종목 데이터 수집"""
-    stock_data = {}
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # 모든 종목을 동시에 요청
-        future_to_symbol = {executor.submit(get_single_stock_data, symbol): symbol for symbol in symbols}
-        
-        for future in as_completed(future_to_symbol):
-            try:
-                symbol, df = future.result()
-                if df is not None:
-                    stock_data[symbol] = df
-            except Exception as e:
-                continue
-    
-    return stock_data
-
 # 조건 확인 함수들
 def check_bb_breakout(df):
     """볼린저 밴드 상단 돌파 확인"""
@@ -195,95 +302,349 @@ def check_macd_bullish(df):
     return (latest['MACD'] > latest['MACD_Signal'] and 
             previous['MACD'] <= previous['MACD_Signal'])
 
+# 조건 dict를 같은 판정의 전략으로 (전체 종목 벡터 평가용)
+RSI_OPERATORS = {"초과": Operator.GREATER_THAN, "미만": Operator.LESS_THAN,
+                 "상향돌파": Operator.CROSS_ABOVE, "하향돌파": Operator.CROSS_BELOW}
+
+# 전략 컬럼명 → 이 앱의 지표 컬럼명 (MACD는 MACD선)
+ULTRA_STRATEGY_COLUMNS = {'SMA_20': 'MA_20', 'Volume_SMA': 'Volume_MA', 'MACD': 'MACD', 'MACD_Signal': 'MACD_Signal'}
+
+def conditions_strategy(conditions):
+    """check_conditions와 같은 판정의 StrategyBuilder (OR 조합, 조건 이름은 결과 표 Conditions 표기)"""
+    strategy = StrategyBuilder()
+    strategy.set_combination_logic("OR")
+    if conditions.get("bb_breakout"):
+        strategy.add_condition(Condition("BB상단돌파", ConditionType.BOLLINGER_BAND, Operator.BREAKOUT, 0,
+                                         "볼린저 밴드 상단 돌파"))
+    if "rsi_condition" in conditions:
+        rsi_cond = conditions["rsi_condition"]
+        operator = RSI_OPERATORS.get(rsi_cond["type"], Operator.EQUAL)  # 모르는 타입은 항상 거짓
+        strategy.add_condition(Condition(f"RSI{rsi_cond['type']}{rsi_cond['value']}", ConditionType.RSI, operator,
+                                         rsi_cond["value"], "RSI 조건"))
+    if "volume_surge" in conditions:
+        strategy.add_condition(Condition("거래량급증", ConditionType.VOLUME, Operator.GREATER_THAN,
+                                         conditions["volume_surge"], "거래량 급증"))
+    if conditions.get("price_momentum"):
+        strategy.add_condition(Condition("가격모멘텀", ConditionType.MOVING_AVERAGE, Operator.GREATER_THAN, 0,
+                                         "20일 MA 상향", {'period': 20}))
+    if conditions.get("macd_bullish"):
+        strategy.add_condition(Condition("MACD상승", ConditionType.MACD, Operator.CROSS_ABOVE, 0, "MACD 상승 신호"))
+    return strategy
+
+def screen_frames_panel(frames, conditions, columns=None):
+    """전체 종목 지표와 조건을 (봉 × 종목) 벡터 연산으로 한 번에: ({symbol: 만족한 조건 이름 목록}, {symbol: 지표 프레임})
+
+    봉이 50개 미만인 종목은 조건을 만족하지 않고, 지표를 붙인 프레임은 조건을 만족한 종목만 만듭니다.
+    """
+    columns = required_columns(conditions) if columns is None else columns
+    met = {symbol: [] for symbol in frames}
+    panel = Panel({symbol: df for symbol, df in frames.items() if len(df) >= 50}, fields=('Close', 'Volume'))
+    if not len(panel):
+        return met, {}
+    values = ta_indicators(panel, keys=columns)
+    strategy = conditions_strategy(conditions)
+    masks = strategy.compile().condition_masks(panel, values, ULTRA_STRATEGY_COLUMNS)
+    names = [condition.name for condition in strategy.conditions]
+    for j in np.flatnonzero(np.logical_or.reduce(masks)) if masks else ():
+        met[panel.symbols[j]] = [name for name, mask in zip(names, masks) if mask[j]]
+    matched = [symbol for symbol in panel.symbols if met[symbol]]
+    return met, panel.attach(values, {name: name for name in columns}, matched)
+
+def screen_history(frames, conditions):
+    """과거 모든 봉의 스크리닝 결과: (Panel, (봉 × 종목) 만족한 조건 수)
+
+    t번째 봉 값이 0보다 크면 그 봉까지 자른 프레임을 screen_frames_panel로 스크리닝했을 때 매칭된 것과
+    같습니다 (그 봉까지 봉이 50개 미만이면 0). 날짜 축으로는 Panel.by_date로 맞춥니다.
+    """
+    panel = Panel({symbol: optimize_stock_frame(df) for symbol, df in frames.items() if df is not None and len(df)},
+                  fields=('Close', 'Volume'))
+    if not len(panel):
+        return panel, np.zeros((0, 0), dtype=np.int64)
+    values = ta_indicators(panel, keys=required_columns(conditions))
+    masks = conditions_strategy(conditions).compile().condition_masks(panel, values, ULTRA_STRATEGY_COLUMNS, dates=True)
+    counts = np.sum(masks, axis=0) if masks else np.zeros((panel.rows, len(panel)), dtype=np.int64)
+    return panel, np.where(panel.age >= 49, counts, 0)
+
+def simulate_screen_portfolio(frames, conditions, simulator=None):
+    """같은 조건으로 과거 매일 스크리닝해 매칭 종목을 사고파는 포트폴리오 시뮬레이션 (조건을 많이 만족한 종목 먼저)"""
+    simulator = simulator or PortfolioSimulator()
+    panel, counts = screen_history(frames, conditions)
+    dates, matched = panel.by_date(counts, fill=0)
+    close = panel['Close']
+    _, close_by_date = panel.by_date(close)
+    volatility = None
+    if simulator.weighting == "volatility":
+        returns = np.full_like(close, np.nan)
+        returns[1:] = close[1:] / close[:-1] - 1
+        _, volatility = panel.by_date(rolling_std(returns, VOLATILITY_WINDOW))
+    return simulator.run(dates, panel.symbols, close_by_date, matched > 0, matched, volatility)
+
+# 스트리밍 스크리닝: 결과 표/진행률을 다시 그리는 최대 빈도 (초당 횟수)
+UI_FPS = 4
+
+# 일괄 다운로드 첫 배치 크기 (첫 결과가 빨리 나오도록 작게 시작한 뒤 batch_size로)
+FIRST_BATCH = 20
+
+def check_conditions(df, conditions):
+    """만족한 조건 이름 목록"""
+    conditions_met = []
+    
+    # BB 상단 돌파
+    if conditions.get("bb_breakout") and check_bb_breakout(df):
+        conditions_met.append("BB상단돌파")
+    
+    # RSI 조건
+    if "rsi_condition" in conditions:
+        rsi_cond = conditions["rsi_condition"]
+        if check_rsi_condition(df, rsi_cond["type"], rsi_cond["value"]):
+            conditions_met.append(f"RSI{rsi_cond['type']}{rsi_cond['value']}")
+    
+    # 거래량 조건
+    if "volume_surge" in conditions:
+        if check_volume_surge(df, conditions["volume_surge"]):
+            conditions_met.append("거래량급증")
+    
+    # 가격 모멘텀
+    if conditions.get("price_momentum") and check_price_momentum(df):
+        conditions_met.append("가격모멘텀")
+    
+    # MACD 상승 신호
+    if conditions.get("macd_bullish") and check_macd_bullish(df):
+        conditions_met.append("MACD상승")
+    
+    return conditions_met
+
+def build_result_row(symbol, name, df, conditions_met):
+    """결과 표 한 줄"""
+    latest = df.iloc[-1]
+    change_pct = ((latest['Close'] - df.iloc[-2]['Close']) / df.iloc[-2]['Close'] * 100) if len(df) > 1 else 0
+    
+    return {
+        "Symbol": symbol,
+        "Name": name,
+        "Price": round(latest['Close'], 2),
+        "Change%": round(change_pct, 2),
+        "RSI": round(latest['RSI'], 1) if not pd.isna(latest['RSI']) else 0,
+        "Volume_Ratio": round(latest['Volume'] / latest['Volume_MA'], 2) if latest['Volume_MA'] > 0 else 0,
+        "BB_Position": round((latest['Close'] - latest['BB_Lower']) / (latest['BB_Upper'] - latest['BB_Lower']) * 100, 1) if 'BB_Upper' in df.columns else 0,
+        "Conditions": ", ".join(conditions_met)
+    }
+
+def complete_result_columns(df, source=None):
+    """결과 표 지표(RESULT_COLUMNS) 중 df에 없는 것을 계산해 붙임 (source: df가 끝부분 프레임일 때 원시 OHLCV)"""
+    missing = [name for name in RESULT_COLUMNS if name not in df.columns]
+    if not missing:
+        return df
+    full = calculate_technical_indicators_fast(optimize_stock_frame(source if source is not None else df).copy(), missing)
+    return df.assign(**{name: full[name].to_numpy()[-len(df):] for name in missing})
+
+def evaluate_stock(symbol, name, df, conditions, source=None):
+    """조건을 만족하면 결과 행, 아니면 None
+
+    df는 전체 이력 또는 끝부분만 계산한 프레임(TAIL_BARS개 봉)이며, 지표 컬럼이 없으면(봉 부족) 조건을 만족하지 않습니다.
+    조건이 읽지 않아 계산하지 않은 결과 표 지표는 조건을 만족한 종목만 계산합니다.
+    """
+    if df is None or len(df) < TAIL_BARS:
+        return None
+    conditions_met = check_conditions(df, conditions)
+    if not conditions_met:
+        return None
+    return build_result_row(symbol, name, complete_result_columns(df, source), conditions_met)
+
+# 파이프라인 지표 계산 스레드 수 (pandas/numpy 연산은 대부분 GIL을 놓음)
+COMPUTE_WORKERS = 4
+
+def _symbol_chunks(symbols, batch_size):
+    """FIRST_BATCH개로 시작해 batch_size개씩 나눈 종목 묶음"""
+    start = 0
+    size = min(FIRST_BATCH, batch_size)
+    while start < len(symbols):
+        yield symbols[start:start + size]
+        start += size
+        size = batch_size
+
+def build_screen_pipeline(stocks, conditions, tuner=None, bulk=True, refresh=False, batch_size=100,
+                          engine="thread"):
+    """수집 → 지표 계산 → 조건 평가 파이프라인 (결과: (symbol, 결과 행 또는 None))
+
+    수집 단계가 다음 묶음을 받는 동안 앞 묶음의 지표 계산/조건 평가가 진행되어 배치 사이에 쉬는 구간이 없습니다.
+    연속으로 실패한(상장폐지 등) 종목은 수집하지 않고 바로 None으로 내보냅니다.
+    engine은 지표 계산 방식 (장중 빠른 갱신은 방식과 관계없이 종목별 스트리밍 상태에 새 봉만 반영):
+    - "thread": 종목별로 계산 스레드에서 계산
+    - "process": 묶음 단위로 프로세스 풀(공유 메모리)에 보내 여러 코어에서 계산
+    - "panel": 묶음 전체를 (봉 × 종목) 배열로 정렬해 지표와 조건을 한 번의 벡터 연산으로 계산
+      (지표 프레임은 조건을 만족한 종목만 만듦)
+    - "tail": 조건 평가에 필요한 마지막 TAIL_BARS개 봉의 지표만 계산 (결과 표 값은 같음)
+    장중 빠른 갱신의 스트리밍 상태는 새 봉만 O(1)로 반영합니다 (상태를 만든 뒤의 이력 전체 기준 값).
+    장중 빠른 갱신이 아닌 thread/panel/tail은 켜진 조건이 읽는 지표만 계산하고 (절약한 계산량: pipeline.demand),
+    결과 표에만 쓰는 지표는 조건을 만족한 종목만 계산합니다.
+    """
+    symbols, skipped = get_symbol_health().filter(list(stocks.keys()))
+    # 장중 빠른 갱신(이전 계산을 이어 씀)과 프로세스 풀은 지표 전체, 그 외는 켜진 조건이 읽는 지표만 계산
+    columns = FAST_INDICATOR_COLUMNS if refresh or engine == "process" else required_columns(conditions)
+    extra = [name for name in RESULT_COLUMNS if name not in columns]
+    demand = DemandStats(FAST_INDICATOR_COLUMNS)
+    
+    def source():
+        if skipped:
+            yield skipped, True
+        for chunk in _symbol_chunks(symbols, batch_size):
+            yield chunk, False
+    
+    def fetch_chunk(chunk):
+        if bulk or refresh:
+            try:
+                return load_raw_stock_data_bulk(chunk, chunk_size=batch_size)
+            except Exception as e:
+                # 일괄 다운로드 실패 시 종목별 요청으로 대체
+                return get_fetch_engine().run(chunk, load_raw_stock_data, tuner=tuner)
+        # asyncio 수집 엔진으로 동시 요청 (요청 속도는 시장별 토큰 버킷이 제한)
+        frames = get_fetch_engine().run(chunk, load_raw_stock_data, tuner=tuner)
+        get_store().flush()
+        get_symbol_health().flush()
+        return frames
+    
+    def fetch(item):
+        chunk, skip = item
+        frames = {}
+        if not skip:
+            try:
+                frames = fetch_chunk(chunk)
+            except Exception:
+                # 대체 요청까지 실패한 묶음도 종목마다 결과 없음으로 내보냄 (진행률이 끝까지 가도록)
+                frames = {}
+        return [(symbol, frames.get(symbol)) for symbol in chunk]
+    
+    def compute(item):
+        symbol, df = item
+        if df is None:
+            return symbol, None, None, None
+        try:
+            frame = prepare_stock_frame(df, symbol, refresh, columns)
+            demand.record(1, columns)
+            return symbol, frame, df, None
+        except Exception:
+            return symbol, None, None, None
+    
+    def compute_chunk(pairs):
+        try:
+            frames = {symbol: optimize_stock_frame(df) for symbol, df in pairs if df is not None}
+            demand.record(len(frames), columns)
+            met = {}
+            try:
+                if engine == "panel":
+                    met, frames = screen_frames_panel(frames, conditions, columns)
+                elif engine == "tail":
+                    frames = calculate_technical_indicators_tail(frames, columns)
+                else:
+                    frames = get_indicator_pool().attach(frames, columns)
+            except Exception:
+                # 프로세스 풀을 쓸 수 없는 환경 등 실패하면 현재 스레드에서 종목별로 계산
+                frames = {symbol: calculate_technical_indicators_fast(df, columns) for symbol, df in frames.items()}
+                met = {}
+        except Exception:
+            # 묶음 계산이 실패해도 종목은 모두 내보냄 (조건 평가에서 결과 없음)
+            return [(symbol, None, None, None) for symbol, _ in pairs]
+        return [(symbol, frames.get(symbol), df, met.get(symbol)) for symbol, df in pairs]
+    
+    def evaluate(item):
+        symbol, df, raw, met = item
+        try:
+            if met is None:
+                row = evaluate_stock(symbol, stocks[symbol], df, conditions, raw)
+            else:
+                # 조건은 묶음 단위로 이미 평가됨 (만족한 종목만 결과 행)
+                row = build_result_row(symbol, stocks[symbol], complete_result_columns(df, raw), met) if met else None
+        except Exception:
+            return symbol, None
+        if row is not None and extra:
+            demand.record_completed(1, extra)
+        return symbol, row
+    
+    pipeline = Pipeline(source(), queue_size=2 * batch_size)
+    if engine in ("process", "panel", "tail") and not refresh:
+        # 묶음째로 넘겨 프로세스 풀 호출 또는 벡터 연산 한 번에 묶음 전체를 계산
+        pipeline.stage("수집", fetch, queue_size=1)
+        pipeline.stage("지표 계산", compute_chunk, fan_out=True, queue_size=2)
+    else:
+        pipeline.stage("수집", fetch, fan_out=True, queue_size=1)
+        pipeline.stage("지표 계산", compute, workers=COMPUTE_WORKERS)
+    pipeline.demand = demand
+    return pipeline.stage("조건 평가", evaluate)
+
+# 파이프라인 단계별 상태 표
+def pipeline_stats_frame(pipeline):
+    """단계별 처리 수/큐 길이/처리량/가동률"""
+    rows = [{
+        "단계": row['stage'],
+        "스레드": row['workers'],
+        "처리": row['processed'],
+        "오류": row['errors'],
+        "대기열": f"{row['queue_depth']}/{row['queue_size']}",
+        "처리량(건/초)": round(row['throughput'], 1),
+        "가동률": f"{row['utilization']:.0%}"
+    } for row in pipeline.stats()]
+    return pd.DataFrame(rows)
+
 # 울트라 스크리닝 (멀티스레딩)
-def ultra_screen_stocks(stocks, conditions, max_workers=20):
-    """멀티스레딩으로 초고속 전체 스크리닝"""
+def ultra_screen_stocks(stocks, conditions, tuner=None, bulk=True, refresh=False, engine="thread",
+                        tuner_status=None):
+    """멀티스레딩으로 초고속 전체 스크리닝
+
+    조건을 만족한 종목은 나오는 즉시 실시간 결과 표에 추가하고, 진행률/표는 초당 UI_FPS번까지만 다시 그립니다.
+    tuner_status(st.empty)가 주어지면 종목별 요청 방식에서 동시 요청 자동 조정 상태도 같이 다시 그립니다.
+    refresh=True면 장중 빠른 갱신: 저장된 이력에 최근 봉만 받아 붙이고 지표는 바뀐 끝부분만 계산
+    """
     
     if not isinstance(stocks, dict) or not stocks:
         st.error("❌ 종목 데이터 오류")
         return []
     
     total_stocks = len(stocks)
-    st.info(f"🚀 {total_stocks}개 종목 울트라 스크리닝 시작... (멀티스레딩 {max_workers}개)")
+    if tuner is None:
+        tuner = AdaptiveConcurrency()
+    if uses_tuner(bulk, refresh):
+        st.info(f"🚀 {total_stocks}개 종목 울트라 스크리닝 시작... (동시 요청 자동 조정, 시작 {tuner.limit}개)")
+    else:
+        st.info(f"🚀 {total_stocks}개 종목 울트라 스크리닝 시작... (일괄 다운로드)")
+    if not uses_tuner(bulk, refresh):
+        tuner_status = None
     
-    # 프로그레스 바 설정
+    # 프로그레스 바 / 실시간 결과 표
     progress_bar = st.progress(0)
     status_text = st.empty()
+    live_table = st.empty()
     
-    symbols = list(stocks.keys())
     results = []
     processed = 0
+    started = time.monotonic()
+    first_result = None
+    drawn_at = 0.0
+    drawn_rows = 0
     
-    # 배치 크기 설정 (메모리 관리)
-    batch_size = 100
+    pipeline = build_screen_pipeline(stocks, conditions, tuner, bulk, refresh, engine=engine)
     
     try:
-        for i in range(0, len(symbols), batch_size):
-            batch_symbols = symbols[i:i+batch_size]
-            batch_end = min(i + batch_size, len(symbols))
-            
-            status_text.text(f"배치 {i//batch_size + 1}: {i+1}-{batch_end} 종목 처리 중...")
+        for symbol, row in pipeline.run():
+            processed += 1
+            if row is not None:
+                results.append(row)
+                if first_result is None:
+                    first_result = time.monotonic() - started
             
-            # 배치 단위로 멀티스레딩 데이터 수집
-            stock_data = get_multiple_stocks_data(batch_symbols, max_workers)
-            
-            # 각 종목별 조건 확인
-            for symbol in batch_symbols:
-                processed += 1
-                progress = processed / total_stocks
-                progress_bar.progress(progress)
-                
-                if symbol not in stock_data:
-                    continue
-                
-                df = stock_data[symbol]
-                if df is None or len(df) < 20:
-                    continue
-                
-                # 조건 확인
-                conditions_met = []
-                
-                # BB 상단 돌파
-                if conditions.get("bb_breakout") and check_bb_breakout(df):
-                    conditions_met.append("BB상단돌파")
-                
-                # RSI 조건
-                if "rsi_condition" in conditions:
-                    rsi_cond = conditions["rsi_condition"]
-                    if check_rsi_condition(df, rsi_cond["type"], rsi_cond["value"]):
-                        conditions_met.append(f"RSI{rsi_cond['type']}{rsi_cond['value']}")
-                
-                # 거래량 조건
-                if "volume_surge" in conditions:
-                    if check_volume_surge(df, conditions["volume_surge"]):
-                        conditions_met.append("거래량급증")
-                
-                # 가격 모멘텀
-                if conditions.get("price_momentum") and check_price_momentum(df):
-                    conditions_met.append("가격모멘텀")
-                
-                # MACD 상승 신호
-                if conditions.get("macd_bullish") and check_macd_bullish(df):
-                    conditions_met.append("MACD상승")
-                
-                # 결과 추가
-                if conditions_met:
-                    latest = df.iloc[-1]
-                    change_pct = ((latest['Close'] - df.iloc[-2]['Close']) / df.iloc[-2]['Close'] * 100) if len(df) > 1 else 0
-                    
-                    results.append({
-                        "Symbol": symbol,
-                        "Name": stocks[symbol],
-                        "Price": round(latest['Close'], 2),
-                        "Change%": round(change_pct, 2),
-                        "RSI": round(latest['RSI'], 1) if not pd.isna(latest['RSI']) else 0,
-                        "Volume_Ratio": round(latest['Volume'] / latest['Volume_MA'], 2) if latest['Volume_MA'] > 0 else 0,
-                        "BB_Position": round((latest['Close'] - latest['BB_Lower']) / (latest['BB_Upper'] - latest['BB_Lower']) * 100, 1) if 'BB_Upper' in df.columns else 0,
-                        "Conditions": ", ".join(conditions_met)
-                    })
-            
-            # 배치 완료 후 잠시 대기
-            time.sleep(0.2)
+            now = time.monotonic()
+            if now - drawn_at < 1 / UI_FPS and processed < total_stocks:
+                continue
+            drawn_at = now
+            progress_bar.progress(processed / total_stocks)
+            first_text = f" · 첫 결과 {first_result:.1f}초" if first_result is not None else ""
+            stage_text = " · ".join(f"{row['stage']} 대기 {row['queue_depth']}" for row in pipeline.stats())
+            status_text.text(f"{processed}/{total_stocks} 종목 처리 · {len(results)}개 발견{first_text} · {stage_text}")
+            if len(results) != drawn_rows:
+                drawn_rows = len(results)
+                live_table.dataframe(pd.DataFrame(results), use_container_width=True, hide_index=True)
+            if tuner_status is not None:
+                render_tuner_status(tuner_status, tuner)
     
     except Exception as e:
         st.error(f"❌ 울트라 스크리닝 중 오류: {str(e)}")
@@ -292,9 +653,55 @@ def ultra_screen_stocks(stocks, conditions, max_workers=20):
     finally:
         progress_bar.empty()
         status_text.empty()
+        live_table.empty()
+    
+    st.caption(pipeline.demand.summary())
+    with st.expander("⚙️ 파이프라인 단계별 처리 현황", expanded=False):
+        st.dataframe(pipeline_stats_frame(pipeline), use_container_width=True, hide_index=True)
     
     return results
 
+# 수집 실패 종목 점검 화면
+def render_symbol_health():
+    """사이드바에 연속 실패/빈 응답 종목과 다음 재확인 시각 표시"""
+    health = get_symbol_health()
+    stats = health.stats()
+    with st.sidebar.expander(f"🩺 종목 상태 점검 (건너뜀 {stats['dead']}개)", expanded=False):
+        rows = health.maintenance_rows()
+        if not rows:
+            st.caption("실패 기록이 있는 종목이 없습니다.")
+            return
+        st.caption(f"재확인 대상 {stats['suspect']}개 · 이번 실행에서 건너뛴 요청 {stats['skipped']}건")
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        if st.button("전체 다시 확인", key="reset_symbol_health"):
+            health.reset()
+            st.rerun()
+
+# 동시 요청 자동 조정 상태 표시
+def uses_tuner(bulk, refresh):
+    """동시 요청 자동 조정을 쓰는 수집 방식인지 (일괄 다운로드/장중 빠른 갱신은 묶음을 차례로 받으므로 사용 안 함)"""
+    return not (bulk or refresh)
+
+def render_tuner_status(container, tuner, active=True):
+    """사이드바에 현재 동시 요청 수와 최근 조정 사유 표시"""
+    if not active:
+        container.caption("⚡ 일괄 다운로드는 요청당 100종목씩 차례로 받으므로 동시 요청 수를 자동 조정하지 않습니다.")
+        return
+    with container.container():
+        st.metric("⚡ 동시 요청 수 (자동)", tuner.limit)
+        if tuner.last_latency is not None:
+            st.caption(
+                f"지연 {tuner.last_latency * 1000:.0f}ms · 실패율 {tuner.last_failure_rate:.0%} · "
+                f"처리량 {tuner.throughput:.1f}건/초"
+            )
+        reasons = tuner.recent_reasons(5)
+        if reasons:
+            with st.expander("조정 사유", expanded=False):
+                for reason in reasons:
+                    st.write(f"- {reason}")
+        else:
+            st.caption("아직 조정 기록 없음 (종목별 요청 시 자동 조정)")
+
 # 고급 차트 생성
 def create_advanced_chart(symbol, df, name):
     """고급 기술적 분석 차트"""
@@ -390,7 +797,19 @@ def main():
     
     # 울트라 설정
     st.sidebar.subheader("⚡ 울트라 설정")
-    max_workers = st.sidebar.slider("동시 처리 스레드 수", 10, 50, 25)
+    # 동시 요청 수는 세션마다 유지되는 자동 조정기가 결정
+    if 'concurrency_tuner' not in st.session_state:
+        st.session_state.concurrency_tuner = AdaptiveConcurrency(initial=10, min_limit=2, max_limit=50)
+    tuner = st.session_state.concurrency_tuner
+    bulk_mode = st.sidebar.checkbox("일괄 다운로드 (요청당 100종목)", value=True)
+    refresh_mode = st.sidebar.checkbox("장중 빠른 갱신 (최근 봉만 받아서 이어 계산)", value=False)
+    tuner_status = st.sidebar.empty()
+    render_tuner_status(tuner_status, tuner, uses_tuner(bulk_mode, refresh_mode))
+    engine_labels = {"thread": "종목별", "panel": "전체 종목 벡터 연산", "tail": "최근 봉만 계산 (조건 평가용)",
+                     "process": f"멀티프로세스 ({POOL_WORKERS}개 코어)"}
+    engine = st.sidebar.radio("지표 계산 방식", list(engine_labels), format_func=engine_labels.get,
+                              index=1, help="장중 빠른 갱신에서는 방식과 관계없이 저장된 지표 상태에 새 봉만 반영합니다.")
+    render_symbol_health()
     
     # 조건 설정
     st.sidebar.subheader("🎯 스크리닝 조건")
@@ -417,6 +836,27 @@ def main():
     if st.sidebar.checkbox("MACD 상승 신호", value=False):
         conditions["macd_bullish"] = True
     
+    # 같은 조건을 과거 매일 적용했을 때의 포트폴리오
+    with st.sidebar.expander("💼 포트폴리오 시뮬레이션"):
+        simulation_period = st.selectbox("기간", ["1y", "2y", "5y", "10y"], index=2)
+        max_positions = st.number_input("통화별 최대 보유 종목 수", min_value=1, max_value=100, value=10)
+        weighting = st.radio("비중", ["equal", "volatility"],
+                             format_func={"equal": "동일 비중", "volatility": "변동성 역가중"}.get)
+        hold_days = st.number_input("보유 기간 (거래일)", min_value=1, max_value=250, value=20)
+        rebalance_days = st.number_input("재조정 주기 (거래일, 0이면 안 함)", min_value=0, max_value=250, value=0)
+        run_simulation = st.button("💼 시뮬레이션 실행")
+    
+    if run_simulation and conditions:
+        st.subheader(f"💼 {market} 포트폴리오 시뮬레이션 ({simulation_period})")
+        with st.spinner(f"과거 데이터로 매일 스크리닝 중... ({len(selected_stocks)}개 종목)"):
+            frames = load_raw_stock_data_bulk(list(selected_stocks), period=simulation_period)
+            simulator = PortfolioSimulator(max_positions=int(max_positions), weighting=weighting,
+                                           hold_days=int(hold_days), rebalance_days=int(rebalance_days))
+            simulation = simulate_screen_portfolio(frames, conditions, simulator)
+        st.caption(f"{len(simulation.dates)}거래일 × {len(simulation.symbols)}개 종목 시뮬레이션 {simulation.elapsed:.1f}초")
+        st.dataframe(simulation.summary().round(2), use_container_width=True)
+        st.line_chart(simulation.equity_frame())
+    
     # 울트라 스크리닝 실행
     if st.sidebar.button("🚀 울트라 스크리닝 실행", type="primary"):
         if not conditions:
@@ -428,10 +868,17 @@ def main():
         start_time = time.time()
         
         with st.spinner(f"울트라 스크리닝 실행 중... ({len(selected_stocks)}개 종목)"):
-            results = ultra_screen_stocks(selected_stocks, conditions, max_workers)
+            results = ultra_screen_stocks(selected_stocks, conditions, tuner, bulk=bulk_mode, refresh=refresh_mode,
+                                          engine=engine, tuner_status=tuner_status)
         
         end_time = time.time()
         execution_time = round(end_time - start_time, 2)
+        render_tuner_status(tuner_status, tuner, uses_tuner(bulk_mode, refresh_mode))
+        if refresh_mode:
+            stats = get_streaming_indicators().stats()
+            get_streaming_indicators().flush()
+            st.caption(f"지표 상태: 이어서 확정 {stats['appended']}봉, 변경 없음 {stats['unchanged']}개, "
+                       f"새로 만듦 {stats['seeded']}개 (누적 CPU {stats['cpu_time'] * 1000:.0f}ms)")
         
         if not results:
             st.info("조건에 맞는 종목이 없습니다.")
@@ -496,7 +943,7 @@ def main():
         st.metric("🏢 지원 시장", len(stock_lists))
     
     with col3:
-        st.metric("⚡ 최대 스레드", max_workers)
+        st.metric("⚡ 동시 요청 (자동)", tuner.limit if uses_tuner(bulk_mode, refresh_mode) else "일괄")
     
     with col4:
         if market == "🌍 전체 시장":
@@ -1,13 +1,14 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import time
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 import plotly.express as px
 from typing import List, Dict, Any
 import warnings
+from market_data import get_provider
+from single_flight import single_flight
 warnings.filterwarnings('ignore')
 
 # 페이지 설정
@@ -53,12 +54,12 @@ class RealStockScreener:
             ]
         }
     
+    @single_flight()  # 세션 간 동시 요청 합치기
     def get_stock_data(self, symbol: str, period: str = "90d") -> pd.DataFrame:
-        """실제 주식 데이터 가져오기 (yfinance 사용)"""
+        """실제 주식 데이터 가져오기 (데이터 소스: 기본 yfinance)"""
         try:
-            # yfinance 0.2.61 사용
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period=period)
+            # 데이터 소스(기본 yfinance)가 시장별 요청 한도 처리
+            data = get_provider().history(symbol, period=period)
             return data if not data.empty else None
         except Exception as e:
             st.error(f"데이터 가져오기 실패 {symbol}: {str(e)}")
@@ -245,7 +246,6 @@ def main():
                         })
                 
                 progress_bar.progress((i + 1) / len(stocks))
-                time.sleep(0.5)  # API 제한 방지
         
         # 결과 표시
         st.subheader(f"📊 {selected_market} 스크리닝 결과 (실제 데이터)")